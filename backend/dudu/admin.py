@@ -1,7 +1,86 @@
+import json
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import Industrial, Feedback, Booking, Newsletter, ProjectStat, Payment, UserProfile, Enquiry
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, transaction
+from django.utils.functional import cached_property
+
+from . import availability, rollups
+from .middleware import purge_pages
+from .models import (
+    Industrial, Feedback, Booking, Newsletter, ProjectStat, Payment, UserProfile, Enquiry,
+    BookingDailyRollup, BookingMember, PaymentDailyRollup, PaymentEvent, RequestProfile, SlowQuery,
+)
+
+
+# ─── Large-Table Changelists ──────────────────────────────────
+
+def estimate_count(queryset):
+    """
+    The planner's row estimate for `queryset`, or None where there isn't a
+    cheap one: table statistics for an unfiltered queryset, EXPLAIN for a
+    filtered one (PostgreSQL only).
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                if not queryset.query.where:
+                    cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+                    row = cursor.fetchone()
+                    # -1 until the table has been vacuumed/analyzed
+                    return row[0] if row and row[0] >= 0 else None
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return int(plan[0]['Plan']['Plan Rows'])
+            if connection.vendor == 'mysql' and not queryset.query.where:
+                cursor.execute(
+                    'SELECT table_rows FROM information_schema.tables '
+                    'WHERE table_schema = DATABASE() AND table_name = %s', [table],
+                )
+                row = cursor.fetchone()
+                return row[0] if row else None
+    except DatabaseError:
+        return None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts exactly below `threshold` rows and uses the planner's estimate
+    above it, so a changelist over millions of rows doesn't COUNT(*) them on
+    every page load. Page numbers past the estimate just come back empty.
+    """
+
+    threshold = 100_000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.threshold:
+            return super().count
+        return estimate
+
+
+def _status_changes(rows, contribution, status):
+    """(before, after) contributions for `rows` moving to `status` via update()."""
+    changes = []
+    for row in rows:
+        before = contribution(row)
+        row.status = status
+        changes.append((before, contribution(row)))
+    return changes
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class UserProfileInline(admin.StackedInline):
@@ -27,24 +106,73 @@ class IndustrialAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
 
 
+# Search fields use indexed lookups (see migrations 0011 and 0017): ^ is a
+# name prefix, = a case-insensitive exact match, __exact a case-sensitive
+# one. Substring search (icontains) can't use an index and is left out.
+
 @admin.register(Feedback)
-class FeedbackAdmin(admin.ModelAdmin):
+class FeedbackAdmin(LargeTableAdmin):
     list_display = ('name', 'rating', 'industrial', 'is_approved', 'created_at')
     list_filter = ('is_approved', 'rating')
-    search_fields = ('name', 'message')
+    list_select_related = ('industrial',)
+    search_fields = ('^name',)
+    actions = ('approve',)
+
+    @admin.action(description='Approve selected feedback', permissions=['change'])
+    def approve(self, request, queryset):
+        updated = queryset.filter(is_approved=False).update(is_approved=True)
+        # update() sends no post_save, so purge the cached pages here.
+        purge_pages('feedback')
+        self.message_user(request, f'{updated} feedback entries approved.')
+
+
+class BookingMemberInline(admin.TabularInline):
+    model = BookingMember
+    raw_id_fields = ('user',)
+    extra = 0
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(LargeTableAdmin):
     list_display = ('name', 'industrial', 'plan', 'amount', 'payment_status', 'status', 'created_at')
     list_filter = ('status', 'payment_status', 'plan')
-    search_fields = ('name', 'email')
+    list_select_related = ('industrial',)
+    search_fields = ('^name', '=email')
+    actions = ('confirm',)
+    inlines = (BookingMemberInline,)
+
+    @admin.action(description='Confirm selected bookings', permissions=['change'])
+    def confirm(self, request, queryset):
+        # Cancelled bookings stay cancelled. status isn't part of the revenue
+        # rollups, but update() skips signals, so move the confirmed seats in
+        # the availability calendar here.
+        queryset = queryset.exclude(status__in=['confirmed', 'cancelled'])
+        with transaction.atomic():
+            dated = list(queryset.filter(travel_date__isnull=False).select_for_update())
+            updated = queryset.update(status='confirmed')
+            rollups.apply_changes(_status_changes(dated, availability.booking_contribution, 'confirmed'))
+        self.message_user(request, f'{updated} bookings confirmed.')
 
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
-    list_display = ('booking', 'amount', 'payment_status', 'transaction_id', 'created_at')
+class PaymentAdmin(LargeTableAdmin):
+    list_display = ('booking', 'amount', 'payment_status', 'transaction_id', 'gateway_order_id', 'created_at')
     list_filter = ('payment_status',)
+    list_select_related = ('booking__industrial',)
+    search_fields = ('transaction_id__exact', 'gateway_order_id__exact')
+    raw_id_fields = ('booking',)
+
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(admin.ModelAdmin):
+    list_display = (
+        'event_id', 'event_type', 'status', 'note', 'attempts', 'occurred_at', 'received_at', 'processed_at',
+    )
+    list_filter = ('status', 'event_type')
+    search_fields = ('event_id',)
+    readonly_fields = (
+        'event_id', 'event_type', 'payload', 'occurred_at', 'received_at', 'processed_at', 'attempts', 'retry_at',
+    )
 
 
 @admin.register(Newsletter)
@@ -56,7 +184,72 @@ class NewsletterAdmin(admin.ModelAdmin):
 class ProjectStatAdmin(admin.ModelAdmin):
     list_display = ('title', 'count', 'suffix', 'icon')
 @admin.register(Enquiry)
-class EnquiryAdmin(admin.ModelAdmin):
+class EnquiryAdmin(LargeTableAdmin):
     list_display = ('name', 'city', 'phone', 'travel_date', 'no_of_people', 'status', 'created_at')
-    list_filter = ('status', 'city')
-    search_fields = ('name', 'phone', 'city')
+    # No city filter: it would SELECT DISTINCT city over the whole table on
+    # every page load. Search "=<city>" instead.
+    list_filter = ('status',)
+    search_fields = ('^name', 'phone__exact', '=email', '=city')
+    actions = ('mark_contacted', 'mark_closed')
+
+    def _set_status(self, request, queryset, status):
+        queryset = queryset.exclude(status=status)
+        with transaction.atomic():
+            # Closing an enquiry releases its seats in the availability calendar.
+            linked = list(queryset.filter(industrial__isnull=False).select_for_update())
+            updated = queryset.update(status=status)
+            rollups.apply_changes(_status_changes(linked, availability.enquiry_contribution, status))
+        self.message_user(request, f'{updated} enquiries marked as {status}.')
+
+    @admin.action(description='Mark selected enquiries as contacted', permissions=['change'])
+    def mark_contacted(self, request, queryset):
+        self._set_status(request, queryset, 'contacted')
+
+    @admin.action(description='Mark selected enquiries as closed', permissions=['change'])
+    def mark_closed(self, request, queryset):
+        self._set_status(request, queryset, 'closed')
+
+
+@admin.register(BookingDailyRollup)
+class BookingDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'industrial', 'plan', 'payment_status', 'payment_method', 'bookings', 'amount')
+    list_filter = ('plan', 'payment_status', 'payment_method')
+    list_select_related = ('industrial',)
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PaymentDailyRollup)
+class PaymentDailyRollupAdmin(BookingDailyRollupAdmin):
+    list_display = ('day', 'industrial', 'plan', 'payment_status', 'payment_method', 'payments', 'amount')
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('recorded_at', 'duration_ms', 'view', 'database', 'sql')
+    list_filter = ('database', 'view')
+    search_fields = ('=fingerprint',)
+    date_hierarchy = 'recorded_at'
+    readonly_fields = ('fingerprint', 'sql', 'view', 'database', 'duration_ms', 'plan', 'recorded_at')
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    # Browsed on the dashboard (Profiles); here for deleting them.
+    list_display = ('created_at', 'method', 'path', 'view', 'status', 'duration_ms', 'user')
+    list_filter = ('view',)
+    list_select_related = ('user',)
+    date_hierarchy = 'created_at'
+    fields = ('method', 'path', 'view', 'status', 'duration_ms', 'samples', 'user', 'created_at')
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,185 @@
+"""
+Industrial visit analytics.
+
+Detail-page views are counted in memory and flushed in batches into hourly
+IndustrialViewBucket rows. The rollup_visits command turns buckets into
+daily/weekly IndustrialViewRollup rows and recomputes Industrial.trending_score,
+which the home page orders by without aggregating anything per request.
+"""
+import atexit
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+
+from .models import Industrial, IndustrialViewBucket, IndustrialViewRollup
+
+
+# ─── Ingestion ────────────────────────────────────────────────
+
+_pending = Counter()  # (industrial_id, hour) -> views
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def _current_hour():
+    return timezone.now().replace(minute=0, second=0, microsecond=0)
+
+
+def record_view(industrial_id):
+    """Count one detail-page view; writes happen in batches."""
+    global _last_flush
+    with _lock:
+        _pending[(industrial_id, _current_hour())] += 1
+        due = (
+            sum(_pending.values()) >= getattr(settings, 'ANALYTICS_FLUSH_SIZE', 50)
+            or time.monotonic() - _last_flush >= getattr(settings, 'ANALYTICS_FLUSH_INTERVAL', 30)
+        )
+    if due:
+        flush_views()
+
+
+def flush_views():
+    """Write pending view counts to the buckets and lifetime visit_count."""
+    global _last_flush
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not batch:
+        return 0
+
+    totals = Counter()
+    for (industrial_id, hour), views in batch.items():
+        totals[industrial_id] += views
+        updated = IndustrialViewBucket.objects.filter(
+            industrial_id=industrial_id, hour=hour,
+        ).update(views=F('views') + views)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    IndustrialViewBucket.objects.create(industrial_id=industrial_id, hour=hour, views=views)
+            except IntegrityError:
+                # Another worker created the bucket first.
+                IndustrialViewBucket.objects.filter(
+                    industrial_id=industrial_id, hour=hour,
+                ).update(views=F('views') + views)
+
+    # queryset.update() skips post_save, so views don't purge the page cache.
+    for industrial_id, views in totals.items():
+        Industrial.objects.filter(pk=industrial_id).update(visit_count=F('visit_count') + views)
+    return sum(totals.values())
+
+
+atexit.register(flush_views)
+
+
+# ─── Rollups ──────────────────────────────────────────────────
+
+def _upsert_rollups(period, rows):
+    if connection.features.supports_update_conflicts_with_target:
+        IndustrialViewRollup.objects.bulk_create(
+            [
+                IndustrialViewRollup(
+                    industrial_id=row['industrial_id'], period=period,
+                    period_start=row['period_start'], views=row['views'],
+                )
+                for row in rows
+            ],
+            update_conflicts=True,
+            unique_fields=['industrial', 'period', 'period_start'],
+            update_fields=['views'],
+        )
+        return
+
+    # MySQL can't name the conflict target in ON DUPLICATE KEY UPDATE.
+    for row in rows:
+        lookup = {'industrial_id': row['industrial_id'], 'period': period, 'period_start': row['period_start']}
+        if IndustrialViewRollup.objects.filter(**lookup).update(views=row['views']):
+            continue
+        try:
+            with transaction.atomic():
+                IndustrialViewRollup.objects.create(views=row['views'], **lookup)
+        except IntegrityError:
+            # Another rollup run created the row first.
+            IndustrialViewRollup.objects.filter(**lookup).update(views=row['views'])
+
+
+def rollup_days(since):
+    """Recompute daily rollups for every day from `since` (a date) onwards."""
+    rows = (
+        IndustrialViewBucket.objects.filter(hour__date__gte=since)
+        .annotate(period_start=TruncDate('hour'))
+        .values('industrial_id', 'period_start')
+        .annotate(views=Sum('views'))
+    )
+    rows = list(rows)
+    _upsert_rollups('day', rows)
+    return len(rows)
+
+
+def rollup_weeks(since):
+    """Recompute weekly rollups (weeks start Monday) from the daily ones."""
+    week_start = since - timedelta(days=since.weekday())
+    rows = (
+        IndustrialViewRollup.objects.filter(period='day', period_start__gte=week_start)
+        .annotate(week=TruncWeek('period_start'))
+        .values('industrial_id', 'week')
+        .annotate(views=Sum('views'))
+    )
+    rows = [
+        {'industrial_id': row['industrial_id'], 'period_start': row['week'], 'views': row['views']}
+        for row in rows
+    ]
+    _upsert_rollups('week', rows)
+    return len(rows)
+
+
+def update_trending_scores(window_hours=None, half_life_hours=None):
+    """
+    Score each industrial by its recent hourly views with exponential decay,
+    so a view an hour ago counts more than one from last week.
+    """
+    window_hours = window_hours or getattr(settings, 'TRENDING_WINDOW_HOURS', 168)
+    half_life_hours = half_life_hours or getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 24)
+    now = _current_hour()
+    decay = math.log(2) / half_life_hours
+
+    scores = defaultdict(float)
+    buckets = IndustrialViewBucket.objects.filter(
+        hour__gte=now - timedelta(hours=window_hours),
+    ).values_list('industrial_id', 'hour', 'views')
+    for industrial_id, hour, views in buckets.iterator():
+        age = max(0.0, (now - hour).total_seconds() / 3600)
+        scores[industrial_id] += views * math.exp(-decay * age)
+
+    industrials = list(Industrial.objects.only('id', 'trending_score'))
+    changed = []
+    for industrial in industrials:
+        score = round(scores.get(industrial.id, 0.0), 4)
+        if industrial.trending_score != score:
+            industrial.trending_score = score
+            changed.append(industrial)
+    # bulk_update sends no signals; the caller purges the home page once.
+    Industrial.objects.bulk_update(changed, ['trending_score'], batch_size=500)
+    return len(changed)
+
+
+def prune_buckets(retention_days=None, batch_size=5000):
+    retention_days = retention_days or getattr(settings, 'ANALYTICS_BUCKET_RETENTION_DAYS', 30)
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        ids = list(
+            IndustrialViewBucket.objects.filter(hour__lt=cutoff).values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += IndustrialViewBucket.objects.filter(pk__in=ids).delete()[0]
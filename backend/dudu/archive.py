@@ -0,0 +1,209 @@
+"""
+Cold-data archival.
+
+archive_data moves bookings (with their payments) and enquiries older than
+a cutoff out of the database into gzip-compressed JSONL files under
+ARCHIVE_DIR, partitioned by the month the row was created:
+
+    <ARCHIVE_DIR>/booking/2024-03/booking-1200-2199.jsonl.gz
+    <ARCHIVE_DIR>/booking/2024-03/booking-1200-2199.jsonl.gz.sha256
+
+Each batch is written, read back and checksummed before its rows are
+deleted, so a crash leaves rows in both places rather than in neither, and
+restore_archive (which skips rows that already exist) can bring any file
+back safely. Revenue rollups are left untouched: archived revenue still
+shows in the reports. The availability calendar only counts rows in the
+database, so archiving takes their seats off it (through the delete
+signals) and restoring puts them back.
+"""
+import gzip
+import hashlib
+import json
+import os
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from . import availability, revenue, rollups
+from .bulk import backdated
+from .models import Booking, BookingMember, Enquiry, Industrial, Payment
+
+# name -> (model, related models archived alongside it as (model, fk field))
+ARCHIVABLE = {
+    'booking': (Booking, [(Payment, 'booking'), (BookingMember, 'booking')]),
+    'enquiry': (Enquiry, []),
+}
+
+
+def archive_dir():
+    return Path(getattr(settings, 'ARCHIVE_DIR', settings.BASE_DIR / 'archive'))
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _checksum_path(path):
+    return path.with_name(path.name + '.sha256')
+
+
+# ─── Archive ──────────────────────────────────────────────────
+
+def _write_partition(path, records):
+    """Write records as gzip JSONL, verify it reads back, and write its checksum."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n')
+    with open(tmp, 'rb') as f:
+        os.fsync(f.fileno())
+    with gzip.open(tmp, 'rt', encoding='utf-8') as f:
+        if sum(1 for _ in f) != len(records):
+            raise IOError(f'{tmp} did not read back {len(records)} rows')
+    os.replace(tmp, path)
+    digest = sha256_file(path)
+    _checksum_path(path).write_text(f'{digest}  {path.name}\n')
+    return digest
+
+
+def archive_batch(name, rows, directory):
+    """Write `rows` (and their related rows) to month partitions, then delete them."""
+    model, related = ARCHIVABLE[name]
+    months = defaultdict(list)
+    for row in rows:
+        months[timezone.localtime(row.created_at).strftime('%Y-%m')].append(row)
+
+    counts = Counter()
+    for month, month_rows in sorted(months.items()):
+        pks = [row.pk for row in month_rows]
+        # Parents first, so a restore can insert the file in order.
+        records = serializers.serialize('python', month_rows)
+        for related_model, field in related:
+            children = list(related_model.objects.filter(**{f'{field}__in': pks}).order_by('pk'))
+            records += serializers.serialize('python', children)
+            counts[related_model._meta.model_name] += len(children)
+        path = directory / name / month / f'{name}-{pks[0]}-{pks[-1]}.jsonl.gz'
+        _write_partition(path, records)
+        counts[name] += len(month_rows)
+
+    with transaction.atomic(), revenue.suspended():
+        model.objects.filter(pk__in=[row.pk for row in rows]).delete()
+    return counts
+
+
+def archive(name, cutoff, batch_size=1000, directory=None, dry_run=False):
+    """Archive rows of `name` created before `cutoff`; returns row counts per model."""
+    model, _ = ARCHIVABLE[name]
+    directory = directory or archive_dir()
+    old = model.objects.filter(created_at__lt=cutoff)
+    if dry_run:
+        return Counter({name: old.count()})
+
+    counts = Counter()
+    last_pk = 0
+    while True:
+        # Walk the primary key so each batch is an index range scan.
+        rows = list(old.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+        if not rows:
+            return counts
+        counts.update(archive_batch(name, rows, directory))
+        last_pk = rows[-1].pk
+
+
+# ─── Restore ──────────────────────────────────────────────────
+
+def archive_files(name=None, since=None, until=None, directory=None):
+    """Archive files, optionally for one model and a YYYY-MM month range."""
+    directory = directory or archive_dir()
+    names = [name] if name else list(ARCHIVABLE)
+    files = []
+    for model_name in names:
+        for path in sorted((directory / model_name).glob('*/*.jsonl.gz')):
+            month = path.parent.name
+            if (since and month < since) or (until and month > until):
+                continue
+            files.append(path)
+    return files
+
+
+def verify(path):
+    checksum = _checksum_path(path)
+    if not checksum.exists():
+        return False
+    return checksum.read_text().split()[0] == sha256_file(path)
+
+
+def _restorable(objects):
+    """
+    Drop references that no longer resolve: a booking's user and an
+    enquiry's industrial become NULL, orphans are skipped.
+    """
+    bookings = [obj for obj in objects if isinstance(obj, Booking)]
+    members = [obj for obj in objects if isinstance(obj, BookingMember)]
+    enquiries = [obj for obj in objects if isinstance(obj, Enquiry) and obj.industrial_id]
+    if not bookings and not enquiries:
+        return objects, 0
+    users = set(User.objects.filter(
+        pk__in={b.user_id for b in bookings if b.user_id} | {m.user_id for m in members},
+    ).values_list('pk', flat=True))
+    industrials = set(Industrial.objects.filter(
+        pk__in={b.industrial_id for b in bookings} | {e.industrial_id for e in enquiries},
+    ).values_list('pk', flat=True))
+    for enquiry in enquiries:
+        if enquiry.industrial_id not in industrials:
+            enquiry.industrial_id = None
+    skipped_bookings = set()
+    for booking in bookings:
+        if booking.user_id and booking.user_id not in users:
+            booking.user_id = None
+        if booking.industrial_id not in industrials:
+            skipped_bookings.add(booking.pk)
+    kept = [
+        obj for obj in objects
+        if not (isinstance(obj, Booking) and obj.pk in skipped_bookings)
+        and not (isinstance(obj, Payment) and obj.booking_id in skipped_bookings)
+        # A roster member can't exist without its student.
+        and not (isinstance(obj, BookingMember) and (obj.booking_id in skipped_bookings or obj.user_id not in users))
+    ]
+    return kept, len(objects) - len(kept)
+
+
+def restore_file(path, batch_size=1000):
+    """
+    Load one archive file back into the database. Rows whose primary key
+    already exists are left alone, so restoring twice is harmless.
+    Returns (restored count per model, skipped rows).
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    objects = [obj.object for obj in serializers.deserialize('python', records)]
+    objects, skipped = _restorable(objects)
+
+    by_model = defaultdict(list)
+    for obj in objects:
+        by_model[type(obj)].append(obj)
+    counts = Counter()
+    with transaction.atomic(), backdated(*by_model):
+        # Parents before children, in the order they were archived.
+        for model in sorted(by_model, key=lambda m: m is not Booking):
+            rows = by_model[model]
+            existing = set(model.objects.filter(pk__in=[obj.pk for obj in rows]).values_list('pk', flat=True))
+            rows = [obj for obj in rows if obj.pk not in existing]
+            model.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+            counts[model._meta.model_name] += len(rows)
+            # bulk_create sends no signals.
+            if model in availability.CONTRIBUTIONS:
+                contribution = availability.CONTRIBUTIONS[model]
+                rollups.apply_changes([(None, contribution(obj)) for obj in rows])
+    return counts, skipped
@@ -0,0 +1,191 @@
+"""
+Per-page static bundles.
+
+ASSET_BUNDLES in settings maps a page name to the CSS and JS files it uses.
+At collectstatic time (see dudu.storage) each bundle is concatenated and
+minified into bundles/<name>.css and bundles/<name>.js, and the rules that
+style the first screen (ASSET_CRITICAL_SELECTORS) are extracted into
+bundles/<name>.critical.css so templates can inline them.
+"""
+import re
+
+from django.conf import settings
+
+
+def get_bundles():
+    return getattr(settings, 'ASSET_BUNDLES', {})
+
+
+def bundle_path(name, kind):
+    return f'bundles/{name}.{kind}'
+
+
+# ─── CSS ──────────────────────────────────────────────────────
+
+def _strip_css_comments(css):
+    out = []
+    i, length = 0, len(css)
+    quote = None
+    while i < length:
+        char = css[i]
+        if quote:
+            out.append(char)
+            if char == '\\' and i + 1 < length:
+                out.append(css[i + 1])
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+            out.append(char)
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            continue
+        else:
+            out.append(char)
+        i += 1
+    return ''.join(out)
+
+
+def minify_css(css):
+    css = _strip_css_comments(css)
+    # Split on quoted strings so their contents are left untouched.
+    parts = re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', css)
+    for index in range(0, len(parts), 2):
+        chunk = re.sub(r'\s+', ' ', parts[index])
+        chunk = re.sub(r'\s*([{};,>])\s*', r'\1', chunk)
+        chunk = re.sub(r':\s+', ':', chunk)
+        parts[index] = chunk.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def _split_rules(css):
+    """
+    Yield (prelude, body) for each top-level rule of minified CSS. Statements
+    without a block, such as @import, are yielded with a body of None.
+    """
+    start, depth, quote = 0, 0, None
+    brace = None
+    for i, char in enumerate(css):
+        if quote:
+            if char == quote and css[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            if depth == 0:
+                brace = i
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                yield css[start:brace].strip(), css[brace + 1:i]
+                start = i + 1
+        elif char == ';' and depth == 0:
+            statement = css[start:i].strip()
+            if statement:
+                yield statement, None
+            start = i + 1
+    if css[start:].strip():
+        yield css[start:].strip(), None
+
+
+def _is_critical(selector_list, prefixes):
+    for selector in selector_list.split(','):
+        selector = selector.strip()
+        if any(selector.startswith(prefix) for prefix in prefixes):
+            return True
+    return False
+
+
+def extract_critical_css(css, prefixes):
+    """Keep only the rules of minified `css` that match a critical selector."""
+    kept = []
+    for prelude, body in _split_rules(css):
+        if body is None:
+            continue
+        if prelude.startswith('@media') or prelude.startswith('@supports'):
+            inner = extract_critical_css(body, prefixes)
+            if inner:
+                kept.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@font-face'):
+            kept.append(f'{prelude}{{{body}}}')
+        elif not prelude.startswith('@') and _is_critical(prelude, prefixes):
+            kept.append(f'{prelude}{{{body}}}')
+    return ''.join(kept)
+
+
+def build_css(sources):
+    """Concatenate and minify CSS sources, hoisting @import to the top."""
+    imports, rules = [], []
+    for source in sources:
+        for prelude, body in _split_rules(minify_css(source)):
+            if body is None:
+                if prelude.startswith('@import'):
+                    imports.append(prelude + ';')
+            else:
+                rules.append(f'{prelude}{{{body}}}')
+    return ''.join(dict.fromkeys(imports)) + ''.join(rules)
+
+
+# ─── JS ───────────────────────────────────────────────────────
+
+def minify_js(js):
+    """
+    Conservative JS minification: drops indentation, blank lines and
+    whole-line comments, and never rewrites code inside a line. Lines inside
+    multi-line template literals are kept verbatim.
+    """
+    lines = []
+    in_block_comment = False
+    in_template = False
+    for line in js.splitlines():
+        stripped = line.strip()
+        if in_template:
+            lines.append(line)
+        elif in_block_comment:
+            if '*/' in stripped:
+                in_block_comment = False
+                rest = stripped.split('*/', 1)[1].strip()
+                if rest:
+                    lines.append(rest)
+            continue
+        elif not stripped or stripped.startswith('//'):
+            continue
+        elif stripped.startswith('/*'):
+            if '*/' not in stripped:
+                in_block_comment = True
+                continue
+            stripped = stripped.split('*/', 1)[1].strip()
+            if not stripped:
+                continue
+            lines.append(stripped)
+        else:
+            lines.append(stripped)
+        if len(re.findall(r'(?<!\\)`', line)) % 2:
+            in_template = not in_template
+    return '\n'.join(lines)
+
+
+def build_js(sources):
+    # Each file is wrapped so a missing trailing semicolon can't merge
+    # statements across file boundaries.
+    return '\n'.join(f';{minify_js(source)}\n' for source in sources)
+
+
+def build_bundle(name, read_source):
+    """
+    Build the files for one bundle. `read_source` maps a static path to its
+    text. Returns {output path: content}.
+    """
+    spec = get_bundles()[name]
+    outputs = {}
+    if spec.get('css'):
+        css = build_css(read_source(path) for path in spec['css'])
+        prefixes = getattr(settings, 'ASSET_CRITICAL_SELECTORS', ())
+        outputs[bundle_path(name, 'css')] = css
+        outputs[bundle_path(name, 'critical.css')] = extract_critical_css(css, prefixes)
+    if spec.get('js'):
+        outputs[bundle_path(name, 'js')] = build_js(read_source(path) for path in spec['js'])
+    return outputs
@@ -0,0 +1,112 @@
+"""
+Per-day availability calendar.
+
+AvailabilityDay holds, per industrial and visit day, the seats asked for
+(open enquiries naming the industrial, plus bookings that aren't cancelled)
+and the seats confirmed (confirmed bookings). Like the revenue rollups, rows
+are kept current by applying the before/after difference of every Booking
+and Enquiry write (see dudu.rollups; bulk updates call apply_changes
+themselves), so the month view reads at most 31 rows and never aggregates
+bookings or enquiries per request. backfill_availability rebuilds it.
+"""
+import calendar
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, When
+
+from . import rollups
+from .models import AvailabilityDay, Booking, Enquiry
+
+SEATS = rollups.Rollup(AvailabilityDay, ('industrial_id', 'day'), ('seats_requested', 'seats_confirmed'))
+
+
+# ─── Incremental Maintenance ──────────────────────────────────
+
+def booking_contribution(booking):
+    """(rollup, (industrial id, day), (seats requested, seats confirmed)), or None."""
+    if booking.travel_date is None or booking.status == 'cancelled':
+        return None
+    seats = booking.no_of_people or 0
+    return SEATS, (booking.industrial_id, booking.travel_date), (seats, seats if booking.status == 'confirmed' else 0)
+
+
+def enquiry_contribution(enquiry):
+    if enquiry.industrial_id is None or enquiry.travel_date is None or enquiry.status == 'closed':
+        return None
+    return SEATS, (enquiry.industrial_id, enquiry.travel_date), (enquiry.no_of_people or 0, 0)
+
+
+CONTRIBUTIONS = {
+    Booking: booking_contribution,
+    Enquiry: enquiry_contribution,
+}
+
+TRACKER = rollups.Tracker('availability', CONTRIBUTIONS)
+
+
+# ─── Backfill ─────────────────────────────────────────────────
+
+def backfill(since=None):
+    """Rebuild the calendar from Booking/Enquiry, for days >= `since` if given."""
+    bookings = Booking.objects.filter(travel_date__isnull=False).exclude(status='cancelled')
+    enquiries = Enquiry.objects.filter(industrial__isnull=False).exclude(status='closed')
+    stale = AvailabilityDay.objects.all()
+    if since:
+        bookings = bookings.filter(travel_date__gte=since)
+        enquiries = enquiries.filter(travel_date__gte=since)
+        stale = stale.filter(day__gte=since)
+
+    totals = defaultdict(lambda: [0, 0])
+    confirmed = Case(When(status='confirmed', then=F('no_of_people')), default=0, output_field=IntegerField())
+    for row in (
+        bookings.values('industrial_id', 'travel_date')
+        .annotate(requested=Sum('no_of_people'), confirmed=Sum(confirmed)).order_by()
+    ):
+        total = totals[(row['industrial_id'], row['travel_date'])]
+        total[0] += row['requested'] or 0
+        total[1] += row['confirmed'] or 0
+    for row in enquiries.values('industrial_id', 'travel_date').annotate(requested=Sum('no_of_people')).order_by():
+        totals[(row['industrial_id'], row['travel_date'])][0] += row['requested'] or 0
+
+    objs = [
+        AvailabilityDay(industrial_id=industrial_id, day=day, seats_requested=requested, seats_confirmed=seats)
+        for (industrial_id, day), (requested, seats) in totals.items()
+    ]
+    with transaction.atomic():
+        stale.delete()
+        AvailabilityDay.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+# ─── Reads ────────────────────────────────────────────────────
+
+def remaining(industrial, seats_confirmed):
+    """Seats still free on a day, or None when the industrial has no limit."""
+    if not industrial.daily_capacity:
+        return None
+    return max(industrial.daily_capacity - seats_confirmed, 0)
+
+
+def month_view(industrial, year, month):
+    """Every day of the month with its seats requested, confirmed and remaining."""
+    first = date(year, month, 1)
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    rows = dict(
+        (day, (requested, confirmed))
+        for day, requested, confirmed in AvailabilityDay.objects.filter(
+            industrial=industrial, day__range=(first, last),
+        ).values_list('day', 'seats_requested', 'seats_confirmed')
+    )
+    days = []
+    for number in range(1, last.day + 1):
+        day = date(year, month, number)
+        requested, confirmed = rows.get(day, (0, 0))
+        days.append({
+            'date': day.isoformat(),
+            'requested': requested,
+            'confirmed': confirmed,
+            'remaining': remaining(industrial, confirmed),
+        })
+    return days
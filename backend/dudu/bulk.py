@@ -0,0 +1,21 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def backdated(*models):
+    """
+    Let bulk_create keep explicit created_at/date_joined values: auto_now_add
+    fields of `models` are switched off for the duration. Only for commands
+    (generate_dataset, restore_archive), never request code.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
@@ -0,0 +1,264 @@
+"""
+Computed-value cache: per-process LRU -> shared cache (see CACHES).
+
+memoize(key, compute, ttl) returns the cached result of compute(), and keeps
+a hot key from turning into a stampede when it expires:
+
+- Reads hit a small in-process LRU first (for CACHE_LOCAL_TTL seconds), then
+  the shared cache, so a hot key costs a round trip to Redis or the disk at
+  most once every few seconds per worker.
+- Probabilistic early expiration ("XFetch"): each read near the expiry
+  refreshes early with a probability that grows as the expiry approaches and
+  with how long the value took to compute, so one request usually refreshes
+  it before it ever expires.
+- Stale-while-revalidate: for `stale` seconds past the expiry the old value
+  is still served while one background thread recomputes it.
+- Single-flight: on a real miss one thread per worker computes, holding a
+  lock in the shared cache; other workers wait up to CACHE_LOCK_WAIT seconds
+  for its result rather than running the same query.
+
+The LRU holds the same objects for every thread of a worker, so callers must
+not mutate what they get back. invalidate() and refresh() reach the shared
+cache and this worker's LRU; other workers pick the change up when their
+local copy expires.
+"""
+import logging
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class LocalCache:
+    """Thread-safe LRU with a short TTL, shared by all threads of a worker."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local = LocalCache(
+    maxsize=_setting('CACHE_LOCAL_SIZE', 500),
+    ttl=_setting('CACHE_LOCAL_TTL', 5),
+)
+
+# Background recomputations for stale and early-refreshed keys.
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+
+# key -> [threading.Lock, threads holding or waiting for it], so threads of
+# one worker never compute a key twice. An entry goes once nobody needs it.
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+
+def _shared(alias):
+    return caches[alias]
+
+
+def _acquire_key(key, blocking=True):
+    with _key_locks_lock:
+        entry = _key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    if entry[0].acquire(blocking):
+        return True
+    _release_key(key, held=False)
+    return False
+
+
+def _release_key(key, held=True):
+    with _key_locks_lock:
+        entry = _key_locks[key]
+        if held:
+            entry[0].release()
+        entry[1] -= 1
+        if not entry[1]:
+            del _key_locks[key]
+
+
+@contextmanager
+def _key_lock(key):
+    _acquire_key(key)
+    try:
+        yield
+    finally:
+        _release_key(key)
+
+
+# ─── Single Flight ────────────────────────────────────────────
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def claim(key, alias='default'):
+    """Take the shared lock for recomputing `key`; False if someone holds it."""
+    return _shared(alias).add(_lock_key(key), 1, timeout=_setting('CACHE_LOCK_TIMEOUT', 30))
+
+
+def release(key, alias='default'):
+    _shared(alias).delete(_lock_key(key))
+
+
+def wait_for(key, timeout=None, alias='default'):
+    """Poll the shared cache for `key` while another worker computes it."""
+    cache = _shared(alias)
+    deadline = time.monotonic() + (_setting('CACHE_LOCK_WAIT', 5) if timeout is None else timeout)
+    delay = 0.02
+    while True:
+        value = cache.get(key)
+        if value is not None or time.monotonic() >= deadline:
+            return value
+        if cache.get(_lock_key(key)) is None:
+            # The holder finished (or gave up) without storing anything.
+            return cache.get(key)
+        time.sleep(delay)
+        delay = min(delay * 2, 0.25)
+
+
+# ─── Memoize ──────────────────────────────────────────────────
+
+# Entries are stored as (value, expires, delta): the wall-clock expiry (None
+# for no expiry) and how many seconds compute() took.
+
+def _read(key, alias):
+    entry = local.get((alias, key))
+    if entry is None:
+        entry = _shared(alias).get(key)
+        if entry is not None:
+            local.set((alias, key), entry)
+    return entry
+
+
+def _store(key, compute, ttl, stale, alias):
+    started = time.time()
+    value = compute()
+    now = time.time()
+    entry = (value, None if ttl is None else now + ttl, now - started)
+    _shared(alias).set(key, entry, timeout=None if ttl is None else ttl + stale)
+    local.set((alias, key), entry)
+    return entry
+
+
+def _usable(entry, stale):
+    value, expires, delta = entry
+    return expires is None or time.time() < expires + stale
+
+
+def _due(entry):
+    """XFetch: True once the key is expired, or early with rising probability."""
+    value, expires, delta = entry
+    if expires is None:
+        return False
+    beta = _setting('CACHE_EARLY_BETA', 1.0)
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires
+
+
+def _refresh_in_background(key, compute, ttl, stale, alias):
+    if not _acquire_key(key, blocking=False):
+        return  # this worker is already on it
+
+    def run():
+        try:
+            if claim(key, alias):
+                try:
+                    _store(key, compute, ttl, stale, alias)
+                finally:
+                    release(key, alias)
+        except Exception:
+            # The old value keeps being served until it goes past `stale`.
+            logger.exception('Refreshing cache key %s failed', key)
+        finally:
+            _release_key(key)
+            connections.close_all()
+
+    try:
+        _refresher.submit(run)
+    except RuntimeError:
+        # The pool is shut down (interpreter exit); keep serving the old value.
+        _release_key(key)
+
+
+def memoize(key, compute, ttl=None, stale=None, alias='default'):
+    """
+    compute() cached under `key` for `ttl` seconds (None: until invalidated),
+    then served stale for up to `stale` more seconds (default: ttl) while it
+    is recomputed in the background.
+    """
+    stale = (ttl or 0) if stale is None else stale
+    entry = _read(key, alias)
+    if entry is not None and _usable(entry, stale):
+        if _due(entry):
+            _refresh_in_background(key, compute, ttl, stale, alias)
+        return entry[0]
+
+    with _key_lock(key):
+        # Another thread may have filled it while this one waited.
+        entry = _read(key, alias)
+        if entry is not None and _usable(entry, stale):
+            return entry[0]
+        if not claim(key, alias):
+            entry = wait_for(key, alias=alias)
+            if entry is not None and _usable(entry, stale):
+                local.set((alias, key), entry)
+                return entry[0]
+            return _store(key, compute, ttl, stale, alias)[0]
+        try:
+            return _store(key, compute, ttl, stale, alias)[0]
+        finally:
+            release(key, alias)
+
+
+def refresh(key, compute, ttl=None, stale=None, alias='default'):
+    """Recompute `key` now (e.g. after the data behind it changed)."""
+    stale = (ttl or 0) if stale is None else stale
+    with _key_lock(key):
+        return _store(key, compute, ttl, stale, alias)[0]
+
+
+def invalidate(key, alias='default'):
+    _shared(alias).delete(key)
+    local.delete((alias, key))
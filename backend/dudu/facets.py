@@ -0,0 +1,146 @@
+"""
+Catalog facets: location, duration and price band.
+
+Industrial.save() parses the free-text duration ("2 Days 1 Night") into
+duration_days/duration_nights and files the price into a PRICE_BANDS key,
+so every facet is a plain indexed column.
+
+Facet counts come from a small precomputed cube: the number of active
+industrials per (location, days, nights, price band), rebuilt with one
+GROUP BY whenever an Industrial is saved or deleted and kept in the cache
+(dudu.caching, so workers share one copy and rebuild it once).
+A request sums the cube cells instead of running a GROUP BY per facet, and
+because each facet's counts honour the selections in the *other* facets,
+the sidebar shows how many results a click would give.
+"""
+import re
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Count, Q
+
+from . import caching
+
+# key, label, lower bound (inclusive), upper bound (exclusive, None = open)
+PRICE_BANDS = [
+    ('under-2000', 'Under ₹2,000', 0, 2000),
+    ('2000-3500', '₹2,000 – ₹3,500', 2000, 3500),
+    ('3500-5000', '₹3,500 – ₹5,000', 3500, 5000),
+    ('5000-plus', '₹5,000 and above', 5000, None),
+]
+
+FACETS = ('location', 'duration', 'price')
+
+CUBE_KEY = 'facets:industrial:cube'
+# Rebuilt on every Industrial change; the timeout only bounds drift from
+# writes that skip signals (queryset.update()).
+CUBE_TTL = 3600
+
+_DAYS = re.compile(r'(\d+)\s*days?\b', re.IGNORECASE)
+_NIGHTS = re.compile(r'(\d+)\s*nights?\b', re.IGNORECASE)
+DURATION_KEY = re.compile(r'(\d+)d(\d+)n')
+
+
+def parse_duration(text):
+    """'2 Days 1 Night' -> (2, 1). Anything without a day count is one day."""
+    days = _DAYS.search(text or '')
+    nights = _NIGHTS.search(text or '')
+    return (int(days.group(1)) if days else 1), (int(nights.group(1)) if nights else 0)
+
+
+def price_band(price):
+    price = Decimal(str(price))
+    for key, _, low, high in PRICE_BANDS:
+        if price >= low and (high is None or price < high):
+            return key
+    return PRICE_BANDS[0][0]
+
+
+def duration_key(days, nights):
+    return f'{days}d{nights}n'
+
+
+def duration_label(days, nights):
+    label = f"{days} Day{'s' if days != 1 else ''}"
+    if nights:
+        label += f" {nights} Night{'s' if nights != 1 else ''}"
+    return label
+
+
+# ─── Facet Cube ───────────────────────────────────────────────
+
+def _count_cube():
+    from .models import Industrial
+
+    rows = (
+        Industrial.objects.filter(status='active')
+        .values_list('location', 'duration_days', 'duration_nights', 'price_band')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    return [(location, duration_key(days, nights), band, count) for location, days, nights, band, count in rows]
+
+
+def build_cube():
+    return caching.refresh(CUBE_KEY, _count_cube, ttl=CUBE_TTL)
+
+
+def get_cube():
+    return caching.memoize(CUBE_KEY, _count_cube, ttl=CUBE_TTL)
+
+
+# ─── Requests ─────────────────────────────────────────────────
+
+def selected(params):
+    """The facet values chosen in a GET QueryDict, as {facet: set of keys}."""
+    return {facet: {value for value in params.getlist(facet) if value} for facet in FACETS}
+
+
+def filter_queryset(queryset, selection):
+    """Narrow `queryset` to the selection: any value within a facet, every facet."""
+    if selection['location']:
+        queryset = queryset.filter(location__in=selection['location'])
+    if selection['duration']:
+        durations = Q(pk__in=[])
+        for key in selection['duration']:
+            match = DURATION_KEY.fullmatch(key)
+            if match:
+                durations |= Q(duration_days=int(match.group(1)), duration_nights=int(match.group(2)))
+        queryset = queryset.filter(durations)
+    if selection['price']:
+        queryset = queryset.filter(price_band__in=selection['price'])
+    return queryset
+
+
+def facet_counts(selection):
+    """
+    Sidebar options per facet as dicts of key, label, count and selected.
+    Each facet is counted against the selections in the other facets only,
+    so choosing a location doesn't hide the other locations.
+    """
+    counts = {facet: defaultdict(int) for facet in FACETS}
+    for location, duration, band, count in get_cube():
+        values = {'location': location, 'duration': duration, 'price': band}
+        for facet in FACETS:
+            counts[facet][values[facet]] += 0  # listed even when nothing matches
+            if all(
+                not selection[other] or values[other] in selection[other]
+                for other in FACETS if other != facet
+            ):
+                counts[facet][values[facet]] += count
+
+    def option(facet, key, label):
+        return {'key': key, 'label': label, 'count': counts[facet].get(key, 0), 'selected': key in selection[facet]}
+
+    durations = sorted(
+        (int(m.group(1)), int(m.group(2)))
+        for m in map(DURATION_KEY.fullmatch, counts['duration'].keys() | selection['duration']) if m
+    )
+    return {
+        'location': [option('location', key, key) for key in sorted(counts['location'].keys() | selection['location'])],
+        'duration': [option('duration', duration_key(*d), duration_label(*d)) for d in durations],
+        'price': [
+            option('price', key, label) for key, label, _, _ in PRICE_BANDS
+            if key in counts['price'] or key in selection['price']
+        ],
+    }
@@ -0,0 +1,166 @@
+"""
+Liveness and readiness probes.
+
+/healthz answers as soon as the process can serve a request, without any
+I/O. /readyz checks the database, the shared cache and the payment webhook
+queue, timing each, and keeps the result for HEALTH_CACHE_SECONDS so a burst
+of probes runs the checks once. The checks run on a thread of their own,
+one run at a time: probes never wait for them (except for the very first
+result) and get the previous result meanwhile. Queries and cache calls in
+the checks give up after HEALTH_CHECK_TIMEOUT seconds, and if a run still
+takes longer than that the instance reports itself not ready.
+
+HealthCheckMiddleware answers both paths ahead of every other middleware:
+probes skip the HTTPS redirect and ALLOWED_HOSTS (platform health checkers
+use plain HTTP and their own Host header), sessions and the page cache.
+"""
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import JsonResponse
+from django.utils import timezone
+
+from .models import PaymentEvent
+
+logger = logging.getLogger(__name__)
+
+# name -> (check, critical). A check returns extra details for the response
+# ({'ok': False, ...} or raising marks it failed). A failing critical check
+# makes /readyz a 503; the others are reported but don't take the instance
+# out of rotation.
+CHECKS = {}
+
+
+def check(name, critical=True):
+    def register(func):
+        CHECKS[name] = (func, critical)
+        return func
+    return register
+
+
+def _timeout():
+    return getattr(settings, 'HEALTH_CHECK_TIMEOUT', 3)
+
+
+@check('database')
+def check_database():
+    connection = connections['default']
+    with connection.cursor() as cursor:
+        # The checks' thread has its own connection, closed after each run.
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET statement_timeout = %s', [int(_timeout() * 1000)])
+        elif connection.vendor == 'mysql':
+            cursor.execute('SET SESSION max_execution_time = %s', [int(_timeout() * 1000)])
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    return {}
+
+
+@check('cache')
+def check_cache():
+    cache = caches['default']
+    key, value = 'health:probe', uuid.uuid4().hex
+    cache.set(key, value, timeout=60)
+    if cache.get(key) != value:
+        raise RuntimeError('cache did not return the value just written')
+    return {}
+
+
+@check('payment_queue', critical=False)
+def check_payment_queue():
+    """Webhook events waiting for reconcile_payments, and the oldest one's age."""
+    waiting = PaymentEvent.objects.filter(status='received')
+    oldest = waiting.order_by('received_at').values_list('received_at', flat=True).first()
+    if oldest is None:
+        return {'backlog': 0, 'oldest_seconds': 0}
+    age = (timezone.now() - oldest).total_seconds()
+    return {
+        'ok': age <= getattr(settings, 'HEALTH_QUEUE_MAX_AGE', 600),
+        # Capped so a huge backlog can't make the probe slow.
+        'backlog': waiting[:10000].count(),
+        'oldest_seconds': round(age),
+    }
+
+
+def run_checks():
+    results = {}
+    ready = True
+    for name, (func, critical) in CHECKS.items():
+        started = time.perf_counter()
+        try:
+            result = {'ok': True, **func()}
+        except Exception as e:
+            # Only the type: the endpoint is public and messages name hosts.
+            result = {'ok': False, 'error': type(e).__name__}
+            logger.warning('Readiness check %s failed', name, exc_info=True)
+        if critical and not result['ok']:
+            ready = False
+        result['ms'] = round((time.perf_counter() - started) * 1000, 1)
+        results[name] = result
+    return ready, results
+
+
+_last = {'at': None, 'result': None, 'started': None}
+_lock = threading.Lock()
+_finished = threading.Condition(_lock)
+
+
+def _refresh():
+    try:
+        result = run_checks()
+    finally:
+        connections.close_all()
+    with _finished:
+        _last.update(result=result, at=time.monotonic(), started=None)
+        _finished.notify_all()
+
+
+def readiness():
+    """(ready, check results, age of the result in seconds), cached per process."""
+    ttl = getattr(settings, 'HEALTH_CACHE_SECONDS', 5)
+    timeout = _timeout()
+    with _finished:
+        now = time.monotonic()
+        if _last['started'] is None and (_last['at'] is None or now - _last['at'] >= ttl):
+            _last['started'] = now
+            threading.Thread(target=_refresh, name='readiness-checks', daemon=True).start()
+        if _last['result'] is None:
+            _finished.wait_for(lambda: _last['result'] is not None, timeout)
+        now = time.monotonic()
+        ready, results = _last['result'] or (False, {})
+        age = now - _last['at'] if _last['at'] is not None else 0
+        running = now - _last['started'] if _last['started'] is not None else 0
+    if running > timeout:
+        # A check is hanging despite its timeout.
+        ready = False
+        results = {**results, 'checks_running': {'ok': False, 'error': 'Timeout', 'ms': round(running * 1000, 1)}}
+    return ready, results, age
+
+
+# ─── Middleware ───────────────────────────────────────────────
+
+class HealthCheckMiddleware:
+    """Serves /healthz and /readyz; must be first in MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        path = request.path.rstrip('/')
+        if path == '/healthz':
+            return self._respond({'status': 'ok'}, 200)
+        if path == '/readyz':
+            ready, results, age = readiness()
+            body = {'status': 'ok' if ready else 'unavailable', 'checks': results, 'age': round(age, 1)}
+            return self._respond(body, 200 if ready else 503)
+        return self.get_response(request)
+
+    def _respond(self, body, status):
+        response = JsonResponse(body, status=status)
+        response['Cache-Control'] = 'no-store'
+        return response
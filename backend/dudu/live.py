@@ -0,0 +1,363 @@
+"""
+Live admin dashboard updates over server-sent events.
+
+Open admin tabs hold an EventSource on /admin-dashboard/live/. The stream is
+served by LiveStreamRouter in front of the Django ASGI app (see
+industrial_visit/asgi.py and GUNICORN_ASGI in gunicorn.conf.py): going
+through Django's sync middleware would pin an executor thread to every open
+tab, while here a tab is one coroutine. Each process runs one Hub
+that watches for new bookings and enquiries and fans them out to every
+connected tab, so the database work per change is the same for one tab or
+a thousand:
+
+- On PostgreSQL, saves send NOTIFY on LIVE_CHANNEL and a listener thread
+  wakes the hub immediately; it also polls every LIVE_FALLBACK_INTERVAL
+  seconds to catch rows created without signals (bulk imports).
+- Elsewhere the hub polls every LIVE_POLL_INTERVAL seconds.
+
+Either way the hub reads rows above a high-water mark (the highest booking
+and enquiry pk it has sent), so a wake-up costs one indexed query per model
+plus the counters, and only when something changed. Event ids carry the
+marks, so a reconnecting browser (Last-Event-ID) is sent what it missed.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DatabaseError, close_old_connections, connection, connections
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateformat import format as date_format
+
+from .models import Booking, Enquiry
+
+logger = logging.getLogger(__name__)
+
+LIVE_CHANNEL = 'dudu_live'
+
+# Most rows per model sent in one update; tabs reload for anything bigger.
+BATCH_LIMIT = 50
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ─── Changes ──────────────────────────────────────────────────
+
+def high_water_marks():
+    return {
+        'booking': Booking.objects.order_by('-pk').values_list('pk', flat=True).first() or 0,
+        'enquiry': Enquiry.objects.order_by('-pk').values_list('pk', flat=True).first() or 0,
+    }
+
+
+def counters():
+    return {
+        'total_bookings': Booking.objects.count(),
+        'pending_enquiries': Enquiry.objects.filter(status='pending').count(),
+    }
+
+
+def booking_event(booking):
+    return {
+        'id': booking.pk,
+        'name': booking.name,
+        'email': booking.email,
+        'user_email': booking.user.email if booking.user else '',
+        'industrial': booking.industrial.name,
+        'plan': booking.plan,
+        'amount': str(booking.amount),
+        'status': booking.status,
+        'date': date_format(timezone.localtime(booking.created_at), 'M j, Y'),
+    }
+
+
+def enquiry_event(enquiry):
+    return {
+        'id': enquiry.pk,
+        'name': enquiry.name,
+        'city': enquiry.city,
+        'phone': enquiry.phone,
+        'option': enquiry.option,
+        'travel_date': date_format(enquiry.travel_date, 'M j, Y'),
+        'status': enquiry.status,
+        'date': date_format(timezone.localtime(enquiry.created_at), 'M j'),
+    }
+
+
+def changes_since(marks):
+    """New bookings/enquiries above `marks`; returns (update or None, new marks)."""
+    bookings = list(
+        Booking.objects.select_related('user', 'industrial')
+        .filter(pk__gt=marks['booking']).order_by('pk')[:BATCH_LIMIT]
+    )
+    enquiries = list(Enquiry.objects.filter(pk__gt=marks['enquiry']).order_by('pk')[:BATCH_LIMIT])
+    if not bookings and not enquiries:
+        return None, marks
+    marks = {
+        'booking': bookings[-1].pk if bookings else marks['booking'],
+        'enquiry': enquiries[-1].pk if enquiries else marks['enquiry'],
+    }
+    update = {
+        'bookings': [booking_event(booking) for booking in bookings],
+        'enquiries': [enquiry_event(enquiry) for enquiry in enquiries],
+        'counters': counters(),
+        # A full batch means there may be more; the next wake-up sends them.
+        'partial': len(bookings) == BATCH_LIMIT or len(enquiries) == BATCH_LIMIT,
+    }
+    return update, marks
+
+
+def encode_marks(marks):
+    return f"{marks['booking']}.{marks['enquiry']}"
+
+
+def decode_marks(value):
+    try:
+        booking, enquiry = (int(part) for part in (value or '').split('.'))
+    except ValueError:
+        return None
+    return {'booking': booking, 'enquiry': enquiry}
+
+
+def notify(model_name, pk):
+    """Wake the hubs listening on PostgreSQL; a no-op on other databases."""
+    if connection.vendor != 'postgresql':
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [LIVE_CHANNEL, f'{model_name}:{pk}'])
+    except DatabaseError:
+        # The fallback poll still picks the row up.
+        logger.exception('Sending the live dashboard notification failed')
+
+
+# ─── Hub ──────────────────────────────────────────────────────
+
+class Hub:
+    """Fans changes out to the subscribed streams of this process."""
+
+    queue_size = 100
+
+    def __init__(self):
+        self.subscribers = set()
+        self.loop = None
+        self.task = None
+        self.wakeup = None
+        self.listening = False
+
+    def subscribe(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            self.loop, self.task, self.wakeup = loop, None, asyncio.Event()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        if self.task is None:
+            self.task = loop.create_task(self._run())
+        self._start_listener()
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def wake(self):
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def _interval(self):
+        if self.listening:
+            return _setting('LIVE_FALLBACK_INTERVAL', 30)
+        return _setting('LIVE_POLL_INTERVAL', 2)
+
+    async def _run(self):
+        try:
+            marks = await sync_to_async(high_water_marks)()
+            while self.subscribers:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=self._interval())
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                try:
+                    update, marks = await sync_to_async(changes_since)(marks)
+                except DatabaseError:
+                    logger.exception('Reading live dashboard changes failed')
+                    await sync_to_async(connections.close_all)()
+                    continue
+                if update is not None:
+                    self._broadcast((encode_marks(marks), update))
+        finally:
+            # Restarted by the next subscribe() once every tab has gone.
+            self.task = None
+
+    def _broadcast(self, message):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind: end that stream; the browser reconnects
+                # and catches up from its Last-Event-ID.
+                self.subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    # PostgreSQL LISTEN, in a daemon thread per process.
+
+    def _start_listener(self):
+        if self.listening or connection.vendor != 'postgresql':
+            return
+        self.listening = True
+        threading.Thread(target=self._listen, name='live-listener', daemon=True).start()
+
+    def _listen(self):
+        db = connections['default']
+        while True:
+            raw = None
+            try:
+                raw = db.get_new_connection(db.get_connection_params())
+                raw.autocommit = True
+                raw.cursor().execute(f'LISTEN {LIVE_CHANNEL}')
+                if hasattr(raw, 'poll'):  # psycopg2
+                    while True:
+                        if select.select([raw], [], [], 60)[0]:
+                            raw.poll()
+                            if raw.notifies:
+                                raw.notifies.clear()
+                                self.wake()
+                else:  # psycopg 3
+                    while True:
+                        for _ in raw.notifies(timeout=60):
+                            self.wake()
+            except Exception:
+                logger.exception('Live dashboard listener lost its connection; retrying')
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+                time.sleep(5)
+
+
+hub = Hub()
+
+
+# ─── Stream ───────────────────────────────────────────────────
+
+def _event(event_id, update):
+    return f'id: {event_id}\nevent: changes\ndata: {json.dumps(update)}\n\n'
+
+
+async def event_stream(last_event_id=None):
+    """Server-sent events for one admin tab."""
+    queue = hub.subscribe()
+    heartbeat = _setting('LIVE_HEARTBEAT', 15)
+    try:
+        yield 'retry: 3000\n\n'
+        marks = decode_marks(last_event_id)
+        if marks is not None:
+            update, marks = await sync_to_async(changes_since)(marks)
+            if update is not None:
+                yield _event(encode_marks(marks), update)
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection.
+                yield ': keepalive\n\n'
+                continue
+            if message is None:
+                return
+            yield _event(*message)
+    finally:
+        hub.unsubscribe(queue)
+
+
+# ─── ASGI ─────────────────────────────────────────────────────
+
+def _admin_user(request):
+    from .views import admin_check
+
+    try:
+        request.get_host()  # ALLOWED_HOSTS
+        engine = import_module(settings.SESSION_ENGINE)
+        request.session = engine.SessionStore(request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+        user = get_user(request)
+        return user if user.is_authenticated and admin_check(user) else None
+    except DisallowedHost:
+        return None
+    finally:
+        close_old_connections()
+
+
+async def _send_json(send, status, body):
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', b'application/json'), (b'cache-control', b'no-store'),
+    ]})
+    await send({'type': 'http.response.body', 'body': json.dumps(body).encode()})
+
+
+async def serve_stream(scope, receive, send):
+    """The live stream as a bare ASGI app: session auth, then events until the tab goes."""
+    request = ASGIRequest(scope, None)
+    user = await sync_to_async(_admin_user)(request)
+    if user is None:
+        await _send_json(send, 403, {'status': 'error', 'message': 'Admins only.'})
+        return
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [
+        (b'content-type', b'text/event-stream'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),
+    ]})
+
+    stream = event_stream(request.headers.get('Last-Event-ID'))
+
+    async def pump():
+        async for chunk in stream:
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    pumping = asyncio.ensure_future(pump())
+    waiting = asyncio.ensure_future(disconnected())
+    try:
+        await asyncio.wait([pumping, waiting], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        pumping.cancel()
+        waiting.cancel()
+        await asyncio.gather(pumping, waiting, return_exceptions=True)
+        await stream.aclose()
+    if not waiting.cancelled():
+        return  # the tab went away
+    if not pumping.cancelled() and pumping.exception() is not None:
+        logger.error('Live dashboard stream failed', exc_info=pumping.exception())
+    # The hub ended the stream (client too slow); the browser reconnects.
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+class LiveStreamRouter:
+    """ASGI wrapper: the live stream path goes to serve_stream, the rest to Django."""
+
+    def __init__(self, app):
+        self.app = app
+        self.path = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            if self.path is None:
+                self.path = reverse('admin_live_stream')
+            if scope['path'] == self.path and scope['method'] == 'GET':
+                return await serve_stream(scope, receive, send)
+        return await self.app(scope, receive, send)
@@ -0,0 +1,184 @@
+"""
+Structured logging.
+
+Every record becomes one JSON line on stdout, tagged with the id of the
+request that logged it. Loggers only put records on a bounded in-memory
+queue (QueueHandler below); a single listener thread formats and writes
+them, so request threads never wait on JSON encoding or a slow stdout pipe.
+If the listener falls behind, records are dropped and counted rather than
+blocking the request.
+
+RequestLogMiddleware assigns the request id (taken from X-Request-ID when
+the proxy sets one) and logs one "request" line per response with its
+status, duration and query count. At high traffic set LOG_REQUEST_SAMPLE_RATE
+below 1: server errors and requests slower than LOG_SLOW_REQUEST_MS are
+always logged, the rest only at that rate, and unsampled requests never
+create a log record.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+import traceback
+import uuid
+from contextlib import ExitStack
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+
+
+_request_id = ContextVar('request_id', default=None)
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# LogRecord attributes that aren't `extra=` fields
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+
+# ─── Formatting ───────────────────────────────────────────────
+
+class RequestIdFilter(logging.Filter):
+    """Tags records with the current request id; runs on the logging thread."""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            # django.request logs 5xx responses after the middleware returns.
+            record.request_id = _request_id.get() or getattr(getattr(record, 'request', None), 'request_id', None)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with any `extra=` fields at the top level."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_type'] = record.exc_info[0].__name__
+            entry['exc'] = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+# ─── Handler ──────────────────────────────────────────────────
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a listener thread that formats and writes them to
+    stdout. The formatter configured for this handler is used by the
+    listener; filters still run on the logging thread.
+    """
+
+    def __init__(self, queue_size=10000, stream=None):
+        super().__init__(None)
+        self.queue_size = queue_size
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.dropped = 0
+        self.start()
+        if hasattr(os, 'register_at_fork'):
+            # Threads don't survive fork(): gunicorn preloads the app in the
+            # master, so every worker needs its own queue and listener.
+            os.register_at_fork(after_in_child=self.start)
+
+    def start(self):
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # The stock prepare() formats the message and traceback here, on the
+        # logging thread, so records can be pickled. This queue never leaves
+        # the process: hand the record over as is and format it in the
+        # listener.
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            # Not exact under contention; it only has to show that logs were lost.
+            record.dropped_before, self.dropped = self.dropped, 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1 + getattr(record, 'dropped_before', 0)
+
+    def close(self):
+        # Called by logging.shutdown() at exit: drains the queue first.
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            self.target.close()
+        super().close()
+
+
+# ─── Middleware ───────────────────────────────────────────────
+
+request_logger = logging.getLogger('dudu.request')
+
+
+def _count_queries(counter, execute, sql, params, many, context):
+    counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+class RequestLogMiddleware:
+    """Request ids, and one sampled log line per request; place it near the top."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rate = getattr(settings, 'LOG_REQUEST_SAMPLE_RATE', 1.0)
+        self.slow = getattr(settings, 'LOG_SLOW_REQUEST_MS', 1000) / 1000
+
+    def __call__(self, request):
+        incoming = request.headers.get('X-Request-ID', '')
+        request.request_id = incoming if _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = _request_id.set(request.request_id)
+        queries = [0]
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(partial(_count_queries, queries)))
+                response = self.get_response(request)
+            response['X-Request-ID'] = request.request_id
+            self.log(request, response.status_code, time.perf_counter() - started, queries[0])
+            return response
+        finally:
+            _request_id.reset(token)
+
+    def log(self, request, status, elapsed, queries):
+        if status < 500 and elapsed < self.slow and (self.rate <= 0 or random.random() >= self.rate):
+            return
+        match = getattr(request, 'resolver_match', None)
+        level = logging.ERROR if status >= 500 else logging.WARNING if elapsed >= self.slow else logging.INFO
+        request_logger.log(level, '%s %s %s', request.method, request.path, status, extra={
+            'method': request.method,
+            'path': request.path,
+            'status': status,
+            'view': match.view_name if match else None,
+            'duration_ms': round(elapsed * 1000, 1),
+            'db_queries': queries,
+            # Only if the view loaded the user; don't query for it here.
+            'user_id': getattr(getattr(request, '_cached_user', None), 'pk', None),
+            'sample_rate': self.rate,
+        })
+
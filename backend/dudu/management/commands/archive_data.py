@@ -0,0 +1,52 @@
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from dudu import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move bookings (with their payments) and enquiries older than a cutoff "
+        "into gzip JSONL files under ARCHIVE_DIR, partitioned by month, with a "
+        "SHA-256 checksum per file. Restore them with restore_archive."
+    )
+
+    def add_arguments(self, parser):
+        cutoff = parser.add_mutually_exclusive_group()
+        cutoff.add_argument('--before', help='Archive rows created before this date (YYYY-MM-DD).')
+        cutoff.add_argument(
+            '--days', type=int,
+            help='Archive rows older than this many days (default: ARCHIVE_AFTER_DAYS).',
+        )
+        parser.add_argument(
+            '--models', nargs='+', choices=list(archive.ARCHIVABLE), default=list(archive.ARCHIVABLE),
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--path', help='Archive directory (default: ARCHIVE_DIR).')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be archived.')
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                day = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before must be a date in YYYY-MM-DD format.')
+            cutoff = timezone.make_aware(datetime.combine(day, time.min))
+        else:
+            days = options['days'] if options['days'] is not None else settings.ARCHIVE_AFTER_DAYS
+            cutoff = timezone.now() - timedelta(days=days)
+
+        directory = Path(options['path']) if options['path'] else archive.archive_dir()
+        for name in options['models']:
+            counts = archive.archive(
+                name, cutoff, batch_size=options['batch_size'],
+                directory=directory, dry_run=options['dry_run'],
+            )
+            summary = ', '.join(f'{count} {model}' for model, count in sorted(counts.items())) or 'nothing'
+            verb = 'Would archive' if options['dry_run'] else 'Archived'
+            self.stdout.write(f"{verb} {summary} created before {cutoff:%Y-%m-%d}.")
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dudu import availability
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-day availability calendar from the Booking and Enquiry "
+        "tables. Needed once after deploying, and after bulk imports that "
+        "bypass model signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild days on or after this date (YYYY-MM-DD). Default: everything.',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format.')
+
+        rows = availability.backfill(since)
+        self.stdout.write(f'Wrote {rows} availability rows.')
+        self.stdout.write(self.style.SUCCESS('Done!'))
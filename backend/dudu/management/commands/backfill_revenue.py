@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dudu import revenue
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily booking/payment revenue rollups from the Booking and "
+        "Payment tables. Needed once after deploying, and after bulk imports "
+        "that bypass model signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild days on or after this date (YYYY-MM-DD). Default: everything.',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format.')
+
+        result = revenue.backfill(since)
+        self.stdout.write(
+            f"Wrote {result['bookings']} booking and {result['payments']} payment rollup rows."
+        )
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from dudu import recommendations
+
+LAST_REFRESH_KEY = 'recommendations:last-refresh'
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the industrial co-booking matrix and precompute 'similar visits'. "
+        "Run a full rebuild nightly and --incremental every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Only re-rank industrials whose matrix rows changed since the last run.',
+        )
+
+    def handle(self, *args, **options):
+        started = timezone.now()
+        if options['incremental']:
+            since = cache.get(LAST_REFRESH_KEY) or started - timedelta(days=1)
+            result = recommendations.refresh_changed(since)
+            self.stdout.write(
+                f"Re-ranked {result['industrials']} industrials ({result['recommendations']} recommendations)."
+            )
+        else:
+            result = recommendations.rebuild_all()
+            # Rows written by the rebuild itself don't need re-ranking again.
+            started = timezone.now()
+            self.stdout.write(
+                f"Built {result['cells']} matrix cells for {result['industrials']} industrials "
+                f"({result['recommendations']} recommendations)."
+            )
+        cache.set(LAST_REFRESH_KEY, started, timeout=None)
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from dudu import views
+from dudu.middleware import CSRF_PLACEHOLDER, PAGE_CACHE_VIEWS
+from dudu.models import Industrial, IndustrialRecommendation, IndustrialViewRollup
+
+# Columns no exported page shows; leaving them out of the fingerprints keeps
+# every page view (visit_count) and rollup run (trending_score) from forcing
+# a re-render. The home page's trending order is its own input (see
+# _trending_digest).
+UNRENDERED_FIELDS = {'industrial': ('visit_count', 'trending_score')}
+
+STATE_FILE = '.export.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render the public pages (PAGE_CACHE_VIEWS) and every industrial "
+        "detail page into docs/ for serving from a CDN, with hashed static "
+        "URLs. Pages whose data, templates and assets are unchanged since the "
+        "last export are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Directory to write to (default: STATIC_EXPORT_DIR).')
+        parser.add_argument('--host', help='Host name the pages are rendered for (default: first ALLOWED_HOSTS entry).')
+        parser.add_argument('--force', action='store_true', help='Re-render every page.')
+        parser.add_argument('--dry-run', action='store_true', help='List the pages that would be written.')
+
+    def handle(self, *args, **options):
+        if not staticfiles_storage.hashed_files:
+            raise CommandError('No staticfiles manifest; run `manage.py collectstatic` first.')
+        output = Path(options['output'] or getattr(settings, 'STATIC_EXPORT_DIR', settings.BASE_DIR.parent / 'docs'))
+        self.factory = RequestFactory()
+        self.host = options['host'] or next(
+            (host for host in settings.ALLOWED_HOSTS if host and host[0] not in '.*'), 'localhost',
+        )
+
+        state_path = output / STATE_FILE
+        state = json.loads(state_path.read_text()) if state_path.exists() and not options['force'] else {}
+        shared = self._shared_inputs()
+        written = skipped = 0
+        pages = {}
+        for path, inputs, render in self._pages():
+            fingerprint = self._fingerprint(shared, inputs)
+            pages[path] = fingerprint
+            target = output / self._file_for(path)
+            if state.get(path) == fingerprint and target.exists():
+                skipped += 1
+                continue
+            written += 1
+            if options['dry_run']:
+                self.stdout.write(f'  {path} -> {target}')
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(self._rewrite_assets(render()), encoding='utf-8')
+
+        removed = [path for path in state if path not in pages]
+        if options['dry_run']:
+            self.stdout.write(f'Would write {written} pages, skip {skipped}, remove {len(removed)}.')
+            return
+        for path in removed:
+            (output / self._file_for(path)).unlink(missing_ok=True)
+        copied = self._copy_static(output)
+        state_path.write_text(json.dumps(pages, indent=1, sort_keys=True))
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {written} pages ({skipped} unchanged, {len(removed)} removed) '
+            f'and {copied} static files to {output}.'
+        ))
+
+    # ─── Pages ────────────────────────────────────────────────
+
+    def _pages(self):
+        """(URL path, inputs, render()) for every exported page."""
+        for url_name, dependencies in PAGE_CACHE_VIEWS.items():
+            path = reverse(url_name)
+            inputs = [
+                self._trending_digest() if name == 'trending' else self._table_digest(name)
+                for name in sorted(dependencies)
+            ]
+            yield path, inputs, lambda path=path: self._render_view(path)
+
+        recommendations = {}
+        for row in (
+            IndustrialRecommendation.objects.order_by('industrial_id', 'rank')
+            .values_list('industrial_id', 'rank', 'score', 'recommended_id')
+        ):
+            recommendations.setdefault(row[0], []).append(row[1:])
+        rows = {row['id']: row for row in Industrial.objects.values(*self._rendered_fields('industrial'))}
+        for industrial in Industrial.objects.filter(status='active').order_by('pk'):
+            similar = recommendations.get(industrial.pk, [])
+            # The page shows the recommended industrials too.
+            inputs = [rows[industrial.pk], similar, [rows.get(r[-1]) for r in similar]]
+            path = reverse('industrial_detail', args=[industrial.pk])
+            yield path, inputs, lambda industrial=industrial: self._render_detail(industrial)
+
+    def _request(self, path):
+        request = self.factory.get(path, secure=True, HTTP_HOST=self.host)
+        request.user = AnonymousUser()
+        request.session = SessionBase()
+        # Rendered like a page-cache fill; the placeholder is removed below.
+        request._page_cache_csrf = CSRF_PLACEHOLDER
+        return request
+
+    def _render_view(self, path):
+        match = resolve(path)
+        request = self._request(path)
+        request.resolver_match = match
+        return self._content(match.func(request, *match.args, **match.kwargs), path)
+
+    def _render_detail(self, industrial):
+        path = reverse('industrial_detail', args=[industrial.pk])
+        request = self._request(path)
+        request.resolver_match = resolve(path)
+        return self._content(views.render_industrial_detail(request, industrial), path)
+
+    def _content(self, response, path):
+        if response.status_code != 200:
+            raise CommandError(f'{path} rendered with status {response.status_code}.')
+        # A CDN page can't carry a per-visitor token; forms posting back to
+        # the origin get theirs from the csrftoken cookie.
+        return response.content.decode('utf-8').replace(CSRF_PLACEHOLDER, '')
+
+    def _file_for(self, path):
+        return path.strip('/') + '/index.html' if path.strip('/') else 'index.html'
+
+    # ─── Fingerprints ─────────────────────────────────────────
+
+    def _shared_inputs(self):
+        """Digest of what every page depends on: templates and static assets."""
+        digest = hashlib.sha256(staticfiles_storage.manifest_hash.encode())
+        for directory in self._template_dirs():
+            for path in sorted(directory.rglob('*.html')):
+                digest.update(str(path.relative_to(directory)).encode())
+                digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    def _template_dirs(self):
+        dirs = [Path(d) for engine in settings.TEMPLATES for d in engine.get('DIRS', [])]
+        dirs += [Path(config.path) / 'templates' for config in apps.get_app_configs()
+                 if config.name.startswith('dudu') and (Path(config.path) / 'templates').is_dir()]
+        return dirs
+
+    def _rendered_fields(self, model_name):
+        model = apps.get_model('dudu', model_name)
+        skip = UNRENDERED_FIELDS.get(model_name, ())
+        return [field.attname for field in model._meta.concrete_fields if field.name not in skip]
+
+    def _table_digest(self, model_name):
+        if not hasattr(self, '_tables'):
+            self._tables = {}
+        if model_name not in self._tables:
+            model = apps.get_model('dudu', model_name)
+            digest = hashlib.sha256()
+            rows = model.objects.order_by('pk').values_list(*self._rendered_fields(model_name))
+            for row in rows.iterator(chunk_size=5000):
+                digest.update(repr(row).encode())
+            self._tables[model_name] = digest.hexdigest()
+        return self._tables[model_name]
+
+    def _trending_digest(self):
+        """The home page's trending order and the view rollups behind it."""
+        if not hasattr(self, '_trending'):
+            digest = hashlib.sha256()
+            digest.update(repr(list(views.trending_industrials().values_list('pk', flat=True))).encode())
+            rollups = IndustrialViewRollup.objects.order_by('pk').values_list(
+                'industrial_id', 'period', 'period_start', 'views',
+            )
+            for row in rollups.iterator(chunk_size=5000):
+                digest.update(repr(row).encode())
+            self._trending = digest.hexdigest()
+        return self._trending
+
+    def _fingerprint(self, shared, inputs):
+        return hashlib.sha256(f'{shared}:{inputs!r}'.encode()).hexdigest()
+
+    # ─── Static Files ─────────────────────────────────────────
+
+    def _rewrite_assets(self, html):
+        """
+        Point /static/ URLs at their hashed names: the ones hard-coded in
+        templates, and every {% static %} URL when DEBUG leaves them plain.
+        """
+        prefix = '/' + settings.STATIC_URL.strip('/') + '/'
+        pattern = re.compile(r'''((?:src|href)=["'])''' + re.escape(prefix) + r'''([^"'?#]+)''')
+
+        def hashed(match):
+            name = match.group(2)
+            if name in staticfiles_storage.hashed_files:
+                return match.group(1) + staticfiles_storage.url(name, force=True)
+            return match.group(0)
+
+        return pattern.sub(hashed, html)
+
+    def _copy_static(self, output):
+        """Copy the hashed static files; their names change with their content."""
+        target_root = output / settings.STATIC_URL.strip('/')
+        copied = 0
+        for name in set(staticfiles_storage.hashed_files.values()):
+            target = target_root / name
+            if target.exists():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(staticfiles_storage.path(name), target)
+            copied += 1
+        return copied
@@ -0,0 +1,277 @@
+import random
+from array import array
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from dudu import availability, revenue
+from dudu.bulk import backdated
+from dudu.middleware import purge_pages
+from dudu.models import Booking, Enquiry, Feedback, Industrial, Payment, UserProfile
+
+FIRST_NAMES = [
+    "Rahul", "Priya", "Amit", "Sneha", "Sanjay", "Anjali", "Vikram", "Deepa", "Arjun", "Kavita",
+    "Rohan", "Meera", "Karthik", "Divya", "Suresh", "Lakshmi", "Naveen", "Pooja", "Imran", "Fatima",
+]
+LAST_NAMES = [
+    "Sharma", "Verma", "Gupta", "Patel", "Reddy", "Nair", "Iyer", "Singh", "Joshi", "Das",
+    "Khan", "Menon", "Rao", "Pillai", "Mehta", "Bose", "Kulkarni", "Chopra",
+]
+CITIES = ["Mumbai", "Delhi", "Bengaluru", "Chennai", "Hyderabad", "Pune", "Kolkata", "Ahmedabad", "Coimbatore", "Kochi"]
+COLLEGES = ["Engineering College", "Institute of Technology", "Polytechnic", "Arts & Science College"]
+PAYMENT_METHODS = ['upi', 'card', 'netbanking', 'wallet']
+ENQUIRY_OPTIONS = ["Industrial Info", "Custom Visit", "Pricing Query", "Group Booking"]
+FEEDBACK_MESSAGES = [
+    "Very well organised visit, the students learnt a lot.",
+    "Great coordination from the DUDU team throughout the trip.",
+    "The plant tour was informative and the guides were helpful.",
+    "Good experience overall, transport could have been better.",
+    "Excellent exposure to real industry practices.",
+    "Smooth booking and a memorable trip for our department.",
+]
+
+# (payment_status, booking status, weight)
+OUTCOMES = [
+    ('completed', 'confirmed', 85),
+    ('pending', 'pending', 10),
+    ('failed', 'cancelled', 5),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large, deterministic synthetic dataset (users, profiles, "
+        "bookings, payments, enquiries, feedback) for benchmarks and staging. "
+        "Rows are written with bulk_create in batches; every generated user "
+        "shares one precomputed password hash."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Users (with profiles) to create.')
+        parser.add_argument('--bookings', type=int, default=5000, help='Bookings to create.')
+        parser.add_argument('--enquiries', type=int, help='Enquiries to create (default: bookings / 2).')
+        parser.add_argument('--feedback', type=int, help='Feedback entries to create (default: bookings / 10).')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed yields the same data.')
+        parser.add_argument('--days', type=int, default=730, help='Spread rows over this many days of history.')
+        parser.add_argument('--until', help='Last day of history (YYYY-MM-DD, default: today).')
+        parser.add_argument('--password', default='password123', help='Password for every generated user.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--no-rollups', action='store_true',
+            help=(
+                "Don't rebuild the revenue rollups and the availability calendar "
+                "afterwards (bulk_create bypasses their signals)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = f"gen{options['seed']}."
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(
+                f"Users for seed {options['seed']} already exist; pick another --seed."
+            )
+
+        try:
+            until = date.fromisoformat(options['until']) if options['until'] else timezone.localdate()
+        except ValueError:
+            raise CommandError('--until must be a date in YYYY-MM-DD format.')
+        self.end = timezone.make_aware(datetime.combine(until, time.max))
+        self.span = timedelta(days=options['days']).total_seconds()
+
+        self.industrials = self._industrials()
+        self.user_ids = self._create_users(options['users'], make_password(options['password']))
+        self._create_bookings(options['bookings'])
+        self._create_enquiries(options['bookings'] // 2 if options['enquiries'] is None else options['enquiries'])
+        self._create_feedback(options['bookings'] // 10 if options['feedback'] is None else options['feedback'])
+
+        if not options['no_rollups']:
+            result = revenue.backfill()
+            self.stdout.write(f"Rebuilt {result['bookings'] + result['payments']} revenue rollup rows.")
+            self.stdout.write(f"Rebuilt {availability.backfill()} availability rows.")
+        purge_pages('feedback')
+        self.stdout.write("Run `manage.py build_recommendations` to refresh recommendations.")
+        self.stdout.write(self.style.SUCCESS('Done!'))
+
+    # ─── Helpers ──────────────────────────────────────────────
+
+    def _when(self):
+        return self.end - timedelta(seconds=self.rng.random() * self.span)
+
+    def _person(self, index):
+        first = FIRST_NAMES[index % len(FIRST_NAMES)]
+        last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        return first, last
+
+    def _phone(self):
+        return f"9{self.rng.randrange(10 ** 9):09d}"
+
+    def _batches(self, total, build):
+        """Call build(offset, size) batch by batch, one transaction per batch."""
+        done = 0
+        while done < total:
+            size = min(self.batch_size, total - done)
+            with transaction.atomic():
+                build(done, size)
+            done += size
+        return done
+
+    def _report(self, label, count):
+        self.stdout.write(f"Created {count} {label}.")
+
+    # ─── Generators ───────────────────────────────────────────
+
+    def _industrials(self):
+        industrials = list(Industrial.objects.filter(status='active').order_by('id').values_list('id', 'price', 'location'))
+        if not industrials:
+            for city in CITIES[:6]:
+                Industrial.objects.create(
+                    name=f"{city} Industrial Tour", location=city,
+                    description=f"A guided industrial visit in {city}.",
+                    price=self.rng.randint(15, 50) * 100, duration='1 Day',
+                )
+            industrials = list(Industrial.objects.filter(status='active').order_by('id').values_list('id', 'price', 'location'))
+        # A long tail: a few destinations get most of the bookings.
+        self.weights = [1 / (rank + 1) for rank in range(len(industrials))]
+        self.rng.shuffle(industrials)
+        return industrials
+
+    def _create_users(self, total, password_hash):
+        ids = array('q')
+
+        def build(offset, size):
+            users = []
+            for i in range(offset, offset + size):
+                first, last = self._person(i)
+                username = f"{self.prefix}{first.lower()}.{last.lower()}{i}"
+                users.append(User(
+                    username=username, email=f"{username}@example.com",
+                    first_name=first, last_name=last, password=password_hash,
+                    date_joined=self._when(),
+                ))
+            # bulk_create skips the post_save signal that creates profiles.
+            User.objects.bulk_create(users)
+            created = dict(
+                User.objects.filter(username__in=[u.username for u in users]).values_list('username', 'id')
+            )
+            profiles = []
+            for user in users:
+                user_id = created[user.username]
+                ids.append(user_id)
+                profiles.append(UserProfile(
+                    user_id=user_id, role='customer', phone=self._phone(),
+                    city=self.rng.choice(CITIES), created_at=user.date_joined,
+                ))
+            UserProfile.objects.bulk_create(profiles)
+
+        with backdated(UserProfile):
+            self._report('users and profiles', self._batches(total, build))
+        return ids
+
+    def _create_bookings(self, total):
+        outcomes = [outcome[:2] for outcome in OUTCOMES]
+        outcome_weights = [outcome[2] for outcome in OUTCOMES]
+
+        def build(offset, size):
+            bookings = []
+            for i in range(offset, offset + size):
+                industrial_id, price, _ = self.rng.choices(self.industrials, self.weights)[0]
+                plan = 'advance' if self.rng.random() < 0.3 else 'full'
+                people = self.rng.randint(20, 120)
+                # Per person, as on the payment page
+                amount = price * people
+                if plan != 'full':
+                    amount = (amount * Decimal('0.30')).quantize(Decimal('0.01'))
+                payment_status, status = self.rng.choices(outcomes, outcome_weights)[0]
+                created = self._when()
+                # One in ten bookings is made by a guest without an account.
+                if self.user_ids and self.rng.random() >= 0.1:
+                    index = self.rng.randrange(len(self.user_ids))
+                    user_id = self.user_ids[index]
+                    first, last = self._person(index)
+                    email = f"{self.prefix}{first.lower()}.{last.lower()}{index}@example.com"
+                else:
+                    user_id = None
+                    first, last = self._person(self.rng.randrange(10 ** 6))
+                    email = f"guest.{self.prefix}{i}@example.com"
+                bookings.append(Booking(
+                    user_id=user_id, industrial_id=industrial_id, name=f"{first} {last}",
+                    email=email, phone=self._phone(), plan=plan, amount=amount,
+                    payment_method=self.rng.choice(PAYMENT_METHODS),
+                    payment_status=payment_status, status=status, created_at=created,
+                    travel_date=(created + timedelta(days=self.rng.randint(10, 90))).date(),
+                    no_of_people=people,
+                ))
+            if connection.features.can_return_rows_from_bulk_insert:
+                Booking.objects.bulk_create(bookings)
+            else:
+                # MySQL doesn't return ids from bulk inserts; the batch gets
+                # the ids after the current maximum, in insertion order.
+                last = Booking.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+                Booking.objects.bulk_create(bookings)
+                pks = Booking.objects.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)
+                for booking, pk in zip(bookings, pks):
+                    booking.pk = pk
+            Payment.objects.bulk_create([
+                Payment(
+                    booking_id=booking.pk, amount=booking.amount,
+                    payment_status=booking.payment_status,
+                    transaction_id=f"TXN-{booking.pk}-{int(booking.amount)}",
+                    created_at=booking.created_at + timedelta(minutes=self.rng.randint(1, 30)),
+                )
+                for booking in bookings if booking.payment_status != 'pending'
+            ])
+
+        with backdated(Booking, Payment):
+            self._report('bookings with payments', self._batches(total, build))
+
+    def _create_enquiries(self, total):
+        def build(offset, size):
+            enquiries = []
+            for i in range(offset, offset + size):
+                first, last = self._person(self.rng.randrange(10 ** 6))
+                created = self._when()
+                # Half the enquiries name a destination, like the real form.
+                industrial_id = None
+                if self.industrials and self.rng.random() < 0.5:
+                    industrial_id, _, location = self.rng.choices(self.industrials, self.weights)[0]
+                    option = f"Visit to {location}"
+                else:
+                    option = self.rng.choice(ENQUIRY_OPTIONS)
+                enquiries.append(Enquiry(
+                    name=f"{first} {last}", email=f"lead.{self.prefix}{i}@example.com",
+                    city=f"{self.rng.choice(CITIES)} {self.rng.choice(COLLEGES)}",
+                    phone=self._phone(), option=option, industrial_id=industrial_id,
+                    travel_date=(created + timedelta(days=self.rng.randint(10, 90))).date(),
+                    no_of_people=self.rng.randint(20, 120),
+                    status=self.rng.choices(['pending', 'contacted', 'closed'], [3, 4, 3])[0],
+                    created_at=created,
+                ))
+            Enquiry.objects.bulk_create(enquiries)
+
+        with backdated(Enquiry):
+            self._report('enquiries', self._batches(total, build))
+
+    def _create_feedback(self, total):
+        def build(offset, size):
+            feedback = []
+            for _ in range(size):
+                index = self.rng.randrange(len(self.user_ids)) if self.user_ids else None
+                first, last = self._person(index if index is not None else self.rng.randrange(10 ** 6))
+                feedback.append(Feedback(
+                    user_id=self.user_ids[index] if index is not None else None,
+                    industrial_id=self.rng.choices(self.industrials, self.weights)[0][0],
+                    name=f"{first} {last}", message=self.rng.choice(FEEDBACK_MESSAGES),
+                    rating=self.rng.choices([5, 4, 3, 2, 1], [50, 30, 12, 5, 3])[0],
+                    is_approved=self.rng.random() < 0.8, created_at=self._when(),
+                ))
+            Feedback.objects.bulk_create(feedback)
+
+        with backdated(Feedback):
+            self._report('feedback entries', self._batches(total, build))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from dudu import payments
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply queued payment-gateway webhook events to Payment/Booking rows "
+        "in batches. Run every minute, or continuously with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running, polling the queue every --interval seconds.',
+        )
+        parser.add_argument('--interval', type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        while True:
+            outcomes = payments.reconcile(batch_size=options['batch_size'])
+            if outcomes or not options['loop']:
+                self.stdout.write(
+                    f"Applied {outcomes['applied']} events, ignored {outcomes['ignored']}, "
+                    f"{outcomes['retrying']} to retry."
+                )
+            if not options['loop']:
+                break
+            connections.close_all()
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,180 @@
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+
+from dudu import payments, views
+from dudu.models import Booking, Industrial, Payment, PaymentEvent
+
+# Synthetic scenarios: (event types in gateway order, final payment status)
+SCENARIOS = [
+    (['payment.authorized', 'payment.captured', 'order.paid'], 'completed'),
+    (['payment.failed', 'payment.authorized', 'payment.captured'], 'completed'),
+    (['payment.authorized', 'payment.failed'], 'failed'),
+    (['payment.authorized', 'payment.captured', 'refund.processed'], 'refunded'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Local webhook stub: replay recorded (or synthetic) Razorpay webhook "
+        "events against the webhook endpoint, with duplicates and in random "
+        "order, reconciling as it goes, and check the final payment states."
+    )
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--file', help='Replay events from a JSONL file of {"event_id", "payload"} lines.')
+        source.add_argument('--synthetic', type=int, help='Create N pending test payments and replay their events.')
+        source.add_argument('--export', help='Write the recorded PaymentEvents to this JSONL file and exit.')
+        parser.add_argument('--save', help='Also write the generated events to this JSONL file.')
+        parser.add_argument('--duplicates', type=int, default=2, help='Deliver every event this many times.')
+        parser.add_argument('--reconcile-every', type=int, default=250, help='Reconcile after this many deliveries.')
+        parser.add_argument('--url', help='POST to a running server instead of calling the view in-process.')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent senders with --url.')
+        parser.add_argument('--secret', help='Webhook secret (default: RAZORPAY_WEBHOOK_SECRET).')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options['export']:
+            return self._export(options['export'])
+
+        secret = options['secret'] or settings.RAZORPAY_WEBHOOK_SECRET or 'local-webhook-stub'
+        self.rng = random.Random(options['seed'])
+        if options['file']:
+            events, expected = self._load(options['file']), {}
+        else:
+            events, expected = self._synthetic(options['synthetic'], options['seed'])
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                for event_id, payload in events:
+                    f.write(json.dumps({'event_id': event_id, 'payload': payload}) + '\n')
+
+        deliveries = [event for event in events for _ in range(options['duplicates'])]
+        self.rng.shuffle(deliveries)
+        bodies = [(event_id, json.dumps(payload).encode()) for event_id, payload in deliveries]
+
+        with override_settings(RAZORPAY_WEBHOOK_SECRET=secret):
+            started = time.perf_counter()
+            statuses, outcomes = self._deliver(bodies, secret, options)
+            elapsed = time.perf_counter() - started
+            outcomes.update(payments.reconcile())
+
+        self.stdout.write(
+            f"Delivered {len(bodies)} webhooks ({len(events)} unique) in {elapsed:.2f}s "
+            f"({len(bodies) / elapsed:.0f}/s); responses: {dict(statuses)}."
+        )
+        self.stdout.write(f"Reconciler applied {outcomes['applied']} events, ignored {outcomes['ignored']}.")
+        if expected:
+            self._check(expected)
+        self.stdout.write(self.style.SUCCESS('Done!'))
+
+    # ─── Event Sources ────────────────────────────────────────
+
+    def _load(self, path):
+        events = []
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    events.append((record['event_id'], record['payload']))
+        return events
+
+    def _export(self, path):
+        count = 0
+        with open(path, 'w') as f:
+            for event_id, payload in PaymentEvent.objects.order_by('pk').values_list('event_id', 'payload').iterator():
+                f.write(json.dumps({'event_id': event_id, 'payload': payload}) + '\n')
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} events to {path}."))
+
+    def _synthetic(self, count, seed):
+        industrial = Industrial.objects.filter(status='active').order_by('pk').first()
+        if industrial is None:
+            raise CommandError('Synthetic replay needs at least one active industrial.')
+        run = f'{seed}{int(time.time())}'
+        events, expected = [], {}
+        clock = int(time.time())
+        for i in range(count):
+            booking = Booking.objects.create(
+                industrial=industrial, name='Webhook Stub', email='webhook-stub@example.com',
+                amount=industrial.price, payment_method='upi', payment_status='pending',
+            )
+            order_id = f'order_stub{run}_{i}'
+            payment = Payment.objects.create(booking=booking, amount=industrial.price, gateway_order_id=order_id)
+            types, final = self.rng.choice(SCENARIOS)
+            expected[payment.pk] = final
+            attempt = 0
+            for event_type in types:
+                if event_type == 'payment.failed' and types[0] == event_type:
+                    attempt += 1  # a failed first attempt, then a new payment id
+                clock += 1
+                payment_id = f'pay_stub{run}_{i}_{attempt}'
+                events.append((f'evt_stub{run}_{len(events)}', self._payload(
+                    event_type, order_id, payment_id, booking.pk, int(industrial.price * 100), clock,
+                )))
+        return events, expected
+
+    def _payload(self, event_type, order_id, payment_id, booking_id, amount, created_at):
+        entity = {
+            'id': payment_id, 'entity': 'payment', 'amount': amount, 'currency': 'INR',
+            'status': event_type.split('.')[1], 'order_id': order_id,
+            'notes': {'booking_id': str(booking_id)},
+        }
+        payload = {'payment': {'entity': entity}}
+        if event_type == 'refund.processed':
+            payload['refund'] = {'entity': {'id': f'rfnd_{payment_id}', 'payment_id': payment_id, 'amount': amount}}
+        if event_type == 'order.paid':
+            payload['order'] = {'entity': {'id': order_id, 'amount': amount, 'status': 'paid'}}
+        return {
+            'entity': 'event', 'event': event_type, 'contains': list(payload),
+            'payload': payload, 'created_at': created_at,
+        }
+
+    # ─── Delivery ─────────────────────────────────────────────
+
+    def _deliver(self, bodies, secret, options):
+        statuses = Counter()
+        outcomes = Counter()
+        if options['url']:
+            with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+                statuses.update(pool.map(lambda item: self._post(options['url'], secret, *item), bodies))
+            return statuses, outcomes
+
+        factory = RequestFactory()
+        for n, (event_id, body) in enumerate(bodies, start=1):
+            request = factory.post(
+                '/api/payments/webhook/', body, content_type='application/json',
+                HTTP_X_RAZORPAY_SIGNATURE=payments.sign(body, secret),
+                HTTP_X_RAZORPAY_EVENT_ID=event_id,
+            )
+            statuses[views.payment_webhook(request).status_code] += 1
+            if n % options['reconcile_every'] == 0:
+                outcomes.update(payments.reconcile())
+        return statuses, outcomes
+
+    def _post(self, url, secret, event_id, body):
+        request = urllib.request.Request(url, data=body, method='POST', headers={
+            'Content-Type': 'application/json',
+            'X-Razorpay-Signature': payments.sign(body, secret),
+            'X-Razorpay-Event-Id': event_id,
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def _check(self, expected):
+        actual = dict(Payment.objects.filter(pk__in=expected).values_list('pk', 'payment_status'))
+        wrong = {pk: (status, actual.get(pk)) for pk, status in expected.items() if actual.get(pk) != status}
+        if wrong:
+            raise CommandError(f"{len(wrong)} of {len(expected)} payments ended in the wrong state: {wrong}")
+        self.stdout.write(f"All {len(expected)} payments reached their expected final state.")
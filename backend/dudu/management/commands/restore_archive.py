@@ -0,0 +1,66 @@
+import re
+from collections import Counter
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dudu import archive
+
+MONTH = re.compile(r'^\d{4}-\d{2}$')
+
+
+class Command(BaseCommand):
+    help = (
+        "Load archived bookings/payments/enquiries back into the database. "
+        "Every file's checksum is verified first; rows that already exist are "
+        "skipped, so restoring the same file twice is safe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=list(archive.ARCHIVABLE), help='Default: all models.')
+        parser.add_argument('--since', help='First month to restore (YYYY-MM).')
+        parser.add_argument('--until', help='Last month to restore (YYYY-MM).')
+        parser.add_argument('--path', help='Archive directory (default: ARCHIVE_DIR), or a single .jsonl.gz file.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--force', action='store_true', help='Restore files whose checksum does not match.')
+        parser.add_argument('--remove', action='store_true', help='Delete archive files once restored.')
+
+    def handle(self, *args, **options):
+        for option in ('since', 'until'):
+            if options[option] and not MONTH.match(options[option]):
+                raise CommandError(f'--{option} must be a month in YYYY-MM format.')
+
+        path = Path(options['path']) if options['path'] else archive.archive_dir()
+        if path.is_file():
+            files = [path]
+        else:
+            files = archive.archive_files(options['model'], options['since'], options['until'], path)
+        if not files:
+            self.stdout.write('No archive files matched.')
+            return
+
+        bad = [f for f in files if not archive.verify(f)]
+        if bad and not options['force']:
+            raise CommandError(
+                f"{len(bad)} file(s) failed checksum verification, nothing restored "
+                f"(use --force to restore anyway): " + ', '.join(str(f) for f in bad)
+            )
+
+        # bulk_create sends no signals: archived revenue never left the
+        # rollups, so it mustn't be counted again.
+        totals, skipped = Counter(), 0
+        for f in files:
+            counts, orphans = archive.restore_file(f, batch_size=options['batch_size'])
+            totals.update(counts)
+            skipped += orphans
+            if options['remove']:
+                f.unlink()
+                f.with_name(f.name + '.sha256').unlink(missing_ok=True)
+
+        summary = ', '.join(f'{count} {model}' for model, count in sorted(totals.items())) or 'nothing'
+        self.stdout.write(f"Restored {summary} from {len(files)} file(s).")
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {skipped} rows whose visit no longer exists."
+            ))
+        self.stdout.write(self.style.SUCCESS('Done!'))
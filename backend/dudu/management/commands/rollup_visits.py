@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from dudu import analytics
+from dudu.middleware import purge_pages
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll hourly industrial view buckets up into daily/weekly totals and "
+        "refresh the trending scores used by the home page. Run hourly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=2,
+            help='Recompute rollups for this many recent days (default: 2).',
+        )
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Also delete hourly buckets older than ANALYTICS_BUCKET_RETENTION_DAYS.',
+        )
+
+    def handle(self, *args, **options):
+        analytics.flush_views()
+        since = timezone.now().date() - timedelta(days=options['days'])
+
+        days = analytics.rollup_days(since)
+        weeks = analytics.rollup_weeks(since)
+        changed = analytics.update_trending_scores()
+        if changed:
+            purge_pages('trending')
+        self.stdout.write(f"Rolled up {days} daily and {weeks} weekly rows; {changed} trending scores changed.")
+
+        if options['prune']:
+            pruned = analytics.prune_buckets()
+            self.stdout.write(f"Pruned {pruned} old hourly buckets.")
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,145 @@
+"""
+Worker memory watchdog.
+
+MemoryWatchdogMiddleware reads the worker's resident set size before and
+after every request (/proc/self/statm, a few microseconds) and adds any
+growth to a per-process table keyed by view name. With gthread workers,
+requests running side by side share the growth between them, so treat the
+table as which routes tend to grow a worker, not an exact bill.
+
+A request that grows the worker by more than MEMORY_REQUEST_GROWTH_MB is
+logged. If MEMORY_TRACEMALLOC_FRAMES is set, tracemalloc runs in every
+worker and that log line carries the top allocation sites since the
+previous one. tracemalloc slows requests noticeably, so only turn it on
+while hunting a leak.
+
+Python rarely returns freed memory to the OS, so a worker that rendered one
+huge page stays big. gunicorn.conf.py's post_request hook asks
+over_budget() after each request and, past MEMORY_BUDGET_MB, lets the
+worker finish and exit (the master starts a fresh one), logging the route
+table first.
+"""
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# view name -> [requests, bytes grown, largest growth of one request]
+_routes = {}
+_lock = threading.Lock()
+_baseline = None
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def rss_bytes():
+    """Current resident set size, or None where it can't be read."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # Peak rather than current RSS: KB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# ─── Tracking ─────────────────────────────────────────────────
+
+def note(route, grown):
+    with _lock:
+        row = _routes.setdefault(route, [0, 0, 0])
+        row[0] += 1
+        row[1] += grown
+        row[2] = max(row[2], grown)
+
+
+def report(limit=10):
+    """Routes that grew this worker most, largest first."""
+    with _lock:
+        rows = sorted(_routes.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+    return [
+        {'route': route, 'requests': requests, 'grown_mb': round(grown / MB, 1), 'max_mb': round(largest / MB, 1)}
+        for route, (requests, grown, largest) in rows if grown
+    ]
+
+
+def top_allocations(limit=10):
+    """Allocation sites that grew most since the last call (tracemalloc)."""
+    global _baseline
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    if _baseline is None:
+        stats = snapshot.statistics('lineno')
+    else:
+        stats = snapshot.compare_to(_baseline, 'lineno')
+    _baseline = snapshot
+    return [str(stat) for stat in stats[:limit]]
+
+
+# ─── Recycling ────────────────────────────────────────────────
+
+def over_budget():
+    budget = _setting('MEMORY_BUDGET_MB', 0)
+    if not budget:
+        return False
+    rss = rss_bytes()
+    return rss is not None and rss > budget * MB
+
+
+def log_recycle(pid):
+    logger.warning(
+        'Worker %s is over its %sMB memory budget; recycling it', pid, _setting('MEMORY_BUDGET_MB', 0),
+        extra={'rss_mb': round((rss_bytes() or 0) / MB, 1), 'routes': report()},
+    )
+
+
+# ─── Middleware ───────────────────────────────────────────────
+
+class MemoryWatchdogMiddleware:
+    """Tracks RSS growth per route; place it near the top."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not _setting('MEMORY_WATCHDOG_ENABLED', True) or rss_bytes() is None:
+            raise MiddlewareNotUsed
+        self.threshold = _setting('MEMORY_REQUEST_GROWTH_MB', 20) * MB
+        frames = _setting('MEMORY_TRACEMALLOC_FRAMES', 0)
+        if frames and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def __call__(self, request):
+        before = rss_bytes()
+        response = self.get_response(request)
+        grown = max(rss_bytes() - before, 0)
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else '(unresolved)'
+        note(route, grown)
+        if grown >= self.threshold:
+            logger.warning('%s grew the worker by %.1fMB', route, grown / MB, extra={
+                'route': route,
+                'grown_mb': round(grown / MB, 1),
+                'rss_mb': round((before + grown) / MB, 1),
+                'top_allocations': top_allocations() if tracemalloc.is_tracing() else None,
+            })
+        return response
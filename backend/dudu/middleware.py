@@ -0,0 +1,148 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from . import caching
+
+
+# ─── Anonymous Page Cache ─────────────────────────────────────
+
+# url name -> data (model names, or 'trending' for the home page ordering)
+# whose changes must purge the cached page
+PAGE_CACHE_VIEWS = {
+    'index': ('industrial', 'feedback', 'projectstat', 'newsevent', 'trending'),
+    'industrial_list': ('industrial', 'projectstat'),
+    'feedback': ('feedback',),
+    'settings': (),
+    'payment_list': ('industrial',),
+}
+
+# Rendered in place of the CSRF token while a cacheable page is built, and
+# swapped for a fresh per-visitor token every time the page is served.
+CSRF_PLACEHOLDER = 'PAGE-CACHE-CSRF-TOKEN'
+
+CACHED_HEADERS = ('Content-Type', 'Content-Language', 'Vary', 'X-Frame-Options')
+
+
+def _page_cache_alias():
+    return getattr(settings, 'PAGE_CACHE_ALIAS', 'default')
+
+
+def _page_cache():
+    return caches[_page_cache_alias()]
+
+
+def _version_key(view_name):
+    return f'pagecache:version:{view_name}'
+
+
+def purge_pages(model_name):
+    """Invalidate every cached page that renders `model_name` rows."""
+    cache = _page_cache()
+    for view_name, dependencies in PAGE_CACHE_VIEWS.items():
+        if model_name in dependencies:
+            key = _version_key(view_name)
+            # add() is a no-op if the key exists; incr() then bumps it.
+            cache.add(key, 1, timeout=None)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, timeout=None)
+
+
+def _is_anonymous(request):
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        # No session cookie means no user and no session data: skip the DB.
+        return 'messages' not in request.COOKIES
+    if request.user.is_authenticated:
+        return False
+    return 'messages' not in request.COOKIES and not request.session.keys()
+
+
+class PageCacheMiddleware:
+    """
+    Full-page cache for public pages served to logged-out visitors.
+
+    Responses are keyed on the URL and a per-view version number, so a write
+    to a model listed in PAGE_CACHE_VIEWS purges only the pages that show it.
+    The CSRF token is rendered as a placeholder and replaced on every hit,
+    so visitors never share a token. On a miss only one request renders the
+    page (see dudu.caching.claim); concurrent requests for the same URL wait
+    up to PAGE_CACHE_LOCK_WAIT seconds for it before rendering their own.
+    Must sit after the auth and messages middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+        self.lock_wait = getattr(settings, 'PAGE_CACHE_LOCK_WAIT', 2)
+        self.alias = _page_cache_alias()
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, '_page_cache_key', None)
+        if key is None:
+            return response
+        try:
+            if self._cacheable(response):
+                self._store(key, response)
+        finally:
+            if getattr(request, '_page_cache_claimed', False):
+                caching.release(key, self.alias)
+        if not response.streaming:
+            self._fill_token(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+            return None
+        match = request.resolver_match
+        if request.method not in ('GET', 'HEAD') or match is None:
+            return None
+        if match.url_name not in PAGE_CACHE_VIEWS or not _is_anonymous(request):
+            return None
+
+        cache = _page_cache()
+        version = cache.get_or_set(_version_key(match.url_name), 1, timeout=None)
+        digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f'pagecache:{match.url_name}:{version}:{digest}'
+
+        cached = cache.get(key)
+        if cached is None:
+            request._page_cache_claimed = caching.claim(key, self.alias)
+            if not request._page_cache_claimed:
+                # Another request is rendering this page right now.
+                cached = caching.wait_for(key, self.lock_wait, self.alias)
+        if cached is None:
+            request._page_cache_key = key
+            request._page_cache_csrf = CSRF_PLACEHOLDER
+            return None
+
+        content, headers = cached
+        response = HttpResponse(content)
+        for name, value in headers.items():
+            response[name] = value
+        response['X-Page-Cache'] = 'HIT'
+        self._fill_token(request, response)
+        return response
+
+    def _cacheable(self, response):
+        if response.status_code != 200 or response.streaming:
+            return False
+        # Only the CSRF cookie may be set; anything else is visitor state.
+        if set(response.cookies) - {settings.CSRF_COOKIE_NAME}:
+            return False
+        return 'private' not in response.get('Cache-Control', '')
+
+    def _store(self, key, response):
+        headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+        _page_cache().set(key, (response.content, headers), self.timeout)
+        response['X-Page-Cache'] = 'MISS'
+
+    def _fill_token(self, request, response):
+        placeholder = CSRF_PLACEHOLDER.encode()
+        if placeholder in response.content:
+            response.content = response.content.replace(placeholder, get_token(request).encode())
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dudu', '0005_alter_userprofile_avatar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndustrialViewBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('views', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IndustrialViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('views', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='industrial',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='industrial',
+            index=models.Index(fields=['status', '-trending_score'], name='industrial_trending_idx'),
+        ),
+        migrations.AddField(
+            model_name='industrialviewbucket',
+            name='industrial',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_buckets', to='dudu.industrial'),
+        ),
+        migrations.AddField(
+            model_name='industrialviewrollup',
+            name='industrial',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_rollups', to='dudu.industrial'),
+        ),
+        migrations.AddIndex(
+            model_name='industrialviewbucket',
+            index=models.Index(fields=['hour'], name='dudu_indust_hour_aadf8e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='industrialviewbucket',
+            constraint=models.UniqueConstraint(fields=('industrial', 'hour'), name='unique_view_bucket'),
+        ),
+        migrations.AddConstraint(
+            model_name='industrialviewrollup',
+            constraint=models.UniqueConstraint(fields=('industrial', 'period', 'period_start'), name='unique_view_rollup'),
+        ),
+    ]
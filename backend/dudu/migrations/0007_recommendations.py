@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dudu', '0006_visit_analytics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndustrialCoBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weight', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('industrial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dudu.industrial')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dudu.industrial')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['updated_at'], name='dudu_indust_updated_313b84_idx')],
+                'constraints': [models.UniqueConstraint(fields=('industrial', 'other'), name='unique_cobooking_pair')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IndustrialRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('industrial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='dudu.industrial')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dudu.industrial')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('industrial', 'rank'), name='unique_recommendation_rank')],
+            },
+        ),
+    ]
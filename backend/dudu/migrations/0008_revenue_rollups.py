@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dudu', '0007_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('plan', models.CharField(max_length=20)),
+                ('payment_status', models.CharField(max_length=20)),
+                ('payment_method', models.CharField(blank=True, max_length=50)),
+                ('bookings', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('industrial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_rollups', to='dudu.industrial')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'industrial', 'plan', 'payment_status', 'payment_method'), name='unique_booking_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('plan', models.CharField(max_length=20)),
+                ('payment_status', models.CharField(max_length=20)),
+                ('payment_method', models.CharField(blank=True, max_length=50)),
+                ('payments', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('industrial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_rollups', to='dudu.industrial')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'industrial', 'plan', 'payment_status', 'payment_method'), name='unique_payment_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+# Admin searches name fields by prefix (^) and emails case-insensitively (=).
+# Each backend needs a different index for those lookups to use one.
+CASE_INSENSITIVE_INDEXES = [
+    ('booking_name_ci_idx', 'dudu_booking', 'name'),
+    ('booking_email_ci_idx', 'dudu_booking', 'email'),
+    ('enquiry_name_ci_idx', 'dudu_enquiry', 'name'),
+    ('enquiry_email_ci_idx', 'dudu_enquiry', 'email'),
+    ('feedback_name_ci_idx', 'dudu_feedback', 'name'),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    for name, table, column in CASE_INSENSITIVE_INDEXES:
+        if vendor == 'postgresql':
+            # UPPER(col) LIKE UPPER('abc%') needs pattern ops to use a btree.
+            expression = f'(UPPER({quote(column)}::text) text_pattern_ops)'
+        elif vendor == 'sqlite':
+            expression = f'({quote(column)} COLLATE NOCASE)'
+        else:
+            # MySQL's default collations are already case-insensitive.
+            expression = f'({quote(column)})'
+        schema_editor.execute(f'CREATE INDEX {quote(name)} ON {quote(table)} {expression}')
+
+
+def drop_search_indexes(apps, schema_editor):
+    quote = schema_editor.quote_name
+    for name, table, column in CASE_INSENSITIVE_INDEXES:
+        if schema_editor.connection.vendor == 'mysql':
+            schema_editor.execute(f'DROP INDEX {quote(name)} ON {quote(table)}')
+        else:
+            schema_editor.execute(f'DROP INDEX {quote(name)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dudu', '0010_booking_history_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='transaction_id',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='enquiry',
+            index=models.Index(fields=['phone'], name='enquiry_phone_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
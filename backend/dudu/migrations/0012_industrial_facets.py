@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:18
+
+from django.db import migrations, models
+
+from dudu.facets import parse_duration, price_band
+
+
+def fill_facets(apps, schema_editor):
+    Industrial = apps.get_model('dudu', 'Industrial')
+    industrials = list(Industrial.objects.all())
+    for industrial in industrials:
+        industrial.duration_days, industrial.duration_nights = parse_duration(industrial.duration)
+        industrial.price_band = price_band(industrial.price)
+    Industrial.objects.bulk_update(industrials, ['duration_days', 'duration_nights', 'price_band'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dudu', '0011_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='industrial',
+            name='duration_days',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='industrial',
+            name='duration_nights',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='industrial',
+            name='price_band',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='industrial',
+            index=models.Index(fields=['status', 'location'], name='industrial_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='industrial',
+            index=models.Index(fields=['status', 'duration_days', 'duration_nights'], name='industrial_duration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='industrial',
+            index=models.Index(fields=['status', 'price_band'], name='industrial_price_band_idx'),
+        ),
+        migrations.RunPython(fill_facets, migrations.RunPython.noop),
+    ]
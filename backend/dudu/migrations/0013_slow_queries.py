@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dudu', '0012_industrial_facets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=32)),
+                ('sql', models.TextField()),
+                ('view', models.CharField(blank=True, max_length=200)),
+                ('database', models.CharField(max_length=50)),
+                ('duration_ms', models.FloatField()),
+                ('plan', models.TextField(blank=True)),
+                ('recorded_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'slow queries',
+                'indexes': [models.Index(fields=['recorded_at'], name='slow_query_recorded_idx'), models.Index(fields=['fingerprint', 'recorded_at'], name='slow_query_fingerprint_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dudu', '0013_slow_queries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='no_of_people',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='travel_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='enquiry',
+            name='industrial',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='enquiries', to='dudu.industrial'),
+        ),
+        migrations.AddField(
+            model_name='industrial',
+            name='daily_capacity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='AvailabilityDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('seats_requested', models.IntegerField(default=0)),
+                ('seats_confirmed', models.IntegerField(default=0)),
+                ('industrial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='dudu.industrial')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('industrial', 'day'), name='unique_availability_day')],
+            },
+        ),
+    ]
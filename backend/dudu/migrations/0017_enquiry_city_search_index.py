@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:18
+
+from django.db import migrations
+
+# Admin looks enquiries up by city case-insensitively (=city) instead of
+# filtering on every distinct city; same per-backend index as 0011.
+INDEX, TABLE, COLUMN = 'enquiry_city_ci_idx', 'dudu_enquiry', 'city'
+
+
+def create_city_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    if vendor == 'postgresql':
+        expression = f'(UPPER({quote(COLUMN)}::text) text_pattern_ops)'
+    elif vendor == 'sqlite':
+        expression = f'({quote(COLUMN)} COLLATE NOCASE)'
+    else:
+        # MySQL's default collations are already case-insensitive.
+        expression = f'({quote(COLUMN)})'
+    schema_editor.execute(f'CREATE INDEX {quote(INDEX)} ON {quote(TABLE)} {expression}')
+
+
+def drop_city_index(apps, schema_editor):
+    quote = schema_editor.quote_name
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(f'DROP INDEX {quote(INDEX)} ON {quote(TABLE)}')
+    else:
+        schema_editor.execute(f'DROP INDEX {quote(INDEX)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dudu', '0016_request_profiles'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_city_index, drop_city_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dudu', '0017_enquiry_city_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentevent',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='paymentevent',
+            name='retry_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
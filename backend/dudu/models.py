@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from .facets import parse_duration, price_band
+
 
 class UserProfile(models.Model):
     ROLE_CHOICES = (
@@ -39,15 +41,117 @@ class Industrial(models.Model):
     location = models.CharField(max_length=100)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     duration = models.CharField(max_length=50)
+    # Facets derived from duration and price in save(); see dudu.facets
+    duration_days = models.PositiveSmallIntegerField(default=1)
+    duration_nights = models.PositiveSmallIntegerField(default=0)
+    price_band = models.CharField(max_length=20, blank=True)
     image = models.CharField(max_length=255, blank=True)
     visit_count = models.IntegerField(default=0)  # Added
+    trending_score = models.FloatField(default=0)  # Maintained by rollup_visits
+    # Students per visit day; 0 = no limit (see dudu.availability)
+    daily_capacity = models.PositiveIntegerField(default=0)
     status = models.CharField(max_length=20, default='active')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-trending_score'], name='industrial_trending_idx'),
+            # Catalog facets
+            models.Index(fields=['status', 'location'], name='industrial_location_idx'),
+            models.Index(fields=['status', 'duration_days', 'duration_nights'], name='industrial_duration_idx'),
+            models.Index(fields=['status', 'price_band'], name='industrial_price_band_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.duration_days, self.duration_nights = parse_duration(self.duration)
+        self.price_band = price_band(self.price)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'duration' in update_fields:
+                update_fields |= {'duration_days', 'duration_nights'}
+            if 'price' in update_fields:
+                update_fields.add('price_band')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
 
+class IndustrialViewBucket(models.Model):
+    """Detail-page views of an industrial, bucketed by hour."""
+    industrial = models.ForeignKey(Industrial, on_delete=models.CASCADE, related_name='view_buckets')
+    hour = models.DateTimeField()
+    views = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['industrial', 'hour'], name='unique_view_bucket'),
+        ]
+        indexes = [models.Index(fields=['hour'])]
+
+    def __str__(self):
+        return f"{self.industrial_id} @ {self.hour:%Y-%m-%d %H}:00 - {self.views}"
+
+
+class IndustrialViewRollup(models.Model):
+    """Daily and weekly view totals rolled up from the hourly buckets."""
+    PERIOD_CHOICES = (
+        ('day', 'Day'),
+        ('week', 'Week'),
+    )
+    industrial = models.ForeignKey(Industrial, on_delete=models.CASCADE, related_name='view_rollups')
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    views = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['industrial', 'period', 'period_start'], name='unique_view_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.industrial_id} {self.period} {self.period_start} - {self.views}"
+
+
+class IndustrialCoBooking(models.Model):
+    """
+    One cell of the item-item co-booking matrix: how strongly customers who
+    booked `industrial` also booked (or enquired about) `other`. The diagonal
+    (industrial == other) holds each industrial's own interaction weight.
+    """
+    industrial = models.ForeignKey(Industrial, on_delete=models.CASCADE, related_name='+')
+    other = models.ForeignKey(Industrial, on_delete=models.CASCADE, related_name='+')
+    weight = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['industrial', 'other'], name='unique_cobooking_pair'),
+        ]
+        indexes = [models.Index(fields=['updated_at'])]
+
+    def __str__(self):
+        return f"{self.industrial_id} x {self.other_id} = {self.weight}"
+
+
+class IndustrialRecommendation(models.Model):
+    """Precomputed top-N "similar visits" for an industrial, in rank order."""
+    industrial = models.ForeignKey(Industrial, on_delete=models.CASCADE, related_name='recommendations')
+    recommended = models.ForeignKey(Industrial, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['industrial', 'rank'], name='unique_recommendation_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.industrial_id} -> {self.recommended_id} (#{self.rank})"
+
+
 class Feedback(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     industrial = models.ForeignKey(Industrial, on_delete=models.SET_NULL, null=True, blank=True)  # Added
@@ -75,23 +179,148 @@ class Booking(models.Model):
     payment_method = models.CharField(max_length=50, blank=True)
     payment_status = models.CharField(max_length=20, default='pending')  # Added
     status = models.CharField(max_length=20, default='pending')
+    travel_date = models.DateField(null=True, blank=True)  # Visit day; older bookings have none
+    no_of_people = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)  # This is booking_date
 
+    class Meta:
+        indexes = [
+            # Account page booking history (keyset pagination)
+            models.Index(fields=['user', '-created_at', '-id'], name='booking_user_history_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.industrial.name}"
 
 
+class BookingMember(models.Model):
+    """A student on a group booking, imported from the coordinator's roster."""
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='members')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='group_bookings')
+    name = models.CharField(max_length=100)  # As written on the roster
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['booking', 'user'], name='unique_booking_member'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.booking_id})"
+
+
 class Payment(models.Model):
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='payments')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     payment_status = models.CharField(max_length=20, default='pending')
-    transaction_id = models.CharField(max_length=100, blank=True)
+    transaction_id = models.CharField(max_length=100, blank=True, db_index=True)
+    gateway_order_id = models.CharField(max_length=100, blank=True, db_index=True)  # Razorpay order_...
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Payment {self.id} for Booking {self.booking.id}"
 
 
+class PaymentEvent(models.Model):
+    """
+    A verified payment-gateway webhook, stored raw and applied later in
+    batches by `manage.py reconcile_payments` (see dudu.payments).
+    """
+    STATUS_CHOICES = (
+        ('received', 'Received'),
+        ('applied', 'Applied'),
+        ('ignored', 'Ignored'),
+    )
+    event_id = models.CharField(max_length=100, unique=True)
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
+    note = models.CharField(max_length=255, blank=True)
+    occurred_at = models.DateTimeField(null=True, blank=True)  # Gateway's created_at
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # Tries so far for an event whose payment isn't in the database yet
+    attempts = models.PositiveSmallIntegerField(default=0)
+    retry_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'received_at'], name='payment_event_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.status})"
+
+
+class BookingDailyRollup(models.Model):
+    """
+    Bookings per day and (industrial, plan, payment status, payment method),
+    kept current by dudu.revenue on every Booking write.
+    """
+    day = models.DateField()
+    industrial = models.ForeignKey(Industrial, on_delete=models.CASCADE, related_name='booking_rollups')
+    plan = models.CharField(max_length=20)
+    payment_status = models.CharField(max_length=20)
+    payment_method = models.CharField(max_length=50, blank=True)
+    bookings = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'industrial', 'plan', 'payment_status', 'payment_method'],
+                name='unique_booking_rollup',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.industrial_id} {self.plan}/{self.payment_status} - {self.bookings}"
+
+
+class PaymentDailyRollup(models.Model):
+    """
+    Payments per day and (industrial, plan, payment status, payment method),
+    kept current by dudu.revenue on every Payment write. Plan, method and
+    industrial come from the payment's booking; the status is the payment's.
+    """
+    day = models.DateField()
+    industrial = models.ForeignKey(Industrial, on_delete=models.CASCADE, related_name='payment_rollups')
+    plan = models.CharField(max_length=20)
+    payment_status = models.CharField(max_length=20)
+    payment_method = models.CharField(max_length=50, blank=True)
+    payments = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'industrial', 'plan', 'payment_status', 'payment_method'],
+                name='unique_payment_rollup',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.industrial_id} {self.plan}/{self.payment_status} - {self.amount}"
+
+
+class AvailabilityDay(models.Model):
+    """
+    Seats asked for and confirmed per industrial and visit day, kept current
+    from Booking and Enquiry writes (see dudu.availability).
+    """
+    industrial = models.ForeignKey(Industrial, on_delete=models.CASCADE, related_name='availability')
+    day = models.DateField()
+    seats_requested = models.IntegerField(default=0)  # open enquiries + live bookings
+    seats_confirmed = models.IntegerField(default=0)  # confirmed bookings
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['industrial', 'day'], name='unique_availability_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.industrial_id} @ {self.day} - {self.seats_confirmed}/{self.seats_requested}"
+
+
 class Newsletter(models.Model):
     email = models.EmailField(unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -116,6 +345,8 @@ class Enquiry(models.Model):
     )
     name = models.CharField(max_length=100)
     email = models.EmailField(blank=True, null=True) # Adding email as well
+    # Destination the enquiry is about, when the form names one
+    industrial = models.ForeignKey(Industrial, on_delete=models.SET_NULL, null=True, blank=True, related_name='enquiries')
     city = models.CharField(max_length=100)
     phone = models.CharField(max_length=20)
     whatsapp = models.CharField(max_length=20, blank=True)
@@ -125,6 +356,12 @@ class Enquiry(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Admin search by exact phone number
+            models.Index(fields=['phone'], name='enquiry_phone_idx'),
+        ]
+
     def __str__(self):
         return f"Enquiry from {self.name} - {self.city}"
 class NewsEvent(models.Model):
@@ -137,3 +374,44 @@ class NewsEvent(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class SlowQuery(models.Model):
+    """A sampled slow SQL statement (see dudu.slowqueries)."""
+    fingerprint = models.CharField(max_length=32)  # md5 of the normalized SQL
+    sql = models.TextField()  # normalized: literals and parameters as ?
+    view = models.CharField(max_length=200, blank=True)
+    database = models.CharField(max_length=50)
+    duration_ms = models.FloatField()
+    plan = models.TextField(blank=True)
+    recorded_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = 'slow queries'
+        indexes = [
+            models.Index(fields=['recorded_at'], name='slow_query_recorded_idx'),
+            models.Index(fields=['fingerprint', 'recorded_at'], name='slow_query_fingerprint_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f}ms {self.view or '-'}: {self.sql[:60]}"
+
+
+class RequestProfile(models.Model):
+    """One request an admin ran under the profiler (see dudu.profiling)."""
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view = models.CharField(max_length=200, blank=True)
+    status = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    samples = models.PositiveIntegerField(default=0)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    stats = models.BinaryField()  # marshal'd pstats, as Stats.dump_stats() writes them
+    collapsed = models.TextField(blank=True)  # "outer;inner count" lines for flame graphs
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['-created_at'], name='request_profile_created_idx')]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f}ms)"
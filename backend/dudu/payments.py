@@ -0,0 +1,256 @@
+"""
+Razorpay payments.
+
+The webhook view only verifies the HMAC signature and stores the raw event
+as a PaymentEvent, ignoring event ids it has already seen, so it returns
+in a single INSERT. `manage.py reconcile_payments` then applies queued
+events to Payment/Booking rows in batches.
+
+Events can arrive twice or out of order, so statuses only ever move
+forward (STATUS_RANK): a late payment.authorized can't undo a capture, and
+a duplicate capture is a no-op. An event can also arrive before the
+Payment it refers to has committed; it stays queued and is retried every
+PAYMENT_EVENT_RETRY_DELAY seconds, and only ignored after
+PAYMENT_EVENT_MAX_ATTEMPTS tries.
+"""
+import hashlib
+import hmac
+import json
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import availability, revenue, rollups
+from .models import Booking, Payment, PaymentEvent
+
+logger = logging.getLogger(__name__)
+
+# Razorpay event -> Payment.payment_status
+EVENT_STATUS = {
+    'payment.authorized': 'authorized',
+    'payment.captured': 'completed',
+    'order.paid': 'completed',
+    'payment.failed': 'failed',
+    'refund.processed': 'refunded',
+}
+
+STATUS_RANK = {'pending': 0, 'authorized': 1, 'failed': 2, 'completed': 3, 'refunded': 4}
+
+# Payment.payment_status -> (Booking.payment_status, Booking.status or None to keep)
+BOOKING_STATUS = {
+    'authorized': ('pending', None),
+    'failed': ('failed', None),
+    'completed': ('completed', 'confirmed'),
+    'refunded': ('refunded', 'cancelled'),
+}
+
+
+def _retry_delay():
+    return getattr(settings, 'PAYMENT_EVENT_RETRY_DELAY', 60)
+
+
+def _max_attempts():
+    return getattr(settings, 'PAYMENT_EVENT_MAX_ATTEMPTS', 30)
+
+
+# ─── Orders & Signatures ──────────────────────────────────────
+
+def webhooks_enabled():
+    return bool(getattr(settings, 'RAZORPAY_WEBHOOK_SECRET', ''))
+
+
+def create_order(booking, amount):
+    """Create a Razorpay order for `booking`; returns its id, or '' without API keys."""
+    key_id = getattr(settings, 'RAZORPAY_KEY_ID', '')
+    key_secret = getattr(settings, 'RAZORPAY_KEY_SECRET', '')
+    if not (key_id and key_secret):
+        return ''
+    import razorpay
+
+    try:
+        order = razorpay.Client(auth=(key_id, key_secret)).order.create({
+            'amount': int(Decimal(amount) * 100),
+            'currency': 'INR',
+            'receipt': f'booking-{booking.pk}',
+            'notes': {'booking_id': str(booking.pk)},
+        })
+    except Exception:
+        # The webhook can still match the payment by notes.booking_id.
+        logger.exception('Creating a Razorpay order for booking %s failed', booking.pk)
+        return ''
+    return order['id']
+
+
+def sign(body, secret):
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body, signature, secret=None):
+    secret = secret or getattr(settings, 'RAZORPAY_WEBHOOK_SECRET', '')
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign(body, secret), signature)
+
+
+def record_event(body, event_id=None):
+    """
+    Queue a verified webhook body. Redelivered events (same id) are dropped
+    by the unique constraint without a second round trip. Raises ValueError
+    for a body that isn't a JSON event.
+    """
+    data = json.loads(body)
+    if not isinstance(data, dict) or 'event' not in data:
+        raise ValueError('Not a webhook event')
+    occurred_at = data.get('created_at')
+    PaymentEvent.objects.bulk_create([
+        PaymentEvent(
+            event_id=event_id or hashlib.sha256(body).hexdigest(),
+            event_type=str(data['event'])[:50],
+            payload=data,
+            occurred_at=(
+                datetime.fromtimestamp(occurred_at, tz=dt_timezone.utc)
+                if isinstance(occurred_at, (int, float)) else None
+            ),
+        )
+    ], ignore_conflicts=True)
+
+
+# ─── Reconciliation ───────────────────────────────────────────
+
+def _entity(payload, name):
+    return ((payload.get(name) or {}).get('entity')) or {}
+
+
+def event_target(event):
+    """The order/payment/booking an event refers to, from its raw payload."""
+    payload = event.payload.get('payload') or {}
+    payment = _entity(payload, 'payment')
+    order = _entity(payload, 'order')
+    refund = _entity(payload, 'refund')
+    notes = payment.get('notes') or order.get('notes') or {}
+    booking_id = str(notes.get('booking_id') or '')
+    return {
+        'order_id': payment.get('order_id') or order.get('id') or '',
+        'payment_id': payment.get('id') or refund.get('payment_id') or '',
+        'booking_id': int(booking_id) if booking_id.isdigit() else None,
+        'amount': payment.get('amount'),
+    }
+
+
+def _load_payments(targets):
+    order_ids = {t['order_id'] for t in targets if t['order_id']}
+    booking_ids = {t['booking_id'] for t in targets if t['booking_id']}
+    payment_ids = {t['payment_id'] for t in targets if t['payment_id']}
+    query = Q(gateway_order_id__in=order_ids) | Q(booking_id__in=booking_ids) | Q(transaction_id__in=payment_ids)
+    payments = Payment.objects.select_for_update().select_related('booking').filter(query).order_by('pk')
+
+    by_order, by_booking, by_transaction = {}, {}, {}
+    for payment in payments:
+        if payment.gateway_order_id:
+            by_order[payment.gateway_order_id] = payment
+        by_booking[payment.booking_id] = payment  # a booking's latest payment
+        if payment.transaction_id:
+            by_transaction[payment.transaction_id] = payment
+    return lambda t: (
+        by_order.get(t['order_id']) or by_transaction.get(t['payment_id']) or by_booking.get(t['booking_id'])
+    )
+
+
+def apply_events(events):
+    """Apply a batch of events; returns {event pk: (status, note)}."""
+    targets = {event.pk: event_target(event) for event in events}
+    find = _load_payments(targets.values())
+
+    results = {}
+    before = {}
+    for event in events:
+        status = EVENT_STATUS.get(event.event_type)
+        if status is None:
+            results[event.pk] = ('ignored', 'unhandled event type')
+            continue
+        target = targets[event.pk]
+        payment = find(target)
+        if payment is None:
+            if event.attempts + 1 < _max_attempts():
+                # Its order may not have committed yet; try again later.
+                results[event.pk] = ('received', 'no matching payment yet')
+            else:
+                results[event.pk] = ('ignored', 'no matching payment')
+            continue
+        if STATUS_RANK[status] <= STATUS_RANK.get(payment.payment_status, 0):
+            results[event.pk] = ('ignored', f'payment already {payment.payment_status}')
+            continue
+
+        if payment.pk not in before:
+            before[payment.pk] = (
+                payment,
+                revenue.CONTRIBUTIONS[Payment](payment),
+                revenue.CONTRIBUTIONS[Booking](payment.booking),
+                availability.CONTRIBUTIONS[Booking](payment.booking),
+            )
+        payment.payment_status = status
+        if target['payment_id']:
+            payment.transaction_id = target['payment_id']
+        if status == 'completed' and target['amount']:
+            payment.amount = Decimal(target['amount']) / 100  # paise
+        booking = payment.booking
+        booking.payment_status, booking_status = BOOKING_STATUS[status]
+        if booking_status:
+            booking.status = booking_status
+        results[event.pk] = ('applied', '')
+
+    changed = [payment for payment, *_ in before.values()]
+    Payment.objects.bulk_update(changed, ['payment_status', 'transaction_id', 'amount'])
+    Booking.objects.bulk_update([payment.booking for payment in changed], ['payment_status', 'status'])
+    # bulk_update sends no signals; keep the revenue rollups and the
+    # availability calendar in step here.
+    if not revenue.is_suspended():
+        changes = []
+        for payment, payment_before, booking_before, _ in before.values():
+            changes.append((payment_before, revenue.CONTRIBUTIONS[Payment](payment)))
+            changes.append((booking_before, revenue.CONTRIBUTIONS[Booking](payment.booking)))
+        rollups.apply_changes(changes)
+    rollups.apply_changes([
+        (seats_before, availability.CONTRIBUTIONS[Booking](payment.booking))
+        for payment, _, _, seats_before in before.values()
+    ])
+    return results
+
+
+def reconcile(batch_size=500):
+    """Apply every queued event, oldest first; returns a Counter of outcomes."""
+    outcomes = Counter()
+    while True:
+        with transaction.atomic():
+            now = timezone.now()
+            events = list(
+                PaymentEvent.objects.select_for_update(skip_locked=True)
+                .filter(Q(retry_at__isnull=True) | Q(retry_at__lte=now), status='received')
+                .order_by('occurred_at', 'pk')[:batch_size]
+            )
+            if not events:
+                return outcomes
+            results = apply_events(events)
+
+            grouped = defaultdict(list)
+            for pk, result in results.items():
+                grouped[result].append(pk)
+            for (status, note), pks in grouped.items():
+                queued = PaymentEvent.objects.filter(pk__in=pks)
+                if status == 'received':
+                    queued.update(
+                        note=note, attempts=F('attempts') + 1,
+                        retry_at=now + timedelta(seconds=_retry_delay()),
+                    )
+                    outcomes['retrying'] += len(pks)
+                else:
+                    queued.update(status=status, note=note, processed_at=now)
+                    outcomes[status] += len(pks)
+        if len(events) < batch_size:
+            return outcomes
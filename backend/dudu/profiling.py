@@ -0,0 +1,187 @@
+"""
+On-demand request profiler for admins.
+
+An admin adds ?_profile=1 to a URL (or sends an X-Profile header) and that
+one request runs under two profilers at once:
+
+- cProfile, for exact call counts and own/cumulative time per function,
+  stored as a pstats dump (`python -m pstats`, snakeviz);
+- a sampling thread that reads the request thread's stack every
+  PROFILER_INTERVAL_MS, stored as collapsed stacks ("outer;inner count"
+  lines) for flamegraph.pl or speedscope.
+
+Both are kept in RequestProfile and shown under Admin Dashboard ->
+Profiles. Other requests pay a query-string lookup and a header lookup;
+nothing else runs unless the flag is present, and it is ignored for anyone
+who isn't an admin.
+"""
+import cProfile
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import reverse
+
+from .models import RequestProfile
+
+PROFILE_PARAM = '_profile'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _short_path(filename):
+    for prefix in (str(settings.BASE_DIR) + '/', sys.prefix + '/', sys.base_prefix + '/'):
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+# ─── Stack Sampling ───────────────────────────────────────────
+
+class StackSampler(threading.Thread):
+    """
+    Samples one thread's Python stack, from `root` inwards, every
+    `interval` seconds. The thread only runs when the GIL lets it, so on a
+    busy request the effective interval is at least sys.getswitchinterval().
+    """
+
+    def __init__(self, thread_id, root, interval):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        labels = {}
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.root:
+                code = frame.f_code
+                if code not in labels:
+                    name = f'{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})'
+                    labels[code] = name.replace(';', ',')
+                stack.append(labels[code])
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def collapsed(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in sorted(self.stacks.items()))
+
+
+# ─── Reports ──────────────────────────────────────────────────
+
+def top_functions(stats, limit=40):
+    """Functions by cumulative time from a stored pstats dump."""
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in marshal.loads(bytes(stats)).items():
+        rows.append({
+            'function': name,
+            'location': f'{_short_path(filename)}:{line}' if line else '',
+            'calls': calls,
+            'own_ms': own * 1000,
+            'cumulative_ms': cumulative * 1000,
+        })
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:limit]
+
+
+def flame_graph(collapsed, min_fraction=0.002):
+    """
+    Boxes for an icicle-style flame graph of collapsed stacks: dicts with
+    depth, left and width (percent of all samples), label and samples.
+    Boxes narrower than `min_fraction` are left out.
+    """
+    root = {'children': {}, 'count': 0}
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if not stack or not count.isdigit():
+            continue
+        root['count'] += int(count)
+        node = root
+        for frame in stack.split(';'):
+            node = node['children'].setdefault(frame, {'children': {}, 'count': 0})
+            node['count'] += int(count)
+
+    total = root['count'] or 1
+    boxes = []
+    pending = [(root, 0, 0.0)]
+    while pending:
+        node, depth, left = pending.pop()
+        for label, child in sorted(node['children'].items()):
+            width = child['count'] / total
+            if width >= min_fraction:
+                boxes.append({
+                    'depth': depth, 'left': left * 100, 'width': width * 100,
+                    'label': label, 'samples': child['count'],
+                })
+                pending.append((child, depth + 1, left))
+            left += width
+    return boxes
+
+
+# ─── Middleware ───────────────────────────────────────────────
+
+class ProfilerMiddleware:
+    """Profiles requests flagged by an admin; place it after AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not _setting('PROFILER_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.interval = _setting('PROFILER_INTERVAL_MS', 1) / 1000
+
+    def __call__(self, request):
+        if request.GET.get(PROFILE_PARAM) != '1' and 'HTTP_X_PROFILE' not in request.META:
+            return self.get_response(request)
+        from .views import admin_check
+
+        if not (request.user.is_authenticated and admin_check(request.user)):
+            return self.get_response(request)
+        return self.profile(request)
+
+    def profile(self, request):
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), sys._getframe(), self.interval)
+        sampler.start()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            sampler.stop()
+
+        match = getattr(request, 'resolver_match', None)
+        stats = pstats.Stats(profiler)
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.get_full_path()[:500],
+            view=match.view_name if match else '',
+            status=response.status_code,
+            duration_ms=round(elapsed * 1000, 1),
+            samples=sum(sampler.stacks.values()),
+            user=request.user,
+            stats=marshal.dumps(stats.stats),
+            collapsed=sampler.collapsed(),
+        )
+        keep = _setting('PROFILER_KEEP', 100)
+        stale = RequestProfile.objects.order_by('-created_at').values_list('pk', flat=True)[keep:]
+        RequestProfile.objects.filter(pk__in=list(stale)).delete()
+        response['X-Profile-URL'] = reverse('admin_profile', args=[profile.pk])
+        return response
@@ -0,0 +1,230 @@
+"""
+"Similar visits" recommendations.
+
+The co-booking matrix C = R^T R is built from customer x industrial
+interactions R (a booking counts 1.0, an enquiry naming a destination 0.5)
+and stored in IndustrialCoBooking. Item similarity blends the cosine of C
+with location/price similarity, and the top-N neighbours of each industrial
+are written to IndustrialRecommendation so the detail page reads them with
+one indexed query.
+
+New bookings update the matrix in place (note_booking); `build_recommendations
+--incremental` then re-ranks only the rows that changed, and a periodic full
+rebuild corrects any drift.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Booking, Enquiry, Industrial, IndustrialCoBooking, IndustrialRecommendation
+
+BOOKING_WEIGHT = 1.0
+ENQUIRY_WEIGHT = 0.5
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ─── Interactions ─────────────────────────────────────────────
+
+def _interactions(industrials):
+    """Yield (customer key, industrial id, weight) from bookings and enquiries."""
+    for email, industrial_id in Booking.objects.values_list('email', 'industrial_id').iterator(chunk_size=5000):
+        if email:
+            yield email.strip().lower(), industrial_id, BOOKING_WEIGHT
+
+    # Older enquiries have no industrial FK; count one of those when its
+    # option/city text names a destination (by location or name).
+    terms = [(ind.location.lower(), ind.name.lower(), ind.id) for ind in industrials]
+    enquiries = Enquiry.objects.values_list(
+        'email', 'phone', 'industrial_id', 'option', 'city',
+    ).iterator(chunk_size=5000)
+    for email, phone, enquiry_industrial_id, option, city in enquiries:
+        customer = (email or phone or '').strip().lower()
+        if not customer:
+            continue
+        if enquiry_industrial_id is not None:
+            yield customer, enquiry_industrial_id, ENQUIRY_WEIGHT
+            continue
+        text = f'{option} {city}'.lower()
+        if not text.strip():
+            continue
+        for location, name, industrial_id in terms:
+            if (location and location in text) or name in text:
+                yield customer, industrial_id, ENQUIRY_WEIGHT
+
+
+def build_cobooking_matrix(industrials, chunk_size=20000):
+    """
+    Return C (n x n) for `industrials`. Customers are processed in chunks so
+    memory stays at chunk_size x n however large the history is.
+    """
+    index = {ind.id: i for i, ind in enumerate(industrials)}
+    customers = {}
+    rows, cols, weights = [], [], []
+    for customer, industrial_id, weight in _interactions(industrials):
+        if industrial_id not in index:
+            continue
+        rows.append(customers.setdefault(customer, len(customers)))
+        cols.append(index[industrial_id])
+        weights.append(weight)
+
+    n = len(industrials)
+    matrix = np.zeros((n, n), dtype=np.float64)
+    if not rows:
+        return matrix
+    rows = np.asarray(rows)
+    cols = np.asarray(cols)
+    weights = np.asarray(weights, dtype=np.float64)
+    order = np.argsort(rows, kind='stable')
+    rows, cols, weights = rows[order], cols[order], weights[order]
+
+    bounds = np.searchsorted(rows, np.arange(0, len(customers) + chunk_size, chunk_size))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if start == end:
+            continue
+        first = rows[start]
+        block = np.zeros((rows[end - 1] - first + 1, n), dtype=np.float64)
+        # Repeat bookings don't add up: a customer's weight is their strongest signal.
+        np.maximum.at(block, (rows[start:end] - first, cols[start:end]), weights[start:end])
+        matrix += block.T @ block
+    return matrix
+
+
+# ─── Similarity ───────────────────────────────────────────────
+
+def _feature_similarity(industrials):
+    locations = np.array([ind.location.strip().lower() for ind in industrials])
+    same_location = (locations[:, None] == locations[None, :]).astype(np.float64)
+
+    prices = np.array([float(ind.price) for ind in industrials])
+    scale = np.median(prices) if len(prices) and np.median(prices) > 0 else 1.0
+    price_similarity = np.exp(-np.abs(prices[:, None] - prices[None, :]) / scale)
+    return 0.5 * same_location + 0.5 * price_similarity
+
+
+def similarity_matrix(industrials, matrix):
+    """Blend co-booking cosine similarity with location/price similarity."""
+    norms = np.sqrt(np.clip(np.diag(matrix), 1e-12, None))
+    cosine = matrix / norms[:, None] / norms[None, :]
+    np.fill_diagonal(cosine, 0.0)
+
+    behaviour_weight = _setting('RECOMMENDATION_BEHAVIOUR_WEIGHT', 0.7)
+    scores = behaviour_weight * cosine + (1 - behaviour_weight) * _feature_similarity(industrials)
+    np.fill_diagonal(scores, -np.inf)
+    return scores
+
+
+def _write_recommendations(industrials, scores, rows):
+    top_n = _setting('RECOMMENDATION_TOP_N', 4)
+    active = np.array([ind.status == 'active' for ind in industrials])
+    scores = np.where(active[None, :], scores, -np.inf)
+
+    objs = []
+    for i in rows:
+        ranked = np.argsort(-scores[i], kind='stable')[:top_n]
+        for rank, j in enumerate(ranked, start=1):
+            if np.isfinite(scores[i, j]):
+                objs.append(IndustrialRecommendation(
+                    industrial_id=industrials[i].id, recommended_id=industrials[j].id,
+                    rank=rank, score=round(float(scores[i, j]), 6),
+                ))
+    with transaction.atomic():
+        IndustrialRecommendation.objects.filter(
+            industrial_id__in=[industrials[i].id for i in rows],
+        ).delete()
+        IndustrialRecommendation.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+def _load_matrix(industrials):
+    index = {ind.id: i for i, ind in enumerate(industrials)}
+    matrix = np.zeros((len(industrials), len(industrials)), dtype=np.float64)
+    for a, b, weight in IndustrialCoBooking.objects.values_list('industrial_id', 'other_id', 'weight').iterator():
+        if a in index and b in index:
+            matrix[index[a], index[b]] = weight
+    return matrix
+
+
+# ─── Build / Refresh ──────────────────────────────────────────
+
+def rebuild_all():
+    """Recompute the whole matrix and every industrial's recommendations."""
+    industrials = list(Industrial.objects.order_by('id'))
+    matrix = build_cobooking_matrix(industrials)
+
+    cells = [
+        IndustrialCoBooking(industrial_id=industrials[i].id, other_id=industrials[j].id, weight=float(matrix[i, j]))
+        for i, j in zip(*np.nonzero(matrix))
+    ]
+    with transaction.atomic():
+        IndustrialCoBooking.objects.all().delete()
+        IndustrialCoBooking.objects.bulk_create(cells, batch_size=1000)
+
+    written = _write_recommendations(industrials, similarity_matrix(industrials, matrix), range(len(industrials)))
+    return {'industrials': len(industrials), 'cells': len(cells), 'recommendations': written}
+
+
+def refresh_changed(since):
+    """Re-rank only industrials whose matrix rows changed after `since`."""
+    changed = set(
+        IndustrialCoBooking.objects.filter(updated_at__gte=since)
+        .values_list('industrial_id', flat=True)
+    )
+    if not changed:
+        return {'industrials': 0, 'recommendations': 0}
+    industrials = list(Industrial.objects.order_by('id'))
+    rows = [i for i, ind in enumerate(industrials) if ind.id in changed]
+    scores = similarity_matrix(industrials, _load_matrix(industrials))
+    written = _write_recommendations(industrials, scores, rows)
+    return {'industrials': len(rows), 'recommendations': written}
+
+
+def _bump(industrial_id, other_id, weight, now):
+    updated = IndustrialCoBooking.objects.filter(
+        industrial_id=industrial_id, other_id=other_id,
+    ).update(weight=F('weight') + weight, updated_at=now)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            IndustrialCoBooking.objects.create(industrial_id=industrial_id, other_id=other_id, weight=weight)
+    except IntegrityError:
+        IndustrialCoBooking.objects.filter(
+            industrial_id=industrial_id, other_id=other_id,
+        ).update(weight=F('weight') + weight, updated_at=now)
+
+
+def note_booking(booking):
+    """
+    Fold a new booking into the matrix: if it's the customer's first booking
+    of this industrial, it co-occurs once with each industrial they booked
+    before. Enquiry weights are left to the next full rebuild.
+    """
+    email = (booking.email or '').strip()
+    if not email:
+        return
+    previous = set(
+        # Same customer key as the rebuild (case-insensitive; indexed, 0011).
+        Booking.objects.filter(email__iexact=email).exclude(pk=booking.pk)
+        .values_list('industrial_id', flat=True)
+    )
+    if booking.industrial_id in previous:
+        return
+    now = timezone.now()
+    _bump(booking.industrial_id, booking.industrial_id, BOOKING_WEIGHT, now)
+    for other_id in previous:
+        _bump(booking.industrial_id, other_id, BOOKING_WEIGHT, now)
+        _bump(other_id, booking.industrial_id, BOOKING_WEIGHT, now)
+
+
+def recommendations_for(industrial_id):
+    """The detail page's single indexed lookup."""
+    return (
+        IndustrialRecommendation.objects.filter(industrial_id=industrial_id)
+        .select_related('recommended')
+        .order_by('rank')
+    )
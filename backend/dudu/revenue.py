@@ -0,0 +1,159 @@
+"""
+Revenue reporting.
+
+Bookings and payments are rolled up per day and (industrial, plan, payment
+status, payment method) into BookingDailyRollup / PaymentDailyRollup. The
+rows are kept current by applying the before/after difference of every
+Booking and Payment write (see dudu.rollups) inside the same transaction,
+and the backfill_revenue command rebuilds them from scratch. Reports only ever
+read the rollups.
+"""
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from . import rollups
+from .models import Booking, BookingDailyRollup, Payment, PaymentDailyRollup
+
+KEY_FIELDS = ('day', 'industrial_id', 'plan', 'payment_status', 'payment_method')
+BOOKINGS = rollups.Rollup(BookingDailyRollup, KEY_FIELDS, ('bookings', 'amount'))
+PAYMENTS = rollups.Rollup(PaymentDailyRollup, KEY_FIELDS, ('payments', 'amount'))
+
+_state = threading.local()
+
+
+# ─── Incremental Maintenance ──────────────────────────────────
+
+@contextmanager
+def suspended():
+    """
+    Stop the signals from touching the rollups, e.g. while archiving old
+    bookings whose revenue must stay in the reports.
+    """
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def _day(created_at):
+    return timezone.localdate(created_at) if created_at else timezone.localdate()
+
+
+def booking_contribution(booking):
+    """(rollup, key, (count, amount)) one booking adds to the rollups."""
+    key = (
+        _day(booking.created_at), booking.industrial_id, booking.plan,
+        booking.payment_status, booking.payment_method or '',
+    )
+    return BOOKINGS, key, (1, Decimal(booking.amount or 0))
+
+
+def payment_contribution(payment):
+    booking = payment.booking
+    key = (
+        _day(payment.created_at), booking.industrial_id, booking.plan,
+        payment.payment_status, booking.payment_method or '',
+    )
+    return PAYMENTS, key, (1, Decimal(payment.amount or 0))
+
+
+CONTRIBUTIONS = {
+    Booking: booking_contribution,
+    Payment: payment_contribution,
+}
+
+TRACKER = rollups.Tracker(
+    'revenue', CONTRIBUTIONS, select_related={Payment: ['booking']}, is_suspended=is_suspended,
+)
+
+
+# ─── Backfill ─────────────────────────────────────────────────
+
+def _rebuild(rollup_model, source, counter, since):
+    rows = source.objects.all()
+    stale = rollup_model.objects.all()
+    if since:
+        rows = rows.filter(created_at__date__gte=since)
+        stale = stale.filter(day__gte=since)
+
+    prefix = 'booking__' if source is Payment else ''
+    rows = (
+        rows.annotate(day=TruncDate('created_at'))
+        .values(
+            'day', 'payment_status',
+            destination=F(f'{prefix}industrial_id'),
+            plan_name=F(f'{prefix}plan'),
+            method=F(f'{prefix}payment_method'),
+        )
+        .annotate(count=Count('pk'), total=Sum('amount'))
+        .order_by()
+    )
+    objs = [
+        rollup_model(
+            day=row['day'], industrial_id=row['destination'], plan=row['plan_name'],
+            payment_status=row['payment_status'], payment_method=row['method'] or '',
+            amount=row['total'] or 0, **{counter: row['count']},
+        )
+        for row in rows.iterator(chunk_size=5000)
+    ]
+    with transaction.atomic():
+        stale.delete()
+        rollup_model.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+def backfill(since=None):
+    """Rebuild the rollups from Booking/Payment, for days >= `since` if given."""
+    return {
+        'bookings': _rebuild(BookingDailyRollup, Booking, 'bookings', since),
+        'payments': _rebuild(PaymentDailyRollup, Payment, 'payments', since),
+    }
+
+
+# ─── Reports ──────────────────────────────────────────────────
+
+def monthly_revenue(start=None, end=None, paid_status='completed'):
+    """
+    Revenue per month, destination and plan from the payment rollups, with
+    booking counts alongside. Rows are dicts sorted by month, then revenue.
+    """
+    payments = PaymentDailyRollup.objects.filter(payment_status=paid_status)
+    bookings = BookingDailyRollup.objects.all()
+    if start:
+        payments, bookings = payments.filter(day__gte=start), bookings.filter(day__gte=start)
+    if end:
+        payments, bookings = payments.filter(day__lte=end), bookings.filter(day__lte=end)
+
+    group = ('month', 'industrial_id', 'industrial__name', 'plan')
+    report = {}
+    for row in (
+        payments.annotate(month=TruncMonth('day')).values(*group)
+        .annotate(revenue=Sum('amount'), count=Sum('payments')).order_by()
+    ):
+        report[tuple(row[k] for k in group)] = {
+            **{k: row[k] for k in group},
+            'revenue': row['revenue'], 'payments': row['count'], 'bookings': 0, 'booked': Decimal(0),
+        }
+    for row in (
+        bookings.annotate(month=TruncMonth('day')).values(*group)
+        .annotate(count=Sum('bookings'), booked=Sum('amount')).order_by()
+    ):
+        entry = report.setdefault(
+            tuple(row[k] for k in group),
+            {**{k: row[k] for k in group}, 'revenue': Decimal(0), 'payments': 0},
+        )
+        entry['bookings'] = row['count']
+        entry['booked'] = row['booked']
+    return sorted(report.values(), key=lambda r: (r['month'], -r['revenue'], r['industrial__name']))
@@ -0,0 +1,122 @@
+"""
+Counter tables kept current by deltas.
+
+A rollup model holds counters per key (a day, an industrial, ...) and each
+source row contributes to at most one of its rows. A contribution is
+(Rollup, key, values), with one value per counter. Every write moves the
+source row's contribution from what was stored before to what is stored
+after, inside the same transaction, so reads never aggregate the source
+tables. Tracker does this from model signals; code that writes with
+update() or bulk_update() calls apply_changes() itself.
+
+Used by the revenue rollups (dudu.revenue) and the availability calendar
+(dudu.availability).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+
+class Rollup:
+    """A rollup model, the fields that make up its key and its counter fields."""
+
+    def __init__(self, model, key_fields, counters):
+        self.model = model
+        self.key_fields = key_fields
+        self.counters = counters
+
+    def add(self, key, values):
+        if not any(values):
+            return
+        lookup = dict(zip(self.key_fields, key))
+        changes = {counter: F(counter) + value for counter, value in zip(self.counters, values)}
+        if self.model.objects.filter(**lookup).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                self.model.objects.create(**lookup, **dict(zip(self.counters, values)))
+        except IntegrityError:
+            # Another transaction created the row first.
+            self.model.objects.filter(**lookup).update(**changes)
+
+
+def apply_changes(changes):
+    """
+    Move contributions from `before` to `after` for (before, after) pairs
+    (either may be None), with one UPDATE per distinct rollup row.
+    """
+    totals = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for contribution, sign in ((before, -1), (after, 1)):
+            if contribution is not None:
+                rollup, key, values = contribution
+                total = totals.setdefault((rollup, key), [0] * len(values))
+                for i, value in enumerate(values):
+                    total[i] += sign * value
+    for (rollup, key), values in totals.items():
+        rollup.add(key, values)
+
+
+# ─── Signals ──────────────────────────────────────────────────
+
+class Tracker:
+    """
+    Applies the contribution of every save and delete of the models in
+    `contributions` (model -> function of an instance returning its
+    contribution, or None). `select_related` names the relations a model's
+    contribution reads; while `is_suspended()` is true, writes leave the
+    rollups alone. connect() is called from signals.py.
+    """
+
+    def __init__(self, name, contributions, select_related=None, is_suspended=None):
+        self.name = name
+        self.contributions = contributions
+        self.select_related = select_related or {}
+        self.is_suspended = is_suspended or (lambda: False)
+        self.attr = f'_{name}_before'
+
+    def stored(self, instance):
+        """The contribution of `instance` as currently saved, or None if new."""
+        if instance.pk is None:
+            return None
+        model = type(instance)
+        queryset = model.objects.filter(pk=instance.pk)
+        if model in self.select_related:
+            queryset = queryset.select_related(*self.select_related[model])
+        stored = queryset.first()
+        return self.contributions[model](stored) if stored else None
+
+    def connect(self):
+        for model in self.contributions:
+            uid = f'{self.name}:{model._meta.label}'
+            pre_save.connect(self.remember, sender=model, dispatch_uid=uid)
+            post_save.connect(self.update, sender=model, dispatch_uid=uid)
+            pre_delete.connect(self.remember_deleted, sender=model, dispatch_uid=uid)
+            post_delete.connect(self.remove, sender=model, dispatch_uid=uid)
+
+    def remember(self, sender, instance, raw=False, **kwargs):
+        if not raw and not self.is_suspended():
+            setattr(instance, self.attr, self.stored(instance))
+
+    def update(self, sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or self.is_suspended():
+            return
+        if update_fields:
+            # Fields left out of update_fields may hold unsaved values.
+            after = self.stored(instance)
+        else:
+            after = self.contributions[sender](instance)
+        apply_changes([(getattr(instance, self.attr, None), after)])
+        setattr(instance, self.attr, after)
+
+    def remember_deleted(self, sender, instance, **kwargs):
+        # Taken before the cascade runs, while a payment's booking still exists.
+        if not self.is_suspended():
+            setattr(instance, self.attr, self.contributions[sender](instance))
+
+    def remove(self, sender, instance, **kwargs):
+        before = getattr(instance, self.attr, None)
+        if before is not None and not self.is_suspended():
+            apply_changes([(before, None)])
@@ -0,0 +1,140 @@
+"""
+Primary/replica database routing.
+
+Replicas are configured with DATABASE_REPLICA_URLS (see settings.py) and
+become the aliases replica1, replica2, ... Reads go to a healthy replica;
+writes, reads inside a transaction and reads made after a write in the same
+request or command go to the primary. ReplicaPinMiddleware also keeps a
+client on the primary for REPLICA_PIN_SECONDS after a request that wrote,
+so they see their own booking or feedback even if the replica lags.
+
+Replica health (connectivity and, on PostgreSQL, replay lag) is checked at
+most every REPLICA_HEALTH_INTERVAL seconds per process; unhealthy replicas
+are skipped until the next check, falling back to the primary.
+"""
+import contextvars
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+PRIMARY = 'default'
+
+# Set for the rest of a request/command once anything was written.
+_wrote = contextvars.ContextVar('dudu_wrote', default=False)
+# Set by ReplicaPinMiddleware for requests that must read from the primary.
+_pinned = contextvars.ContextVar('dudu_pinned', default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+# ─── Replica Health ───────────────────────────────────────────
+
+_health = {}  # alias -> (healthy, checked_at)
+_health_lock = threading.Lock()
+
+PG_LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def check_replica(alias):
+    """True if `alias` answers and isn't lagging more than REPLICA_MAX_LAG seconds."""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(PG_LAG_SQL)
+                lag = float(cursor.fetchone()[0] or 0)
+                return lag <= getattr(settings, 'REPLICA_MAX_LAG', 30)
+            cursor.execute('SELECT 1')
+            return True
+    except DatabaseError:
+        connection.close()
+        return False
+
+
+def is_healthy(alias):
+    interval = getattr(settings, 'REPLICA_HEALTH_INTERVAL', 30)
+    now = time.monotonic()
+    healthy, checked_at = _health.get(alias, (True, None))
+    if checked_at is not None and now - checked_at < interval:
+        return healthy
+    with _health_lock:
+        # Claim the check so concurrent threads keep the last known state.
+        _health[alias] = (healthy, now)
+    healthy = check_replica(alias)
+    _health[alias] = (healthy, time.monotonic())
+    return healthy
+
+
+# ─── Router ───────────────────────────────────────────────────
+
+def use_primary():
+    return _pinned.get() or _wrote.get() or connections[PRIMARY].in_atomic_block
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS entry; a no-op when no replicas are configured."""
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or use_primary():
+            return PRIMARY
+        candidates = [alias for alias in replicas if is_healthy(alias)]
+        return random.choice(candidates) if candidates else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+# ─── Read-Your-Writes Middleware ──────────────────────────────
+
+class ReplicaPinMiddleware:
+    """
+    Route a request's reads to the primary when it's unsafe (POST etc.) or
+    when the client wrote something in the last REPLICA_PIN_SECONDS, and set
+    the pin cookie on responses to requests that wrote. Place it before the
+    session middleware so session reads are routed too.
+    """
+
+    cookie_name = 'dudu_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+
+        pinned_until = request.COOKIES.get(self.cookie_name, '')
+        pinned = request.method not in ('GET', 'HEAD', 'OPTIONS') or (
+            pinned_until.isdigit() and int(pinned_until) > time.time()
+        )
+        pinned_token = _pinned.set(pinned)
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+                response.set_cookie(
+                    self.cookie_name, str(int(time.time() + seconds)),
+                    max_age=seconds, httponly=True, samesite='Lax',
+                    secure=request.is_secure(),
+                )
+            return response
+        finally:
+            _pinned.reset(pinned_token)
+            _wrote.reset(wrote_token)
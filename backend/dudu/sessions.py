@@ -0,0 +1,134 @@
+"""
+Session engine: per-process LRU -> shared cache -> database.
+
+Reads are served from a small in-process LRU for a few seconds, then from the
+shared cache (see CACHES), and only fall through to the django_session table
+on a cache miss. Writes go through to the database and both caches, and are
+skipped entirely when the session data didn't actually change.
+
+Enable with SESSION_ENGINE = 'dudu.sessions'.
+"""
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core.cache import caches
+from django.db import connections
+from django.utils import timezone
+
+from .caching import LocalCache
+
+logger = logging.getLogger(__name__)
+
+
+# Kept short: another worker may change or delete the session (e.g. logout),
+# and this copy is only trusted until it expires.
+local_cache = LocalCache(
+    maxsize=getattr(settings, 'SESSION_LOCAL_CACHE_SIZE', 1000),
+    ttl=getattr(settings, 'SESSION_LOCAL_CACHE_TTL', 2),
+)
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = 'dudu.sessions'
+
+    def _digest(self, data):
+        return hashlib.md5(self.serializer().dumps(data)).hexdigest()
+
+    def load(self):
+        data = local_cache.get(self.session_key) if self.session_key else None
+        if data is None:
+            data = super().load()
+            if data and self.session_key:
+                local_cache.set(self.session_key, dict(data))
+        self._loaded_digest = self._digest(data)
+        return dict(data)
+
+    def save(self, must_create=False):
+        # SessionMiddleware saves whenever a key was assigned, even to the
+        # same value; only write back when the contents really changed.
+        data = self._get_session(no_load=must_create)
+        digest = self._digest(data)
+        if not must_create and self.session_key and digest == getattr(self, '_loaded_digest', None):
+            return
+        super().save(must_create)
+        local_cache.set(self.session_key, dict(data))
+        self._loaded_digest = digest
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        super().delete(session_key)
+        if key:
+            local_cache.delete(key)
+
+    @classmethod
+    def clear_expired(cls):
+        # Used by `manage.py clearsessions`.
+        sweep_expired_sessions()
+
+
+# ─── Expired Session Sweeper ──────────────────────────────────
+
+def sweep_expired_sessions(batch_size=None, pause=None):
+    """
+    Delete expired sessions in primary-key batches so no single statement
+    holds long locks on django_session. Returns the number deleted.
+    """
+    model = SessionStore.get_model_class()
+    batch_size = batch_size or getattr(settings, 'SESSION_SWEEP_BATCH_SIZE', 1000)
+    pause = getattr(settings, 'SESSION_SWEEP_PAUSE', 0.05) if pause is None else pause
+    cutoff = timezone.now()
+    deleted = 0
+    while True:
+        keys = list(
+            model.objects.filter(expire_date__lt=cutoff)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not keys:
+            return deleted
+        deleted += model.objects.filter(pk__in=keys).delete()[0]
+        if len(keys) < batch_size:
+            return deleted
+        time.sleep(pause)
+
+
+class SessionSweeper(threading.Thread):
+    """
+    Background thread that sweeps expired sessions every `interval` seconds.
+    Every worker runs one, but a cache lock lets only one of them sweep per
+    interval.
+    """
+
+    lock_key = 'dudu.sessions:sweep-lock'
+
+    def __init__(self, interval):
+        super().__init__(name='session-sweeper', daemon=True)
+        self.interval = interval
+
+    def run(self):
+        cache = caches[settings.SESSION_CACHE_ALIAS]
+        while True:
+            time.sleep(self.interval)
+            try:
+                if cache.add(self.lock_key, 1, timeout=self.interval):
+                    sweep_expired_sessions()
+            except Exception:
+                logger.exception('Sweeping expired sessions failed')
+            finally:
+                # Connections are per thread; don't hold one between sweeps.
+                connections.close_all()
+
+
+_sweeper = None
+
+
+def start_sweeper():
+    global _sweeper
+    interval = getattr(settings, 'SESSION_SWEEP_INTERVAL', 0)
+    if _sweeper is None and interval > 0:
+        _sweeper = SessionSweeper(interval)
+        _sweeper.start()
+    return _sweeper
@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .middleware import purge_pages
+from . import availability, facets, live, revenue
+from .models import Booking, Enquiry, Feedback, Industrial, NewsEvent, ProjectStat
+from .recommendations import note_booking
+
+
+@receiver([post_save, post_delete], sender=Industrial)
+@receiver([post_save, post_delete], sender=Feedback)
+@receiver([post_save, post_delete], sender=ProjectStat)
+@receiver([post_save, post_delete], sender=NewsEvent)
+def purge_cached_pages(sender, **kwargs):
+    purge_pages(sender._meta.model_name)
+
+
+@receiver([post_save, post_delete], sender=Industrial)
+def rebuild_facet_counts(sender, **kwargs):
+    transaction.on_commit(facets.build_cube)
+
+
+@receiver(post_save, sender=Booking)
+def update_cobooking_matrix(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: note_booking(instance))
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=Enquiry)
+def notify_live_dashboards(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: live.notify(sender._meta.model_name, instance.pk))
+
+
+# Revenue rollups and the availability calendar follow every Booking,
+# Payment and Enquiry write (see dudu.rollups).
+revenue.TRACKER.connect()
+availability.TRACKER.connect()
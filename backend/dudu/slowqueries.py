@@ -0,0 +1,196 @@
+"""
+Production slow-query sampler.
+
+SlowQueryMiddleware wraps every database connection for the duration of a
+request (connection.execute_wrapper). Each query costs two perf_counter()
+calls and a comparison; only one slower than SLOW_QUERY_MS (and picked by
+SLOW_QUERY_SAMPLE_RATE) is kept, with its parameters, in a bounded
+in-process ring buffer.
+
+The buffer is flushed after a response once it holds SLOW_QUERY_FLUSH_SIZE
+samples or SLOW_QUERY_FLUSH_INTERVAL seconds have passed: each distinct
+statement is EXPLAINed once (outside the request's own wrapper, so the
+sampler never samples itself) and the samples are written to SlowQuery with
+normalized SQL, so the admin page can group them by statement.
+"""
+import atexit
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+
+from .models import SlowQuery
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ─── Normalization ────────────────────────────────────────────
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """SQL with literals and parameters as ?, so similar queries group together."""
+    sql = _STRING.sub('?', sql).replace('%s', '?')
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.md5(normalized_sql.encode()).hexdigest()
+
+
+# ─── Sampling ─────────────────────────────────────────────────
+
+# (sql, params, many, view, database alias, seconds, recorded at)
+_buffer = deque(maxlen=_setting('SLOW_QUERY_BUFFER', 200))
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+_last_prune = None
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        return match.view_name
+    return request.path  # still in the middleware, before URL resolution
+
+
+def sample(request, threshold, rate, execute, sql, params, many, context):
+    """execute_wrapper: time the query, keep it if it was slow."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        if elapsed >= threshold and (rate >= 1 or random.random() < rate):
+            record = (sql, params, many, _view_name(request), context['connection'].alias, elapsed, timezone.now())
+            with _lock:
+                _buffer.append(record)
+
+
+def flush_due():
+    with _lock:
+        if not _buffer:
+            return False
+        return (
+            len(_buffer) >= _setting('SLOW_QUERY_FLUSH_SIZE', 20)
+            or time.monotonic() - _last_flush >= _setting('SLOW_QUERY_FLUSH_INTERVAL', 60)
+        )
+
+
+def explain(alias, sql, params, many):
+    """The database's plan for one statement, as text ('' where unsupported)."""
+    if many or not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return ''
+    connection = connections[alias]
+    try:
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            rows = cursor.fetchall()
+    except DatabaseError as e:
+        return f'EXPLAIN failed: {type(e).__name__}'
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail)
+        return '\n'.join(str(row[-1]) for row in rows)
+    return '\n'.join(' | '.join(str(col) for col in row) for row in rows)
+
+
+def flush_samples():
+    """Write buffered samples to SlowQuery; returns how many were written."""
+    global _last_flush, _last_prune
+    with _lock:
+        batch = list(_buffer)
+        _buffer.clear()
+        _last_flush = time.monotonic()
+    if not batch:
+        return 0
+
+    plans = {}
+    rows = []
+    for sql, params, many, view, alias, elapsed, recorded_at in batch:
+        normalized = normalize(sql)
+        key = fingerprint(normalized)
+        if key not in plans:
+            plans[key] = explain(alias, sql, params, many)
+        rows.append(SlowQuery(
+            fingerprint=key, sql=normalized, view=view[:200], database=alias,
+            duration_ms=round(elapsed * 1000, 2), plan=plans[key], recorded_at=recorded_at,
+        ))
+    SlowQuery.objects.bulk_create(rows)
+
+    now = timezone.now()
+    if _last_prune is None or now - _last_prune >= timedelta(hours=1):
+        _last_prune = now
+        days = _setting('SLOW_QUERY_RETENTION_DAYS', 14)
+        SlowQuery.objects.filter(recorded_at__lt=now - timedelta(days=days)).delete()
+    return len(rows)
+
+
+def _flush_at_exit():
+    try:
+        flush_samples()
+    except DatabaseError:
+        pass
+
+
+atexit.register(_flush_at_exit)
+
+
+# ─── Reports ──────────────────────────────────────────────────
+
+def top_offenders(since, limit=50):
+    """Statements per calling view, by total time spent since `since`."""
+    return list(
+        SlowQuery.objects.filter(recorded_at__gte=since)
+        .values('fingerprint', 'view')
+        .annotate(
+            calls=Count('pk'), total_ms=Sum('duration_ms'), avg_ms=Avg('duration_ms'),
+            max_ms=Max('duration_ms'), sql=Max('sql'), last_seen=Max('recorded_at'),
+        )
+        .order_by('-total_ms')[:limit]
+    )
+
+
+# ─── Middleware ───────────────────────────────────────────────
+
+class SlowQueryMiddleware:
+    """Samples slow queries on every database alias; place it near the top."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        threshold_ms = _setting('SLOW_QUERY_MS', 250)
+        if threshold_ms <= 0:
+            raise MiddlewareNotUsed
+        self.threshold = threshold_ms / 1000
+        self.rate = _setting('SLOW_QUERY_SAMPLE_RATE', 1.0)
+
+    def __call__(self, request):
+        wrapper = partial(sample, request, self.threshold, self.rate)
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(wrapper))
+            response = self.get_response(request)
+        if flush_due():
+            try:
+                flush_samples()
+            except DatabaseError:
+                pass  # samples are best effort; never fail the request
+        return response
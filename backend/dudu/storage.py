@@ -0,0 +1,36 @@
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .assets import build_bundle, get_bundles
+
+
+class BundledManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise manifest storage that also writes the per-page bundles from
+    ASSET_BUNDLES during collectstatic. Bundles are built from the collected
+    sources before hashing, so they get content-hashed, long-cache URLs and
+    pre-compressed variants like every other static file.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name in get_bundles():
+                for path, content in build_bundle(name, self._read_source).items():
+                    if self.exists(path):
+                        self.delete(path)
+                    self._save(path, ContentFile(content.encode('utf-8')))
+                    paths[path] = (self, path)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def _read_source(self, path):
+        with self.open(path) as f:
+            return f.read().decode('utf-8')
+
+    def stored_name(self, name):
+        # Some templates reference images that aren't shipped; fall back to
+        # the plain URL for those instead of failing the whole page.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
@@ -0,0 +1,54 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from ..assets import bundle_path, get_bundles
+
+register = template.Library()
+
+
+def _built(path):
+    # Bundles only exist after collectstatic; in DEBUG the individual source
+    # files are served so edits show up without rebuilding.
+    if settings.DEBUG:
+        return False
+    return path in getattr(staticfiles_storage, 'hashed_files', {})
+
+
+@lru_cache(maxsize=None)
+def _critical_css(path):
+    with staticfiles_storage.open(staticfiles_storage.stored_name(path)) as f:
+        return f.read().decode('utf-8')
+
+
+@register.simple_tag
+def bundle_css(name):
+    """
+    Stylesheets for a page: the critical rules inline plus the full bundle
+    loaded without blocking first paint, or the source files in development.
+    """
+    path = bundle_path(name, 'css')
+    if not _built(path):
+        return format_html_join(
+            '\n', '<link rel="stylesheet" href="{}">',
+            ((static(source),) for source in get_bundles()[name].get('css', ())),
+        )
+    critical = _critical_css(bundle_path(name, 'critical.css'))
+    return format_html(
+        '<style>{}</style>\n'
+        '<link rel="preload" href="{url}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '<noscript><link rel="stylesheet" href="{url}"></noscript>',
+        mark_safe(critical), url=static(path),
+    )
+
+
+@register.simple_tag
+def bundle_js(name):
+    path = bundle_path(name, 'js')
+    sources = [path] if _built(path) else get_bundles()[name].get('js', ())
+    return format_html_join('\n', '<script src="{}" defer></script>', ((static(s),) for s in sources))
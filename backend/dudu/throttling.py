@@ -0,0 +1,228 @@
+"""
+Token-bucket throttling for public write endpoints.
+
+Each protected view gets a scope with a rate from THROTTLE_RATES, e.g.
+'enquiry': '5/m' (5 tokens, refilled at 5 per minute). A request takes one
+token from the client's IP bucket and, when it carries a session cookie,
+from its session bucket too; with either empty it gets a 429 before the
+view runs (and the token it did get is given back), so floods never reach
+the ORM. Buckets live in the shared cache (see CACHES) and are updated with
+cache.incr(). That is only atomic on Redis and memcached; on any other
+backend concurrent requests could overdraw a bucket, so the throttle stays
+off and logs a warning instead. Point THROTTLE_CACHE_ALIAS at a Redis or
+memcached cache to use it.
+
+Shed requests are counted per scope and day; see shed_counts().
+"""
+import logging
+import time
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATES = {
+    'enquiry': '5/m',
+    'newsletter': '5/m',
+    'feedback': '3/m',
+    'chat': '30/m',
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+SHED_COUNTER_DAYS = 7
+
+# Backends whose incr() is one atomic server-side operation
+ATOMIC_BACKENDS = {
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django_redis.cache.RedisCache',
+}
+
+
+def _alias():
+    return getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')
+
+
+def _cache():
+    return caches[_alias()]
+
+
+@lru_cache(maxsize=None)
+def atomic_cache(alias):
+    """Whether the cache `alias` can hold token buckets; warns once if not."""
+    backend = settings.CACHES[alias]['BACKEND']
+    if backend in ATOMIC_BACKENDS:
+        return True
+    logger.warning(
+        'Throttling is off: cache %r (%s) has no atomic incr(); use Redis or memcached', alias, backend,
+    )
+    return False
+
+
+def parse_rate(rate):
+    """'5/m' -> (capacity 5, refill 5/60 tokens per second)."""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period[0].lower()]
+
+
+def get_rate(scope):
+    rates = {**DEFAULT_RATES, **getattr(settings, 'THROTTLE_RATES', {})}
+    rate = rates.get(scope)
+    return parse_rate(rate) if rate else None
+
+
+def client_ip(request):
+    """
+    The address the first trusted proxy saw. Clients can put anything in
+    X-Forwarded-For, so only the entries our THROTTLE_TRUSTED_PROXIES
+    appended (counted from the right) are believed.
+    """
+    proxies = getattr(settings, 'THROTTLE_TRUSTED_PROXIES', 0)
+    if proxies > 0:
+        forwarded = [a.strip() for a in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if a.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _identities(request):
+    # Read the session cookie directly: loading the session would hit the DB.
+    yield 'ip', client_ip(request)
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        yield 'session', session_key
+
+
+# ─── Token Bucket ─────────────────────────────────────────────
+
+def take_token(key, capacity, refill_rate, now=None):
+    """
+    Take one token from bucket `key`; returns seconds to wait, 0 if allowed.
+
+    The bucket is stored as a start time and a count of tokens used since
+    then, so taking a token is a single atomic incr(). Tokens available are
+    capacity + refill_rate * elapsed - used. The bucket is rebased (start =
+    now) when that would reach capacity, which caps it there, and at least
+    once per refill period so the count stays small; a request racing a
+    rebase may get one token for free, which is harmless.
+    """
+    cache = _cache()
+    now = time.time() if now is None else now
+    period = capacity / refill_rate
+    start_key, used_key = f'{key}:start', f'{key}:used'
+
+    state = cache.get_many([start_key, used_key])
+    start, used = state.get(start_key), state.get(used_key)
+    if start is None or used is None or now - start >= period or refill_rate * (now - start) >= used:
+        if start is None or used is None:
+            carried = 0
+        else:
+            carried = max(0, int(used - refill_rate * (now - start)))
+        start = now
+        # Expiring a full period after the last rebase means the bucket
+        # refilled completely, which is the same as starting over.
+        cache.set_many({start_key: start, used_key: carried}, timeout=int(period * 2) + 1)
+
+    try:
+        used = cache.incr(used_key)
+    except ValueError:
+        cache.set_many({start_key: now, used_key: 1}, timeout=int(period * 2) + 1)
+        return 0
+
+    available = capacity + refill_rate * (now - start) - used
+    if available >= 0:
+        return 0
+    # Refused requests don't spend a token.
+    give_back(key)
+    return -available / refill_rate
+
+
+def give_back(key):
+    """Return a token taken from bucket `key`."""
+    try:
+        _cache().decr(f'{key}:used')
+    except ValueError:
+        pass  # expired: the bucket is full again anyway
+
+
+# ─── Shed Counters ────────────────────────────────────────────
+
+def _shed_key(scope, day):
+    return f'throttle:shed:{scope}:{day.isoformat()}'
+
+
+def _count_shed(scope):
+    cache = _cache()
+    key = _shed_key(scope, timezone.localdate())
+    cache.add(key, 0, timeout=SHED_COUNTER_DAYS * 86400)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=SHED_COUNTER_DAYS * 86400)
+
+
+def shed_counts(day=None):
+    """{scope: requests refused} for `day` (default: today)."""
+    day = day or timezone.localdate()
+    scopes = {**DEFAULT_RATES, **getattr(settings, 'THROTTLE_RATES', {})}
+    keys = {_shed_key(scope, day): scope for scope in scopes}
+    counts = _cache().get_many(list(keys))
+    return {scope: counts.get(key, 0) for key, scope in keys.items()}
+
+
+# ─── Decorator ────────────────────────────────────────────────
+
+def _too_many_requests(request, wait):
+    retry_after = max(1, int(wait + 0.999))
+    message = 'Too many requests. Please wait a moment and try again.'
+    if request.content_type == 'application/json' or 'application/json' in request.headers.get('Accept', ''):
+        response = JsonResponse({'status': 'error', 'message': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def throttle(scope, methods=('POST',)):
+    """
+    Rate-limit a view under `scope` (see THROTTLE_RATES). Only requests whose
+    method is in `methods` are counted.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            rate = get_rate(scope)
+            if (
+                rate is None
+                or request.method not in methods
+                or not getattr(settings, 'THROTTLE_ENABLED', True)
+                or not atomic_cache(_alias())
+            ):
+                return view_func(request, *args, **kwargs)
+
+            capacity, refill_rate = rate
+            taken = []
+            wait = 0
+            for kind, identity in _identities(request):
+                key = f'throttle:{scope}:{kind}:{identity}'
+                refused = take_token(key, capacity, refill_rate)
+                if refused:
+                    wait = max(wait, refused)
+                else:
+                    taken.append(key)
+            if wait:
+                # A refused request spends nothing, in any of its buckets.
+                for key in taken:
+                    give_back(key)
+                _count_shed(scope)
+                return _too_many_requests(request, wait)
+            return view_func(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -9,10 +9,12 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('industrial/', views.industrial_list, name='industrial_list'),
     path('industrial/<int:pk>/', views.industrial_detail, name='industrial_detail'),
+    path('api/industrials/<int:pk>/availability/', views.industrial_availability, name='industrial_availability'),
     path('payment/<int:pk>/', views.payment_view, name='payment'),
     path('payment/', views.payment_list_view, name='payment_list'),
     path('feedback/', views.feedback_view, name='feedback'),
     path('account/', views.account_view, name='account'),
+    path('api/account/bookings/', views.account_bookings_api, name='account_bookings'),
     path('settings/', views.settings_view, name='settings'),
     path('booking/<int:pk>/create/', views.booking_create, name='booking_create'),
     path('submit-enquiry/', views.submit_enquiry, name='submit_enquiry'),
@@ -24,6 +26,13 @@ urlpatterns = [
     path('admin-dashboard/enquiries/', views.admin_enquiries, name='admin_enquiries'),
     path('admin-dashboard/users/', views.admin_users, name='admin_users'),
     path('admin-dashboard/news/', views.admin_news, name='admin_news'),
+    path('admin-dashboard/revenue/', views.admin_revenue, name='admin_revenue'),
+    path('admin-dashboard/slow-queries/', views.admin_slow_queries, name='admin_slow_queries'),
+    path('admin-dashboard/profiles/', views.admin_profiles, name='admin_profiles'),
+    path('admin-dashboard/profiles/<int:pk>/', views.admin_profile, name='admin_profile'),
+    path('admin-dashboard/profiles/<int:pk>/<slug:kind>/', views.admin_profile_download, name='admin_profile_download'),
+    path('admin-dashboard/live/', views.admin_live_stream, name='admin_live_stream'),
+    path('admin-dashboard/live/changes/', views.admin_live_changes, name='admin_live_changes'),
 
     # Google SSO
     path('google/login/', views.google_login, name='google_login'),
@@ -32,6 +41,9 @@ urlpatterns = [
     # Chatbot API
     path('api/chat/', views.chat_api, name='chat_api'),
 
+    # Payment gateway
+    path('api/payments/webhook/', views.payment_webhook, name='payment_webhook'),
+
     # Newsletter
     path('api/newsletter/', views.newsletter_subscribe, name='newsletter_subscribe'),
 ]
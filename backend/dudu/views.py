@@ -1,26 +1,50 @@
+import base64
+import binascii
 import json
+import logging
 import re
+from datetime import timedelta
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import Avg, Prefetch, Q
+from django.utils import timezone
+from django.utils.dateformat import format as date_format
+from django.utils.dateparse import parse_date, parse_datetime
 
-from .models import Industrial, Feedback, Booking, Newsletter, ProjectStat, Enquiry, NewsEvent
+from .models import Industrial, Feedback, Booking, Newsletter, ProjectStat, Enquiry, NewsEvent, Payment, RequestProfile
+from . import availability, facets, live, profiling, rosters, slowqueries
+from .analytics import record_view
+from .payments import create_order, record_event, verify_signature, webhooks_enabled
+from .recommendations import recommendations_for
+from .revenue import monthly_revenue
+from .throttling import shed_counts, throttle
+
+logger = logging.getLogger(__name__)
 
 
 # ─── Page Views ───────────────────────────────────────────────
 
+def trending_industrials():
+    # trending_score is precomputed by `manage.py rollup_visits`
+    return Industrial.objects.filter(status='active').order_by('-trending_score')[:6]
+
+
 def index(request):
-    industrials = Industrial.objects.filter(status='active')[:6]
+    industrials = trending_industrials()
+    destinations = Industrial.objects.filter(status='active').order_by('name').values_list('pk', 'name')
     feedbacks = Feedback.objects.filter(is_approved=True).order_by('-created_at')[:6]
     stats = ProjectStat.objects.all()
     return render(request, 'index.html', {
         'industrials': industrials,
+        'destinations': destinations,
         'feedbacks': feedbacks,
         'stats': stats,
     })
@@ -32,13 +56,16 @@ def admin_dashboard(request):
         messages.error(request, "Access denied. Admins only.")
         return redirect('index')
 
+    shed = shed_counts()
     context = {
         'total_bookings': Booking.objects.count(),
         'pending_enquiries': Enquiry.objects.filter(status='pending').count(),
         'active_industrials': Industrial.objects.filter(status='active').count(),
         'total_users': User.objects.filter(is_staff=False).count(),
         'recent_bookings': Booking.objects.order_by('-created_at')[:5],
-        'news_items': NewsEvent.objects.filter(is_active=True).order_by('-date')[:3]
+        'news_items': NewsEvent.objects.filter(is_active=True).order_by('-date')[:3],
+        'throttled_today': sum(shed.values()),
+        'throttled_by_scope': shed,
     }
     return render(request, 'admin_dashboard.html', context)
 
@@ -61,7 +88,8 @@ def login_view(request):
                 user = authenticate(request, username=user_obj.username, password=password)
             else:
                 user = None
-        except Exception as e:
+        except Exception:
+            logger.exception('Looking up the account for a login failed')
             user = None
 
         if user is not None:
@@ -110,21 +138,30 @@ def logout_view(request):
 
 
 def industrial_list(request):
-    industrials = Industrial.objects.filter(status='active')
+    # ?location=Ooty&duration=2d1n&price=2000-3500 (repeatable); see dudu.facets
+    selection = facets.selected(request.GET)
+    industrials = facets.filter_queryset(Industrial.objects.filter(status='active'), selection)
     stats = ProjectStat.objects.all()
     return render(request, 'industrial.html', {
         'industrials': industrials,
         'stats': stats,
+        'facets': facets.facet_counts(selection),
+        'filtered': any(selection.values()),
     })
 
 
 def industrial_detail(request, pk):
     industrial = get_object_or_404(Industrial, pk=pk)
-    # Increment visit count
-    industrial.visit_count += 1
-    industrial.save()
+    # Counted in batches (hourly buckets + visit_count), see dudu.analytics
+    record_view(industrial.pk)
+    return render_industrial_detail(request, industrial)
+
+
+def render_industrial_detail(request, industrial):
+    # Also used by `manage.py export_static`, which mustn't count a view
     return render(request, 'industrial_details.html', {
         'industrial': industrial,
+        'similar_visits': recommendations_for(industrial.pk),
     })
 
 
@@ -144,6 +181,7 @@ def payment_list_view(request):
     })
 
 
+@throttle('feedback')
 def feedback_view(request):
     if request.method == 'POST':
         name = request.POST.get('name', 'Anonymous')
@@ -209,70 +247,230 @@ def account_view(request):
         except json.JSONDecodeError:
              return JsonResponse({'status': 'error', 'message': 'Invalid JSON data'}, status=400)
         except Exception as e:
+            logger.exception('Updating the profile of user %s failed', request.user.pk)
             return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
     bookings = []
+    next_cursor = None
     profile = None
     if request.user.is_authenticated:
-        bookings = Booking.objects.filter(user=request.user).order_by('-created_at')
+        # First page only; account.js loads the rest from account_bookings_api
+        bookings, next_cursor = _booking_history_page(request.user)
         profile = request.user.profile
         # Add name property for template compatibility
         profile.name = request.user.get_full_name() or request.user.username
         
     return render(request, 'account.html', {
         'bookings': bookings,
+        'next_cursor': next_cursor,
         'profile': profile
     })
 
 
+BOOKING_PAGE_SIZE = 20
+
+
+def _encode_cursor(booking):
+    raw = f'{booking.created_at.isoformat()}|{booking.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+    return (created_at, pk) if created_at else None
+
+
+def _booking_history_page(user, cursor=None, size=BOOKING_PAGE_SIZE):
+    """
+    One page of a user's bookings, newest first, with industrial and payments
+    loaded in two queries. Keyset pagination on (created_at, id), so deep
+    pages cost the same as the first. Returns (bookings, next cursor or None).
+    """
+    bookings = (
+        Booking.objects.filter(user=user)
+        .select_related('industrial')
+        .prefetch_related(Prefetch('payments', queryset=Payment.objects.order_by('created_at', 'pk')))
+        .order_by('-created_at', '-pk')
+    )
+    position = _decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, pk = position
+        bookings = bookings.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    page = list(bookings[:size + 1])
+    if len(page) > size:
+        return page[:size], _encode_cursor(page[size - 1])
+    return page, None
+
+
+def account_bookings_api(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'status': 'error', 'message': 'Login required'}, status=401)
+    bookings, next_cursor = _booking_history_page(request.user, request.GET.get('cursor'))
+    return JsonResponse({
+        'results': [
+            {
+                'id': booking.id,
+                'industrial': {
+                    'id': booking.industrial.id,
+                    'name': booking.industrial.name,
+                    'location': booking.industrial.location,
+                },
+                'plan': booking.plan,
+                'amount': str(booking.amount),
+                'status': booking.status,
+                'payment_status': booking.payment_status,
+                'created_at': booking.created_at.isoformat(),
+                'date': date_format(timezone.localtime(booking.created_at), 'M d, Y'),
+                'payments': [
+                    {
+                        'id': payment.id,
+                        'amount': str(payment.amount),
+                        'payment_status': payment.payment_status,
+                        'transaction_id': payment.transaction_id,
+                        'created_at': payment.created_at.isoformat(),
+                    }
+                    for payment in booking.payments.all()
+                ],
+            }
+            for booking in bookings
+        ],
+        'next': next_cursor,
+    })
+
+
 def settings_view(request):
     return render(request, 'settings.html')
 
 
+def _parse_visit(travel_date, people):
+    """(date, people) from form values; ValueError with a message if invalid."""
+    try:
+        day = parse_date(str(travel_date or '').strip())
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValueError('Please choose a valid travel date.')
+    if day < timezone.localdate():
+        raise ValueError('The travel date cannot be in the past.')
+    try:
+        people = int(people)
+    except (TypeError, ValueError):
+        people = 0
+    if people < 1:
+        raise ValueError('Please enter the number of people.')
+    return day, people
+
+
 def booking_create(request, pk):
     industrial = get_object_or_404(Industrial, pk=pk)
     if request.method == 'POST':
+        roster = None
+        participants = request.POST.get('participants', 1)
+        try:
+            if request.FILES.get('roster'):
+                if not request.user.is_authenticated:
+                    return JsonResponse({'status': 'error', 'message': 'Log in to book with a class roster.'}, status=403)
+                # Group booking: one seat per student on the roster
+                roster = rosters.parse(request.FILES['roster'])
+                participants = len(roster)
+            travel_date, no_of_people = _parse_visit(request.POST.get('visit_date'), participants)
+        except ValueError as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
         name = request.POST.get('name', '')
         email = request.POST.get('email', '')
         phone = request.POST.get('phone', '')
         plan = request.POST.get('plan', 'full')
         payment_method = request.POST.get('payment_method', '')
 
-        amount = industrial.price if plan == 'full' else industrial.price * 30 / 100
-
-        # Create Booking
-        booking = Booking.objects.create(
-            user=request.user if request.user.is_authenticated else None,
-            industrial=industrial,
-            name=name,
-            email=email,
-            phone=phone,
-            plan=plan,
-            amount=amount,
-            payment_method=payment_method,
-            payment_status='completed', # Assuming successful for now
-            status='confirmed',
-        )
-
-        # Create Payment Record
-        from .models import Payment
-        Payment.objects.create(
-            booking=booking,
-            amount=amount,
-            payment_status='completed',
-            transaction_id=f"TXN-{booking.id}-{int(amount)}" # Mock txn ID
-        )
+        # Per person, as on the payment page
+        amount = industrial.price * no_of_people
+        if plan != 'full':
+            amount = amount * 30 / 100
+
+        if webhooks_enabled():
+            # Real gateway: stay pending until reconcile_payments applies the webhook
+            with transaction.atomic():
+                booking = Booking.objects.create(
+                    user=request.user if request.user.is_authenticated else None,
+                    industrial=industrial,
+                    name=name,
+                    email=email,
+                    phone=phone,
+                    plan=plan,
+                    amount=amount,
+                    payment_method=payment_method,
+                    payment_status='pending',
+                    status='pending',
+                    travel_date=travel_date,
+                    no_of_people=no_of_people,
+                )
+                if roster:
+                    rosters.add_members(booking, roster)
+            order_id = create_order(booking, amount)
+            Payment.objects.create(booking=booking, amount=amount, gateway_order_id=order_id)
+            return JsonResponse({
+                'status': 'pending',
+                'message': 'Booking created. Complete the payment to confirm it.',
+                'booking_id': booking.id,
+                'order_id': order_id,
+                'key_id': settings.RAZORPAY_KEY_ID,
+                'amount': int(amount * 100),
+            })
+
+        with transaction.atomic():
+            # Create Booking
+            booking = Booking.objects.create(
+                user=request.user if request.user.is_authenticated else None,
+                industrial=industrial,
+                name=name,
+                email=email,
+                phone=phone,
+                plan=plan,
+                amount=amount,
+                payment_method=payment_method,
+                payment_status='completed', # Assuming successful for now
+                status='confirmed',
+                travel_date=travel_date,
+                no_of_people=no_of_people,
+            )
+            if roster:
+                rosters.add_members(booking, roster)
+
+            # Create Payment Record
+            Payment.objects.create(
+                booking=booking,
+                amount=amount,
+                payment_status='completed',
+                transaction_id=f"TXN-{booking.id}-{int(amount)}" # Mock txn ID
+            )
 
         return JsonResponse({'status': 'success', 'message': 'Booking confirmed!'})
 
     return redirect('payment', pk=pk)
 
 
+@throttle('enquiry')
 @require_POST
 def submit_enquiry(request):
     try:
         data = json.loads(request.body) if request.content_type == 'application/json' else request.POST
-        
+        try:
+            travel_date, no_of_people = _parse_visit(data.get('travel_date'), data.get('people'))
+        except ValueError as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+        industrial = None
+        if data.get('industrial'):
+            industrial_id = str(data['industrial'])
+            if industrial_id.isdigit():
+                industrial = Industrial.objects.filter(pk=int(industrial_id), status='active').first()
+            if industrial is None:
+                return JsonResponse({'status': 'error', 'message': 'Unknown destination.'}, status=400)
+
         # Save Enquiry to DB
         Enquiry.objects.create(
             name=data.get('name', ''),
@@ -280,14 +478,36 @@ def submit_enquiry(request):
             phone=data.get('phone', ''),
             whatsapp=data.get('whatsapp', ''),
             option=data.get('option', ''),
-            travel_date=data.get('travel_date', None) or '2026-01-01', # Default if missing
-            no_of_people=int(data.get('people', 0))
+            industrial=industrial,
+            travel_date=travel_date,
+            no_of_people=no_of_people,
         )
         return JsonResponse({'status': 'success', 'message': 'Enquiry submitted successfully!'})
     except Exception as e:
+        logger.exception('Saving an enquiry failed')
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
 
+def industrial_availability(request, pk):
+    """Seats requested/confirmed/remaining for each day of ?month=YYYY-MM."""
+    industrial = get_object_or_404(Industrial, pk=pk, status='active')
+    month = request.GET.get('month')
+    first = timezone.localdate().replace(day=1)
+    if month:
+        try:
+            first = parse_date(f'{month}-01') if re.fullmatch(r'\d{4}-\d{2}', month) else None
+        except ValueError:
+            first = None
+        if first is None:
+            return JsonResponse({'status': 'error', 'message': 'month must be YYYY-MM.'}, status=400)
+    return JsonResponse({
+        'industrial': industrial.pk,
+        'month': first.strftime('%Y-%m'),
+        'capacity': industrial.daily_capacity or None,
+        'days': availability.month_view(industrial, first.year, first.month),
+    })
+
+
 def google_login(request):
     return redirect('/accounts/google/login/')
 
@@ -298,6 +518,7 @@ def google_auth(request):
     return JsonResponse({'status': 'success', 'redirect_url': '/'})
 
 
+@throttle('newsletter')
 @require_POST
 def newsletter_subscribe(request):
     data = json.loads(request.body) if request.content_type == 'application/json' else request.POST
@@ -308,6 +529,24 @@ def newsletter_subscribe(request):
     return JsonResponse({'status': 'error', 'message': 'Email required'}, status=400)
 
 
+@csrf_exempt
+@require_POST
+def payment_webhook(request):
+    """
+    Razorpay webhook: verify the signature and queue the event. Applying it
+    is left to `manage.py reconcile_payments`, so this returns immediately.
+    """
+    if not webhooks_enabled():
+        return JsonResponse({'status': 'error', 'message': 'Webhooks are not configured'}, status=404)
+    if not verify_signature(request.body, request.headers.get('X-Razorpay-Signature', '')):
+        return JsonResponse({'status': 'error', 'message': 'Invalid signature'}, status=400)
+    try:
+        record_event(request.body, request.headers.get('X-Razorpay-Event-Id'))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid payload'}, status=400)
+    return JsonResponse({'status': 'success'})
+
+
 # ─── Chatbot API ──────────────────────────────────────────────
 
 # Keyword → response mapping for website-only chatbot
@@ -601,6 +840,7 @@ def _match_chatbot_response(message):
     return FALLBACK_RESPONSE
 
 
+@throttle('chat')
 @require_POST
 def chat_api(request):
     """
@@ -646,6 +886,24 @@ def admin_enquiries(request):
     enquiries = Enquiry.objects.all().order_by('-created_at')
     return render(request, 'admin_enquiries.html', {'enquiries': enquiries})
 
+def admin_live_stream(request):
+    """
+    Served by dudu.live.LiveStreamRouter on the ASGI app; this view is only
+    reached under WSGI, where a stream would tie up a worker thread per tab.
+    """
+    return JsonResponse({'status': 'error', 'message': 'Live updates need the ASGI server.'}, status=503)
+
+@login_required
+def admin_live_changes(request):
+    """Polling fallback for admin_live_stream: changes after ?after=<event id>."""
+    if not admin_check(request.user):
+        return JsonResponse({'status': 'error', 'message': 'Admins only.'}, status=403)
+    marks = live.decode_marks(request.GET.get('after'))
+    if marks is None:
+        marks = live.high_water_marks()
+    update, marks = live.changes_since(marks)
+    return JsonResponse({'id': live.encode_marks(marks), 'changes': update})
+
 @login_required
 def admin_users(request):
     if not admin_check(request.user):
@@ -660,3 +918,79 @@ def admin_news(request):
         return redirect('index')
     news_items = NewsEvent.objects.all().order_by('-date')
     return render(request, 'admin_news.html', {'news_items': news_items})
+
+@login_required
+def admin_revenue(request):
+    if not admin_check(request.user):
+        return redirect('index')
+    # Reads only the pre-aggregated daily rollups (see dudu/revenue.py)
+    try:
+        start = parse_date(request.GET.get('start', ''))
+        end = parse_date(request.GET.get('end', ''))
+    except ValueError:
+        start = end = None
+    rows = monthly_revenue(start, end)
+    return render(request, 'admin_revenue.html', {
+        'rows': rows,
+        'start': start,
+        'end': end,
+        'total_revenue': sum(row['revenue'] for row in rows),
+        'total_bookings': sum(row['bookings'] for row in rows),
+    })
+
+@login_required
+def admin_slow_queries(request):
+    if not admin_check(request.user):
+        return redirect('index')
+    # Sampled by dudu.slowqueries.SlowQueryMiddleware
+    try:
+        days = max(1, min(int(request.GET.get('days', 7)), 90))
+    except ValueError:
+        days = 7
+    return render(request, 'admin_slow_queries.html', {
+        'rows': slowqueries.top_offenders(timezone.now() - timedelta(days=days)),
+        'days': days,
+        'day_options': (1, 7, 30, 90),
+        'threshold_ms': getattr(settings, 'SLOW_QUERY_MS', 250),
+    })
+
+@login_required
+def admin_profiles(request):
+    if not admin_check(request.user):
+        return redirect('index')
+    # Recorded by dudu.profiling.ProfilerMiddleware for ?_profile=1 requests
+    profiles = (
+        RequestProfile.objects.defer('stats', 'collapsed')
+        .select_related('user').order_by('-created_at')[:100]
+    )
+    return render(request, 'admin_profiles.html', {
+        'profiles': profiles,
+        'param': profiling.PROFILE_PARAM,
+    })
+
+@login_required
+def admin_profile(request, pk):
+    if not admin_check(request.user):
+        return redirect('index')
+    profile = get_object_or_404(RequestProfile, pk=pk)
+    boxes = profiling.flame_graph(profile.collapsed)
+    return render(request, 'admin_profile.html', {
+        'profile': profile,
+        'boxes': boxes,
+        'depth': max((box['depth'] for box in boxes), default=0) + 1,
+        'functions': profiling.top_functions(profile.stats),
+    })
+
+@login_required
+def admin_profile_download(request, pk, kind):
+    if not admin_check(request.user):
+        return redirect('index')
+    if kind not in ('pstats', 'collapsed'):
+        raise Http404
+    profile = get_object_or_404(RequestProfile, pk=pk)
+    if kind == 'pstats':
+        response = HttpResponse(bytes(profile.stats), content_type='application/octet-stream')
+    else:
+        response = HttpResponse(profile.collapsed, content_type='text/plain; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="profile-{profile.pk}.{kind}"'
+    return response
@@ -0,0 +1,78 @@
+"""
+Pre-fork warm-up for the gunicorn master.
+
+With ``preload_app`` enabled the master imports Django once and every worker
+is forked from it, so anything loaded here is shared copy-on-write instead of
+being rebuilt lazily by the first request each worker serves.
+"""
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+
+def _import_views():
+    # Populating the reverse map imports every view module the URLconf
+    # references, including the admin and allauth ones.
+    get_resolver().reverse_dict
+
+
+def _template_names():
+    for template in settings.TEMPLATES:
+        for directory in template.get('DIRS', []):
+            directory = str(directory)
+            for root, _dirs, files in os.walk(directory):
+                for filename in files:
+                    if filename.endswith('.html'):
+                        path = os.path.join(root, filename)
+                        yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def _compile_templates():
+    """
+    Compile every project template so the cached loader holds them all.
+    Returns the number of templates compiled.
+    """
+    compiled = 0
+    for name in _template_names():
+        try:
+            get_template(name)
+            compiled += 1
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            pass
+    return compiled
+
+
+def _prime_database():
+    """
+    Touch each configured database once so driver modules, DNS and auth are
+    resolved, then close the sockets: connections must never cross a fork.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from django.contrib.sites.models import Site
+
+    for alias in connections:
+        try:
+            connections[alias].ensure_connection()
+        except Exception:
+            continue
+
+    try:
+        # Warm the per-process lookup caches used by admin and allauth.
+        ContentType.objects.get_for_models(*apps.get_models())
+        Site.objects.get_current()
+    except Exception:
+        pass
+    finally:
+        connections.close_all()
+
+
+def warm_up():
+    _import_views()
+    templates = _compile_templates()
+    _prime_database()
+    return {'templates': templates}
@@ -0,0 +1,121 @@
+"""
+Gunicorn configuration for DUDU IV Hub.
+
+Worker and thread counts are derived from the CPUs and memory actually
+available to the container, and the Django app is preloaded and warmed in
+the master so freshly forked workers serve their first request hot.
+
+Every value can be overridden through the environment, e.g.
+WEB_CONCURRENCY=3 GUNICORN_THREADS=8. GUNICORN_ASGI=True serves the ASGI
+app through uvicorn workers instead, which the live admin stream needs.
+"""
+import multiprocessing
+import os
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+def _memory_limit_mb():
+    """Memory available to this container in MB, or None if unknown."""
+    candidates = (
+        '/sys/fs/cgroup/memory.max',  # cgroup v2
+        '/sys/fs/cgroup/memory/memory.limit_in_bytes',  # cgroup v1
+    )
+    for path in candidates:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value) // (1024 * 1024)
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def _worker_count():
+    if os.getenv('WEB_CONCURRENCY'):
+        return int(os.getenv('WEB_CONCURRENCY'))
+    workers = _cpu_count() * 2 + 1
+    memory_mb = _memory_limit_mb()
+    if memory_mb:
+        per_worker_mb = int(os.getenv('GUNICORN_WORKER_MEMORY_MB', '160'))
+        reserve_mb = int(os.getenv('GUNICORN_RESERVED_MEMORY_MB', '128'))
+        workers = min(workers, (memory_mb - reserve_mb) // per_worker_mb)
+    return max(1, workers)
+
+
+# ─── Server ───────────────────────────────────────────────────
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = _worker_count()
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Under ASGI, open server-sent-event streams (dudu.live) are coroutines
+# rather than a thread each, so one worker can hold many admin tabs.
+asgi = os.getenv('GUNICORN_ASGI', 'False') == 'True'
+wsgi_app = 'industrial_visit.asgi:application' if asgi else 'industrial_visit.wsgi:application'
+if asgi:
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker')
+else:
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# Import Django once in the master; workers inherit it copy-on-write.
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers periodically so slow leaks never accumulate; the jitter
+# keeps them from all restarting at the same moment.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+# ─── Hooks ────────────────────────────────────────────────────
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before any fork."""
+    if os.getenv('GUNICORN_WARMUP', 'True') != 'True':
+        return
+    from dudu.warmup import warm_up
+
+    stats = warm_up()
+    server.log.info(
+        'Warm-up complete: %s templates compiled, %s %s workers x %s threads',
+        stats['templates'], workers, 'ASGI' if asgi else 'WSGI', threads,
+    )
+
+
+def post_worker_init(worker):
+    # Each worker runs a session sweeper; a cache lock makes them take turns.
+    from dudu.sessions import start_sweeper
+
+    start_sweeper()
+
+
+def post_request(worker, req, environ, resp):
+    # Past MEMORY_BUDGET_MB, finish in-flight requests and exit; the master
+    # forks a fresh worker. Sync/gthread only: uvicorn workers don't call
+    # this hook and rely on max_requests.
+    from dudu import memory
+
+    if worker.alive and memory.over_budget():
+        memory.log_recycle(worker.pid)
+        worker.alive = False
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'industrial_visit.settings')
 
 application = get_asgi_application()
+
+# Imported after setup: the router serves the live admin stream itself.
+from dudu.live import LiveStreamRouter  # noqa: E402
+
+application = LiveStreamRouter(application)
@@ -82,16 +82,23 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'dudu.health.HealthCheckMiddleware',  # /healthz and /readyz; must be first
+    'dudu.logs.RequestLogMiddleware',  # Request ids, timing and query counts
+    'dudu.memory.MemoryWatchdogMiddleware',  # RSS growth per route
+    'dudu.slowqueries.SlowQueryMiddleware',  # Samples slow SQL per view
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise for static files in production
     'corsheaders.middleware.CorsMiddleware',  # CORS - must be before CommonMiddleware
+    'dudu.routers.ReplicaPinMiddleware',  # Read-your-writes; must be before sessions
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'dudu.profiling.ProfilerMiddleware',  # ?_profile=1 for admins; needs request.user
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'dudu.middleware.PageCacheMiddleware',  # Must come after auth/messages
 ]
 
 ROOT_URLCONF = 'industrial_visit.urls'
@@ -106,6 +113,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'dudu.context_processors.csrf',  # Page-cache aware CSRF token
             ],
         },
     },
@@ -122,12 +130,16 @@ import dj_database_url
 # Use DATABASE_URL if available (Railway provides this), otherwise use MySQL
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# Persistent connections are per thread; under ASGI (GUNICORN_ASGI) sync code
+# runs on short-lived executor threads, so they would pile up instead.
+CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '0' if os.getenv('GUNICORN_ASGI') == 'True' else '600'))
+
 if DATABASE_URL:
     # Production: Use PostgreSQL from Railway
     DATABASES = {
         'default': dj_database_url.config(
             default=DATABASE_URL,
-            conn_max_age=600,
+            conn_max_age=CONN_MAX_AGE,
             conn_health_checks=True,
         )
     }
@@ -148,6 +160,183 @@ else:
         }
     }
 
+# Read replicas: comma-separated database URLs, registered as replica1,
+# replica2, ... Reads are routed to them by dudu.routers.ReplicaRouter;
+# writes and a client's reads shortly after writing stay on the primary.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+for number, replica_url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    DATABASES[f'replica{number}'] = dj_database_url.parse(
+        replica_url,
+        conn_max_age=CONN_MAX_AGE,
+        conn_health_checks=True,
+    )
+    DATABASES[f'replica{number}']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['dudu.routers.ReplicaRouter']
+# Seconds a client keeps reading from the primary after a write
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+# Seconds between replica health checks, and the replay lag that fails one
+REPLICA_HEALTH_INTERVAL = int(os.getenv('REPLICA_HEALTH_INTERVAL', '30'))
+REPLICA_MAX_LAG = int(os.getenv('REPLICA_MAX_LAG', '30'))
+
+
+# Cache
+# Shared across gunicorn workers: Redis when REDIS_URL is set, otherwise a
+# file-based cache on local disk.
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            # Fail rather than hang requests and /readyz if Redis stops answering
+            'OPTIONS': {
+                'socket_connect_timeout': float(os.getenv('CACHE_SOCKET_TIMEOUT', '2')),
+                'socket_timeout': float(os.getenv('CACHE_SOCKET_TIMEOUT', '2')),
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', str(BASE_DIR / '.django_cache')),
+        }
+    }
+
+# Computed values (dudu.caching): per-process LRU in front of the shared cache,
+# single-flight recomputation and early refresh
+CACHE_LOCAL_SIZE = int(os.getenv('CACHE_LOCAL_SIZE', '500'))
+CACHE_LOCAL_TTL = float(os.getenv('CACHE_LOCAL_TTL', '5'))
+# Seconds a recomputation may hold its lock, and others wait for its result
+CACHE_LOCK_TIMEOUT = int(os.getenv('CACHE_LOCK_TIMEOUT', '30'))
+CACHE_LOCK_WAIT = float(os.getenv('CACHE_LOCK_WAIT', '5'))
+# Higher refreshes earlier before expiry (XFetch beta); 0 disables it
+CACHE_EARLY_BETA = float(os.getenv('CACHE_EARLY_BETA', '1.0'))
+
+# Sessions: per-process LRU over the shared cache over the database
+SESSION_ENGINE = 'dudu.sessions'
+SESSION_LOCAL_CACHE_SIZE = int(os.getenv('SESSION_LOCAL_CACHE_SIZE', '1000'))
+SESSION_LOCAL_CACHE_TTL = float(os.getenv('SESSION_LOCAL_CACHE_TTL', '2'))
+# Seconds between background sweeps of expired sessions (0 disables)
+SESSION_SWEEP_INTERVAL = int(os.getenv('SESSION_SWEEP_INTERVAL', '3600'))
+SESSION_SWEEP_BATCH_SIZE = int(os.getenv('SESSION_SWEEP_BATCH_SIZE', '1000'))
+
+# Anonymous full-page cache (dudu.middleware.PageCacheMiddleware)
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '600'))
+# Seconds a request waits for another one already rendering the same page
+PAGE_CACHE_LOCK_WAIT = float(os.getenv('PAGE_CACHE_LOCK_WAIT', '2'))
+
+# Slow-query sampler (dudu.slowqueries): queries slower than SLOW_QUERY_MS
+# (0 disables) are kept with their EXPLAIN plan and the calling view
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '250'))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv('SLOW_QUERY_SAMPLE_RATE', '1.0'))
+SLOW_QUERY_BUFFER = int(os.getenv('SLOW_QUERY_BUFFER', '200'))
+SLOW_QUERY_FLUSH_SIZE = int(os.getenv('SLOW_QUERY_FLUSH_SIZE', '20'))
+SLOW_QUERY_FLUSH_INTERVAL = int(os.getenv('SLOW_QUERY_FLUSH_INTERVAL', '60'))
+SLOW_QUERY_RETENTION_DAYS = int(os.getenv('SLOW_QUERY_RETENTION_DAYS', '14'))
+
+# On-demand profiler (dudu.profiling): admins add ?_profile=1 to a URL.
+# Stack sampling interval, and how many profiles are kept
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'True') == 'True'
+PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', '1'))
+PROFILER_KEEP = int(os.getenv('PROFILER_KEEP', '100'))
+
+# Razorpay: API keys create orders; the webhook secret switches bookings from
+# the mock "instant success" flow to webhook-confirmed payments
+RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID', '')
+RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET', '')
+RAZORPAY_WEBHOOK_SECRET = os.getenv('RAZORPAY_WEBHOOK_SECRET', '')
+# Webhooks for a payment that isn't in the database yet are retried every
+# PAYMENT_EVENT_RETRY_DELAY seconds, up to PAYMENT_EVENT_MAX_ATTEMPTS tries
+PAYMENT_EVENT_RETRY_DELAY = int(os.getenv('PAYMENT_EVENT_RETRY_DELAY', '60'))
+PAYMENT_EVENT_MAX_ATTEMPTS = int(os.getenv('PAYMENT_EVENT_MAX_ATTEMPTS', '30'))
+
+# Token-bucket throttling of public write endpoints (dudu.throttling). It
+# needs a cache with an atomic incr() (Redis via REDIS_URL, or memcached)
+# and stays off, with a warning, on any other backend.
+THROTTLE_ENABLED = os.getenv('THROTTLE_ENABLED', 'True') == 'True'
+THROTTLE_RATES = {
+    'enquiry': os.getenv('THROTTLE_ENQUIRY_RATE', '5/m'),
+    'newsletter': os.getenv('THROTTLE_NEWSLETTER_RATE', '5/m'),
+    'feedback': os.getenv('THROTTLE_FEEDBACK_RATE', '3/m'),
+    'chat': os.getenv('THROTTLE_CHAT_RATE', '30/m'),
+}
+# Proxies in front of the app that append to X-Forwarded-For (Railway's
+# router is one); the client address is taken that many entries from the
+# right. 0 ignores the header and uses the socket address.
+THROTTLE_TRUSTED_PROXIES = int(os.getenv('THROTTLE_TRUSTED_PROXIES', '1'))
+
+# /readyz (dudu.health): seconds a result is reused, and the age at which
+# an unreconciled payment webhook event is reported as a stalled queue
+HEALTH_CACHE_SECONDS = float(os.getenv('HEALTH_CACHE_SECONDS', '5'))
+HEALTH_QUEUE_MAX_AGE = int(os.getenv('HEALTH_QUEUE_MAX_AGE', '600'))
+# Seconds a readiness check may take before it counts as failed
+HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', '3'))
+
+# Live admin dashboard (dudu.live): seconds between checks for new rows
+# without PostgreSQL LISTEN/NOTIFY, and with it (catches bulk imports)
+LIVE_POLL_INTERVAL = float(os.getenv('LIVE_POLL_INTERVAL', '2'))
+LIVE_FALLBACK_INTERVAL = float(os.getenv('LIVE_FALLBACK_INTERVAL', '30'))
+
+# Cold-data archival (manage.py archive_data / restore_archive). Point
+# ARCHIVE_DIR at a persistent volume in production.
+ARCHIVE_DIR = Path(os.getenv('ARCHIVE_DIR', BASE_DIR / 'archive'))
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '365'))
+
+# Static export of the public pages for CDN serving (manage.py export_static)
+STATIC_EXPORT_DIR = Path(os.getenv('STATIC_EXPORT_DIR', BASE_DIR.parent / 'docs'))
+
+# Largest class roster (CSV rows) a group booking may import
+ROSTER_MAX_ROWS = int(os.getenv('ROSTER_MAX_ROWS', '500'))
+
+# Logging (dudu.logs): JSON lines on stdout, written by a background thread.
+# Request lines are logged at LOG_REQUEST_SAMPLE_RATE (0-1); 5xx responses
+# and requests slower than LOG_SLOW_REQUEST_MS always are.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv('LOG_REQUEST_SAMPLE_RATE', '1.0'))
+LOG_SLOW_REQUEST_MS = float(os.getenv('LOG_SLOW_REQUEST_MS', '1000'))
+
+# Worker memory watchdog (dudu.memory): requests growing RSS by more than
+# MEMORY_REQUEST_GROWTH_MB are logged (with tracemalloc's top allocations if
+# MEMORY_TRACEMALLOC_FRAMES > 0), and gunicorn recycles a worker once it
+# passes MEMORY_BUDGET_MB (0 disables; gunicorn.conf.py plans 160MB a worker)
+MEMORY_WATCHDOG_ENABLED = os.getenv('MEMORY_WATCHDOG_ENABLED', 'True') == 'True'
+MEMORY_REQUEST_GROWTH_MB = float(os.getenv('MEMORY_REQUEST_GROWTH_MB', '20'))
+MEMORY_BUDGET_MB = int(os.getenv('MEMORY_BUDGET_MB', '320'))
+MEMORY_TRACEMALLOC_FRAMES = int(os.getenv('MEMORY_TRACEMALLOC_FRAMES', '0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'dudu.logs.RequestIdFilter'},
+    },
+    'formatters': {
+        'json': {'()': 'dudu.logs.JsonFormatter'},
+    },
+    'handlers': {
+        'queue': {
+            # A factory, not 'class': since 3.12 dictConfig rewires any
+            # QueueHandler subclass given as 'class' around other handlers.
+            '()': 'dudu.logs.QueueHandler',
+            'queue_size': LOG_QUEUE_SIZE,
+            'formatter': 'json',
+            'filters': ['request_id'],
+        },
+    },
+    'root': {'handlers': ['queue'], 'level': LOG_LEVEL},
+    'loggers': {
+        # Replaces Django's console/mail_admins handlers; 5xx tracebacks
+        # arrive here from django.request.
+        'django': {'handlers': ['queue'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -187,8 +376,47 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-# WhiteNoise configuration for production static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# WhiteNoise manifest storage for production static files, extended to build
+# the per-page bundles below during collectstatic.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'dudu.storage.BundledManifestStaticFilesStorage',
+    },
+}
+
+# Per-page CSS/JS bundles, rendered with {% bundle_css %} / {% bundle_js %}
+ASSET_BUNDLES = {
+    'index': {
+        'css': ['css/style.css', 'css/landing.css'],
+        'js': ['js/transitions.js', 'js/script.js', 'js/landing.js'],
+    },
+    'industrial': {
+        'css': ['css/style.css', 'css/feedback.css', 'css/landing.css', 'css/industrial.css'],
+        'js': ['js/transitions.js', 'js/script.js', 'js/industrials.js'],
+    },
+    'feedback': {
+        'css': ['css/style.css', 'css/feedback.css'],
+        'js': ['js/transitions.js', 'js/script.js'],
+    },
+    'account': {
+        'css': ['css/style.css', 'css/account.css'],
+        'js': ['js/transitions.js', 'js/script.js', 'js/account.js'],
+    },
+    'settings': {
+        'css': ['css/style.css', 'css/settings.css'],
+        'js': ['js/transitions.js', 'js/script.js'],
+    },
+}
+
+# Rules whose selectors start with these are inlined as above-the-fold CSS
+ASSET_CRITICAL_SELECTORS = (
+    '*', 'html', 'body', ':root', '[data-theme',
+    '.bg-blobs', '.blob', '.noise-overlay', '.page-transition',
+    '.nav', '.hero', '.theme-toggle', '.user-',
+)
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
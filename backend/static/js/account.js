@@ -4,7 +4,8 @@
 
 document.addEventListener('DOMContentLoaded', () => {
     // checkAuth(); // Optional: let server handle auth redirect
-    initAvatarUpload();
+    // Avatar preview and profile saving live in account.html's inline script.
+    initBookingHistory();
 });
 
 // ===== 1. CHECK AUTHENTICATION =====
@@ -228,3 +229,69 @@ function initAvatarUpload() {
         });
     }
 }
+
+// ===== 6. BOOKING HISTORY (infinite scroll) =====
+// The server renders the first page; later pages come from the JSON API
+// as the loading sentinel scrolls into view.
+function initBookingHistory() {
+    const list = document.getElementById('bookingsList');
+    const sentinel = document.getElementById('bookingsSentinel');
+    if (!list || !sentinel || !('IntersectionObserver' in window)) return;
+
+    let loading = false;
+
+    async function loadMore() {
+        const next = sentinel.dataset.next;
+        if (loading || !next) return;
+        loading = true;
+        try {
+            const url = new URL(sentinel.dataset.url, window.location.origin);
+            url.searchParams.set('cursor', next);
+            const response = await fetch(url, { headers: { 'Accept': 'application/json' } });
+            if (!response.ok) throw new Error('Failed to load bookings');
+            const data = await response.json();
+
+            data.results.forEach(booking => list.appendChild(renderBookingCard(booking)));
+            sentinel.dataset.next = data.next || '';
+            if (!data.next) {
+                observer.disconnect();
+                sentinel.remove();
+            }
+        } catch (error) {
+            console.error('Booking history error:', error);
+            sentinel.textContent = 'Could not load more visits.';
+            observer.disconnect();
+        } finally {
+            loading = false;
+        }
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) loadMore();
+    }, { rootMargin: '200px 0px' });
+    observer.observe(sentinel);
+}
+
+function renderBookingCard(booking) {
+    const card = document.createElement('div');
+    card.className = 'booking-card reveal visible';
+
+    const info = document.createElement('div');
+    info.className = 'booking-info';
+    const title = document.createElement('h4');
+    title.textContent = booking.industrial.name;
+    const date = document.createElement('p');
+    date.innerHTML = '<i class="fas fa-clock"></i> ';
+    date.appendChild(document.createTextNode(booking.date));
+    info.append(title, date);
+
+    const status = document.createElement('div');
+    status.className = 'booking-status';
+    const badge = document.createElement('span');
+    badge.className = 'status-badge status-' + String(booking.status).toLowerCase();
+    badge.textContent = booking.status;
+    status.appendChild(badge);
+
+    card.append(info, status);
+    return card;
+}
@@ -0,0 +1,136 @@
+// ======================================
+// ADMIN LIVE UPDATES - admin_live.js
+// ======================================
+// New bookings/enquiries and dashboard counters pushed over server-sent
+// events (dudu.live). Tables opt in with data-live="bookings|enquiries" and
+// data-live-columns; counters with data-live-counter. Without the ASGI
+// server the stream answers 503 and this polls the JSON fallback instead.
+
+document.addEventListener('DOMContentLoaded', () => {
+    initLiveUpdates();
+});
+
+const POLL_INTERVAL_MS = 15000;
+
+function initLiveUpdates() {
+    const body = document.body;
+    const tables = document.querySelectorAll('[data-live]');
+    const counters = document.querySelectorAll('[data-live-counter]');
+    if (!tables.length && !counters.length) return;
+
+    const apply = (update) => {
+        if (!update) return;
+        tables.forEach((tbody) => addRows(tbody, update[tbody.dataset.live] || []));
+        Object.entries(update.counters || {}).forEach(([name, value]) => {
+            document.querySelectorAll(`[data-live-counter="${name}"]`).forEach((el) => {
+                el.textContent = value;
+            });
+        });
+    };
+
+    if (!window.EventSource) {
+        pollChanges(body.dataset.livePoll, null, apply);
+        return;
+    }
+
+    let lastId = null;
+    let opened = false;
+    const source = new EventSource(body.dataset.liveStream);
+    source.addEventListener('open', () => { opened = true; });
+    source.addEventListener('changes', (event) => {
+        lastId = event.lastEventId;
+        apply(JSON.parse(event.data));
+    });
+    source.addEventListener('error', () => {
+        // A stream that never opened isn't available here (e.g. WSGI);
+        // dropped streams reconnect by themselves.
+        if (!opened || source.readyState === EventSource.CLOSED) {
+            source.close();
+            pollChanges(body.dataset.livePoll, lastId, apply);
+        }
+    });
+}
+
+function pollChanges(url, after, apply) {
+    const poll = () => {
+        const query = after ? `?after=${encodeURIComponent(after)}` : '';
+        fetch(url + query, { credentials: 'same-origin', headers: { 'Accept': 'application/json' } })
+            .then((response) => (response.ok ? response.json() : null))
+            .then((data) => {
+                if (!data) return;
+                after = data.id;
+                apply(data.changes);
+            })
+            .catch(() => {})
+            .finally(() => setTimeout(poll, POLL_INTERVAL_MS));
+    };
+    poll();
+}
+
+function addRows(tbody, items) {
+    if (!items.length) return;
+    const columns = tbody.dataset.liveColumns.split(' ');
+    const limit = parseInt(tbody.dataset.liveLimit || '0', 10);
+
+    // Drop the "No bookings found." placeholder row.
+    tbody.querySelectorAll('tr:not([data-live-id])').forEach((row) => row.remove());
+
+    items.forEach((item) => {
+        if (tbody.querySelector(`tr[data-live-id="${item.id}"]`)) return;
+        const row = document.createElement('tr');
+        row.dataset.liveId = item.id;
+        row.className = 'live-new';
+        columns.forEach((column) => row.appendChild(renderCell(column, item)));
+        tbody.prepend(row);
+    });
+
+    if (limit) {
+        tbody.querySelectorAll('tr').forEach((row, index) => {
+            if (index >= limit) row.remove();
+        });
+    }
+}
+
+function renderCell(column, item) {
+    const cell = document.createElement('td');
+    switch (column) {
+        case 'id':
+            cell.textContent = `#${item.id}`;
+            break;
+        case 'customer': {
+            const name = document.createElement('strong');
+            name.textContent = item.name;
+            const email = document.createElement('small');
+            email.style.color = '#666';
+            email.textContent = item.email;
+            cell.append(name, document.createElement('br'), email);
+            break;
+        }
+        case 'name': {
+            const name = document.createElement('strong');
+            name.textContent = item.name;
+            cell.appendChild(name);
+            break;
+        }
+        case 'plan': {
+            const plan = document.createElement('span');
+            plan.style.textTransform = 'capitalize';
+            plan.textContent = item.plan;
+            cell.appendChild(plan);
+            break;
+        }
+        case 'amount':
+            cell.textContent = `₹${item.amount}`;
+            break;
+        case 'status': {
+            const badge = document.createElement('span');
+            badge.className = `status-badge ${item.status === 'pending' ? 'status-pending' : 'status-completed'}`;
+            badge.textContent = item.status.charAt(0).toUpperCase() + item.status.slice(1);
+            cell.appendChild(badge);
+            break;
+        }
+        default:
+            cell.textContent = item[column] || '';
+    }
+    return cell;
+}
@@ -5,8 +5,25 @@
 document.addEventListener('DOMContentLoaded', () => {
     initHeroSlider();
     initFooterYear();
+    initFacetFilters();
 });
 
+/**
+ * Facet filters: apply as soon as a box is ticked. The Apply button stays
+ * for visitors without JavaScript.
+ */
+function initFacetFilters() {
+    const form = document.getElementById('facetForm');
+    if (!form) return;
+
+    const apply = form.querySelector('.facet-apply');
+    if (apply) apply.hidden = true;
+
+    form.addEventListener('change', (event) => {
+        if (event.target.matches('input[type="checkbox"]')) form.submit();
+    });
+}
+
 /**
  * Hero Slider functionality for industrial.html with pause-on-hover
  */